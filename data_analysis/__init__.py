@@ -0,0 +1,7 @@
+from .cheat_sheet import *
+from .sleeper_adp import *
+
+__all__ = (
+    cheat_sheet.__all__ +
+    sleeper_adp.__all__
+)
@@ -0,0 +1,205 @@
+import os
+import re
+import hashlib
+import argparse
+import datetime
+import pandas as pd
+from data_storage.player_crosswalk import normalize_player_names
+
+__all__ = ['load_sources', 'build_cheat_sheet', 'write_cheat_sheets', 'generate_cheat_sheets', 'POSITIONS']
+
+POSITIONS = ['QB', 'RB', 'WR', 'TE']
+
+RANKING_FILES = {
+    'redraft': os.path.join('Redraft', 'FantasyPros_{season}_Draft_{position}_Rankings.csv'),
+    'dynasty': os.path.join('Dynasty', 'FantasyPros_{season}_Dynasty_{position}_Rankings.csv'),
+}
+ADP_FILE = 'SleeperADP_{position}.txt'
+
+# Long-format columns shared by every parsed source
+SOURCE_COLUMNS = ['source', 'position', 'name', 'name_key', 'rank', 'tier', 'age', 'team']
+
+# Bumped whenever the parsers change, so stale cache entries are ignored
+PARSER_VERSION = 1
+
+
+def _file_hash(path):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _parse_rankings(path, source, position):
+    rankings = pd.read_csv(path)
+    return pd.DataFrame({
+        'source': source,
+        'position': position,
+        'name': rankings['PLAYER NAME'],
+        'rank': pd.to_numeric(rankings['RK'], errors='coerce'),
+        'tier': pd.to_numeric(rankings.get('TIERS'), errors='coerce') if 'TIERS' in rankings else float('nan'),
+        'age': pd.to_numeric(rankings.get('AGE'), errors='coerce') if 'AGE' in rankings else float('nan'),
+        'team': rankings.get('TEAM'),
+    })
+
+
+def _parse_adp(path, position):
+    # Sleeper's ADP page copied as text lists each player as '<name> <position>' on its own line
+    with open(path, 'r', encoding='utf-8') as f:
+        names = re.findall(rf'\n(.*?) {position}', f.read())
+    return pd.DataFrame({'source': 'adp', 'position': position, 'name': names,
+                         'rank': range(1, len(names) + 1), 'tier': float('nan'), 'age': float('nan'), 'team': None})
+
+
+def _load_cached(path, label, parse, cache_dir):
+    # Parsed sources are cached by file content, so only edited files are parsed again
+    if cache_dir is None:
+        return parse(path)
+    cache_file = os.path.join(cache_dir, f'{label}-{_file_hash(path)}-v{PARSER_VERSION}.parquet')
+    if os.path.exists(cache_file):
+        return pd.read_parquet(cache_file)
+    frame = parse(path)
+    os.makedirs(cache_dir, exist_ok=True)
+    frame.to_parquet(cache_file + '.tmp', index=False)
+    os.replace(cache_file + '.tmp', cache_file)
+    return frame
+
+
+def load_sources(season, rankings_dir='./FantasyProsRankings', adp_dir='./SleeperADP/Dynasty', positions=POSITIONS,
+                 cache_dir='./.cheat_sheet_cache'):
+    """
+    Loads every rankings and ADP file once into a single long-format frame.
+
+    Parameters:
+        season (int): Season of the FantasyPros ranking files.
+        rankings_dir (str): Directory holding the Redraft/ and Dynasty/ FantasyPros exports.
+            - Defaults to './FantasyProsRankings'.
+        adp_dir (str): Directory holding the copied SleeperADP_<POS>.txt files.
+            - Defaults to './SleeperADP/Dynasty'.
+        positions (list): Positions to load.
+            - Defaults to QB, RB, WR and TE.
+        cache_dir (str, optional): Directory caching parsed files by content hash; None
+            disables caching.
+            - Defaults to './.cheat_sheet_cache'.
+
+    Returns:
+        pandas.DataFrame: One row per player and source with SOURCE_COLUMNS, where source
+        is 'redraft', 'dynasty' or 'adp'.
+    """
+    frames = []
+    for position in positions:
+        for source, pattern in RANKING_FILES.items():
+            path = os.path.join(rankings_dir, pattern.format(season=season, position=position))
+            if not os.path.exists(path):
+                print(f'{source.capitalize()} rankings for {position} not found: {path}')
+                continue
+            parse = lambda p, s=source, pos=position: _parse_rankings(p, s, pos)
+            frames.append(_load_cached(path, f'{source}-{position}', parse, cache_dir))
+        path = os.path.join(adp_dir, ADP_FILE.format(position=position))
+        if not os.path.exists(path):
+            print(f'Sleeper ADP for {position} not found: {path}')
+            continue
+        frames.append(_load_cached(path, f'adp-{position}', lambda p, pos=position: _parse_adp(p, pos), cache_dir))
+    if not frames:
+        return pd.DataFrame(columns=SOURCE_COLUMNS)
+    sources = pd.concat(frames, ignore_index=True)
+    sources['name_key'] = normalize_player_names(sources['name']).to_numpy()
+    return sources[SOURCE_COLUMNS]
+
+
+def build_cheat_sheet(sources):
+    """
+    Combines all sources into one cheat sheet covering every position.
+
+    Players are matched on position and normalized name (see
+    data_storage.normalize_player_names), so suffixes, initials and punctuation do not
+    break the join. Every player with a dynasty ranking or an ADP is kept.
+
+    Parameters:
+        sources (pandas.DataFrame): Output of load_sources.
+
+    Returns:
+        pandas.DataFrame: Columns Position, ADP, FPR, Tier, Name, Age, Team and Redraft
+        Diff (redraft rank minus dynasty rank), sorted by position and dynasty rank.
+    """
+    keyed = sources.dropna(subset=['name_key']).drop_duplicates(['source', 'position', 'name_key'])
+    wide = keyed.pivot(index=['position', 'name_key'], columns='source', values=['rank', 'tier', 'age', 'team', 'name'])
+    wide.columns = [f'{value}_{source}' for value, source in wide.columns]
+    wide = wide.reindex(columns=[f'{value}_{source}' for value in ('rank', 'tier', 'age', 'team', 'name')
+                                 for source in ('dynasty', 'redraft', 'adp')])
+    wide = wide[wide['rank_dynasty'].notna() | wide['rank_adp'].notna()].reset_index()
+
+    sheet = pd.DataFrame({
+        'Position': wide['position'],
+        'ADP': pd.to_numeric(wide['rank_adp']).astype('Int64'),
+        'FPR': pd.to_numeric(wide['rank_dynasty']).astype('Int64'),
+        'Tier': pd.to_numeric(wide['tier_dynasty']).astype('Int64'),
+        'Name': wide['name_dynasty'].fillna(wide['name_adp']),
+        'Age': pd.to_numeric(wide['age_dynasty']),
+        'Team': wide['team_dynasty'],
+        'Redraft Diff': (pd.to_numeric(wide['rank_redraft']) - pd.to_numeric(wide['rank_dynasty'])).astype('Int64'),
+    })
+    order = pd.Categorical(sheet['Position'], categories=POSITIONS + sorted(set(sheet['Position']) - set(POSITIONS)))
+    return sheet.assign(_order=order).sort_values(['_order', 'FPR', 'ADP'], na_position='last') \
+        .drop(columns='_order').reset_index(drop=True)
+
+
+def write_cheat_sheets(sheet, output_dir='.', output_file='CheatSheet_{position}.csv'):
+    """
+    Writes the cheat sheet, one file per position.
+
+    Parameters:
+        sheet (pandas.DataFrame): Output of build_cheat_sheet.
+        output_dir (str): Destination directory.
+            - Defaults to '.'.
+        output_file (str): File name pattern; without a '{position}' field every position
+            is written to a single file.
+            - Defaults to 'CheatSheet_{position}.csv'.
+
+    Returns:
+        list: The written paths.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    if '{position}' not in output_file:
+        path = os.path.join(output_dir, output_file)
+        sheet.to_csv(path, index=False)
+        return [path]
+    paths = []
+    for position, rows in sheet.groupby('Position', sort=False):
+        path = os.path.join(output_dir, output_file.format(position=position))
+        rows.drop(columns='Position').to_csv(path, index=False)
+        paths.append(path)
+    return paths
+
+
+def generate_cheat_sheets(season, rankings_dir='./FantasyProsRankings', adp_dir='./SleeperADP/Dynasty',
+                          output_dir='.', output_file='CheatSheet_{position}.csv', positions=POSITIONS,
+                          cache_dir='./.cheat_sheet_cache'):
+    # Load, combine and write in one call; see load_sources and write_cheat_sheets for the parameters
+    sheet = build_cheat_sheet(load_sources(season, rankings_dir, adp_dir, positions, cache_dir))
+    return write_cheat_sheets(sheet, output_dir, output_file)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Generate dynasty cheat sheets from FantasyPros rankings and Sleeper ADP.')
+    parser.add_argument('--season', type=int, default=datetime.date.today().year)
+    parser.add_argument('--rankings-dir', default='./FantasyProsRankings')
+    parser.add_argument('--adp-dir', default='./SleeperADP/Dynasty')
+    parser.add_argument('--output-dir', default='.')
+    parser.add_argument('--output-file', default='CheatSheet_{position}.csv',
+                        help="File name pattern; omit '{position}' to write a single file")
+    parser.add_argument('--positions', nargs='+', default=POSITIONS)
+    parser.add_argument('--cache-dir', default='./.cheat_sheet_cache')
+    parser.add_argument('--no-cache', action='store_true')
+    args = parser.parse_args(argv)
+
+    paths = generate_cheat_sheets(args.season, args.rankings_dir, args.adp_dir, args.output_dir, args.output_file,
+                                  [position.upper() for position in args.positions],
+                                  None if args.no_cache else args.cache_dir)
+    for path in paths:
+        print(f'Wrote {path}')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+import os
+import numpy as np
+import pandas as pd
+from data_collection.sleeper_harvest import read_harvest, HARVEST_DIRECTORY
+from league_analysis.league_analyzer import classify_formats, SCORING_FORMATS, LEAGUE_TYPES
+from data_storage.league_cleaning import read_clean_leagues
+
+__all__ = ['DraftPickTable', 'draft_formats']
+
+# Draft types whose pick order reflects player value; auction nomination order does not
+ORDERED_DRAFT_TYPES = ('snake', 'linear')
+
+
+def draft_formats(drafts):
+    """
+    Classifies drafts from their own metadata when the league settings are unavailable.
+
+    Sleeper's metadata.scoring_type holds values such as 'ppr', 'half_ppr', 'std',
+    'dynasty_ppr' and '2qb'; scoring defaults to PPR when it is not named.
+
+    Parameters:
+        drafts (pandas.DataFrame): Harvested drafts, see read_harvest('drafts').
+
+    Returns:
+        pandas.DataFrame: draft_id plus scoring, superflex and league_type coded like
+        league_analysis.classify_formats.
+    """
+    scoring_type = drafts['scoring_type'].fillna('').str.lower()
+    scoring = np.select([scoring_type.str.contains('half'), scoring_type.str.contains('std|standard')], [1, 0], 2)
+    return pd.DataFrame({
+        'draft_id': drafts['draft_id'].to_numpy(),
+        'scoring': scoring.astype(np.int8),
+        'superflex': ((drafts['superflex'].fillna(0).to_numpy() > 0) |
+                      scoring_type.str.contains('2qb|superflex').to_numpy()).astype(np.int8),
+        'league_type': np.where(scoring_type.str.contains('dynasty'), 2, 0).astype(np.int8),
+    })
+
+
+class DraftPickTable:
+    """
+    Compact, columnar table of draft picks for fast ADP aggregation.
+
+    Picks are held as NumPy arrays sorted by player, with each pick pointing at its
+    draft's row in a small draft table (format, team count and start time). A slice is
+    a boolean mask over drafts broadcast to picks, and the per-player statistics are
+    bincount and reduceat passes over the masked arrays, so any slice of tens of
+    millions of picks aggregates in seconds.
+
+    Parameters:
+        drafts (pandas.DataFrame): One row per draft with draft_id, teams, rounds,
+            start_time, type, scoring, superflex and league_type.
+        picks (pandas.DataFrame): draft_id, player_id, pick_no and is_keeper.
+    """
+
+    def __init__(self, drafts, picks):
+        self.drafts = drafts.reset_index(drop=True)
+        draft_rows = pd.Index(self.drafts['draft_id']).get_indexer(picks['draft_id'])
+        # Picks of unknown drafts or without a player (factorized to -1) are dropped
+        keep = (draft_rows >= 0) & picks['player_id'].notna().to_numpy()
+        player_codes, self.player_ids = pd.factorize(picks['player_id'].to_numpy()[keep], sort=True)
+        order = np.argsort(player_codes, kind='stable')
+        self.player_codes = player_codes[order].astype(np.int32)
+        self.draft_rows = draft_rows[keep][order].astype(np.int32)
+        self.pick_no = picks['pick_no'].to_numpy(dtype=np.float32)[keep][order]
+        self.is_keeper = picks['is_keeper'].fillna(False).to_numpy(dtype=bool)[keep][order]
+
+    @classmethod
+    def from_harvest(cls, directory=HARVEST_DIRECTORY, leagues_file=None, filters=None):
+        """
+        Loads the draft picks stored by SleeperHarvester(kinds=('drafts',)).
+
+        Parameters:
+            directory (str): Harvest directory.
+                - Defaults to 'data/sleeper_harvest'.
+            leagues_file (str, optional): Cleaned league file (data_storage.clean_leagues).
+                When given, scoring, superflex and league type come from the league
+                settings; otherwise from each draft's metadata.
+            filters (list, optional): pyarrow filters on both tables, e.g. [('season', '=', 2025)].
+        """
+        drafts = read_harvest('drafts', directory, filters)
+        picks = read_harvest('draft_picks', directory, filters)
+        formats = draft_formats(drafts)
+        if leagues_file is not None and os.path.exists(leagues_file):
+            league_ids = drafts['league_id'].unique().tolist()
+            leagues = classify_formats(read_clean_leagues(leagues_file, filters=[('league_id', 'in', league_ids)]))
+            by_league = drafts[['draft_id', 'league_id']].merge(leagues, on='league_id', how='inner')
+            formats = formats.set_index('draft_id')
+            formats.update(by_league.set_index('draft_id')[['scoring', 'superflex', 'league_type']])
+            formats = formats.reset_index()
+        drafts = drafts[['draft_id', 'season', 'type', 'teams', 'rounds', 'start_time']].merge(formats, on='draft_id')
+        return cls(drafts, picks[['draft_id', 'player_id', 'pick_no', 'is_keeper']])
+
+    def __len__(self):
+        return len(self.pick_no)
+
+    def _draft_mask(self, scoring, teams, superflex, league_type, season, start, end, min_rounds, draft_types):
+        drafts = self.drafts
+        mask = drafts['type'].isin(draft_types).to_numpy(copy=True)
+        if scoring is not None:
+            mask &= drafts['scoring'].isin([SCORING_FORMATS.index(s) for s in np.atleast_1d(scoring)]).to_numpy()
+        if league_type is not None:
+            mask &= drafts['league_type'].isin([LEAGUE_TYPES.index(t) for t in np.atleast_1d(league_type)]).to_numpy()
+        if teams is not None:
+            mask &= drafts['teams'].isin(np.atleast_1d(teams)).to_numpy()
+        if superflex is not None:
+            mask &= drafts['superflex'].astype(bool).to_numpy() == bool(superflex)
+        if season is not None:
+            mask &= drafts['season'].isin(np.atleast_1d(season)).to_numpy()
+        if min_rounds is not None:
+            mask &= drafts['rounds'].fillna(0).to_numpy() >= min_rounds
+        start_time = drafts['start_time'].fillna(0).to_numpy()
+        if start is not None:
+            mask &= start_time >= pd.Timestamp(start).value // 10 ** 6
+        if end is not None:
+            mask &= start_time < pd.Timestamp(end).value // 10 ** 6
+        return mask
+
+    def adp(self, scoring=None, teams=None, superflex=None, league_type=None, season=None, start=None, end=None,
+            min_rounds=None, draft_types=ORDERED_DRAFT_TYPES, include_keepers=False, min_drafts=1):
+        """
+        Computes ADP for one slice of drafts.
+
+        Parameters:
+            scoring (str or list, optional): 'standard', 'half' and/or 'ppr'.
+            teams (int or list, optional): Number of teams.
+            superflex (bool, optional): Superflex (or 2QB) drafts only, or none.
+            league_type (str or list, optional): 'redraft', 'keeper' and/or 'dynasty'.
+            season (int or list, optional): Season(s).
+            start (str or datetime, optional): Earliest draft start, e.g. '2025-08-01'.
+            end (str or datetime, optional): Drafts starting before this time.
+            min_rounds (int, optional): Skip shorter drafts, e.g. dynasty rookie drafts.
+            draft_types (tuple): Draft types included.
+                - Defaults to snake and linear drafts.
+            include_keepers (bool): Count keeper selections as picks.
+                - Defaults to False.
+            min_drafts (int): Players drafted in fewer drafts are left out.
+                - Defaults to 1.
+
+        Returns:
+            pandas.DataFrame: player_id, adp, min_pick, max_pick, stdev, drafts and
+            draft_rate (share of the slice's drafts selecting the player), sorted by ADP.
+        """
+        draft_mask = self._draft_mask(scoring, teams, superflex, league_type, season, start, end, min_rounds,
+                                      draft_types)
+        mask = draft_mask[self.draft_rows]
+        if not include_keepers:
+            mask &= ~self.is_keeper
+        codes = self.player_codes[mask]
+        picks = self.pick_no[mask].astype(np.float64)
+        columns = ['player_id', 'adp', 'min_pick', 'max_pick', 'stdev', 'drafts', 'draft_rate']
+        if not len(codes):
+            return pd.DataFrame(columns=columns)
+
+        size = len(self.player_ids)
+        counts = np.bincount(codes, minlength=size)
+        totals = np.bincount(codes, weights=picks, minlength=size)
+        squares = np.bincount(codes, weights=picks * picks, minlength=size)
+        players = np.flatnonzero(counts)
+        # Picks stay sorted by player after masking, so each player's picks are one contiguous run
+        starts = np.r_[0, np.cumsum(counts[players])[:-1]]
+        n = counts[players]
+        mean = totals[players] / n
+        variance = np.where(n > 1, (squares[players] - n * mean ** 2) / np.maximum(n - 1, 1), np.nan)
+        result = pd.DataFrame({
+            'player_id': self.player_ids[players],
+            'adp': mean,
+            'min_pick': np.minimum.reduceat(picks, starts).astype(np.int32),
+            'max_pick': np.maximum.reduceat(picks, starts).astype(np.int32),
+            'stdev': np.sqrt(np.clip(variance, 0, None)),
+            'drafts': n,
+            'draft_rate': n / int(draft_mask.sum()),
+        })
+        return result[result['drafts'] >= min_drafts].sort_values('adp', ignore_index=True)
@@ -1,10 +1,14 @@
 from .rapid_API import *
+from .rapid_API_bulk import *
 from .sleeper_API import *
+from .sleeper_harvest import *
 
 # Since we're importing everything, there's no need to manually list everything in __all__
 # However, it's good practice to explicitly define __all__ to control what's exposed
 
 __all__ = (
     rapid_API.__all__ + 
-    sleeper_API.__all__
-)
\ No newline at end of file
+    rapid_API_bulk.__all__ +
+    sleeper_API.__all__ +
+    sleeper_harvest.__all__
+)
@@ -1,16 +1,31 @@
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 import sleeper_API as sleeper
 import pandas as pd
-import os
+import numpy as np
 import json
 import matplotlib.pyplot as plt 
 import time
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
 import boto3
 from botocore.config import Config
+from data_storage.league_store import LeagueRecordBuffer, denormalize_league_frame
+from data_storage.league_cleaning import clean_leagues
+from data_storage.crawl_checkpoint import CrawlCheckpoint
+from data_storage.crawl_frontier import CrawlFrontier
+from data_storage.crawl_coordinator import CrawlCoordinator
+from data_storage.sqlite_frontier import SQLiteCrawlFrontier
+from data_storage.s3_sync import S3Sync
+from data_storage.id_set import Int64HashSet
+from utils.metrics import registry as metrics
 
 import warnings
 warnings.filterwarnings(action='ignore', category=FutureWarning)
 
-def get_league_IDs(initial_league_id='1095093570517798912', leagues_per_cycle=1000, plot_bool=False):
+def get_league_IDs(initial_league_id='1095093570517798912', leagues_per_cycle=1000, plot_bool=False, league_batch_size=1000, workers=1, frontier_backend='memory', memory_limit_mb=64, metrics_file=os.path.join('data', 'metrics', 'sleeper_crawl.prom'), metrics_port=None):
     """
     Retrieves and processes league IDs from the Sleeper fantasy football platform.
 
@@ -22,17 +37,39 @@ def get_league_IDs(initial_league_id='1095093570517798912', leagues_per_cycle=10
     Parameters:
         initial_league_id (str): The ID of the starting league to begin data collection. 
             - Defaults to '1095093570517798912'.
+        league_batch_size (int): Number of leagues buffered in memory before they are
+            flushed to the columnar league store.
+            - Defaults to 1000.
+        workers (int): Number of API requests kept in flight at once. Values above 1
+            use a thread pool; the shared rate limiter in sleeper_API keeps the total
+            under the per-minute budget.
+            - Defaults to 1.
+        frontier_backend (str): Where the user and league queues are kept. 'memory' holds
+            them in RAM and checkpoints them to a log; 'sqlite' keeps them in an on-disk
+            database so memory use does not grow with the crawl.
+            - Defaults to 'memory'.
+        memory_limit_mb (int): Page cache size of the 'sqlite' frontier. Together with
+            league_batch_size and leagues_per_cycle this bounds the crawler's peak memory.
+            - Defaults to 64.
+        metrics_file (str, optional): File the crawl metrics are written to in the
+            Prometheus text format after every cycle.
+            - Defaults to 'data/metrics/sleeper_crawl.prom'.
+        metrics_port (int, optional): If given, the metrics are also served at
+            http://127.0.0.1:<metrics_port>/metrics.
 
     Returns:
         tuple: A tuple containing:
-            - league_data (pandas.DataFrame): A dataframe containing all retrieved league information.
-            - league_queue (dict): A dictionary of leagues queued for processing.
-            - users_queried (list): A list of user IDs that have been queried.
-            - user_queue (list): A list of user IDs still queued for querying.
+            - league_store (LeagueRecordBuffer): The columnar store holding all retrieved league information.
+            - frontier (CrawlFrontier or SQLiteCrawlFrontier): The user and league queues with their seen-sets.
     """
     session = boto3.Session(profile_name='tw7')
     s3 = session.client('s3')
-    download_files_from_s3(s3, 'tw7-bucket-ffb', 'fantasy_leagues', 'data')
+    checkpoint_dir = os.path.join('data', 'fantasy_leagues')
+    s3_sync = S3Sync(s3, 'tw7-bucket-ffb', 'fantasy_leagues', checkpoint_dir)
+    try:
+        s3_sync.download()
+    except Exception as e:
+        print(f"Error downloading files: {e}")
     
     if plot_bool:
         ax1, ax2 = initialize_plot()
@@ -40,137 +77,568 @@ def get_league_IDs(initial_league_id='1095093570517798912', leagues_per_cycle=10
     last_save_time = time.time()
 
     # Initialize the function to pick up where it left off
-    league_data_csv = os.path.join('data', 'fantasy_leagues', 'sleeper_leagues.csv')
-    queue_csv = os.path.join('data', 'fantasy_leagues', 'sleeper_leagues_queue.json')
-    league_data, league_queue, users_queried, user_queue = initialize_league_query(league_data_csv, queue_csv, initial_league_id)
-
-    while (len(league_queue) > 0 or len(user_queue) > 0):
+    league_data_csv = os.path.join(checkpoint_dir, 'sleeper_leagues.csv')
+    league_store_dir = os.path.join(checkpoint_dir, 'sleeper_leagues')
+    queue_csv = os.path.join(checkpoint_dir, 'sleeper_leagues_queue.json')
+    index_file = os.path.join(checkpoint_dir, 'sleeper_leagues_index.npy')
+    league_store, frontier, checkpoint = initialize_league_query(
+        league_store_dir, checkpoint_dir, initial_league_id, queue_csv, index_file, league_data_csv, league_batch_size,
+        frontier_backend, memory_limit_mb)
+    crawl_metrics.start(league_store, frontier, metrics_file)
+    if metrics_port is not None:
+        metrics.serve(metrics_port)
+
+    executor = ThreadPoolExecutor(max_workers=workers) if workers > 1 else None
+    sleeper.configure_session(pool_size=max(workers, 10))
+
+    s3_uploads = []
+    while frontier.has_work():
         # Process queues
-        user_queue, users_queried, league_queue, league_data = search_user_queue(user_queue, users_queried, league_queue, league_data, leagues_per_cycle)
-        user_queue, users_queried, league_queue, league_data = search_league_queue(user_queue, users_queried, league_queue, league_data)
+        if executor is None:
+            frontier, league_store = search_user_queue(frontier, league_store, leagues_per_cycle)
+            frontier, league_store = search_league_queue(frontier, league_store)
+        else:
+            frontier, league_store = search_user_queue_concurrent(frontier, league_store, leagues_per_cycle, executor, workers)
+            frontier, league_store = search_league_queue_concurrent(frontier, league_store, executor, workers)
 
         # Save progress every cycle
-        last_save_time, lpm = save_progress(last_save_time, league_data, league_queue, users_queried, user_queue)
-        upload_directory_to_s3(s3, 'tw7-bucket-ffb', 'fantasy_leagues')
+        last_save_time, lpm = save_progress(last_save_time, league_store, frontier, checkpoint)
+        # Upload what changed this cycle while the next cycle runs
+        upload_to_s3_in_background(s3_sync, s3_uploads)
         
         # Update plots
         if plot_bool:
-            update_plot(ax1, ax2, len(league_data), len(user_queue), lpm)
-
-def initialize_league_query(league_data_csv, queue_csv, initial_league_id):
-    # Load the saved queue data to pick up where last left off
-    if os.path.exists(league_data_csv) and os.path.exists(queue_csv):
-        with open(league_data_csv, 'r') as f:
-            league_data = pd.read_csv(league_data_csv, low_memory=False)
-        with open(queue_csv, 'r') as f:
-            queue_data = json.load(f)
-            league_queue = queue_data['league_queue']
-            user_queue = queue_data['user_queue']
-            users_queried = queue_data['users_queried']
+            update_plot(ax1, ax2, len(league_store), len(frontier.user_queue), lpm)
+
+    try:
+        s3_sync.wait()
+    except Exception as e:
+        print(f"Error uploading directory: {e}")
+    return league_store, frontier
+
+def initialize_league_query(league_store_dir, checkpoint_dir, initial_league_id, queue_csv=None, index_file=None, league_data_csv=None, league_batch_size=1000, frontier_backend='memory', memory_limit_mb=64):
+    # Import leagues saved by older versions in the flattened CSV format
+    if league_data_csv is not None and os.path.exists(league_data_csv) and not os.path.exists(league_store_dir):
+        migrate_league_csv(league_data_csv, league_store_dir)
+    league_store = LeagueRecordBuffer(league_store_dir, batch_size=league_batch_size)
+    checkpoint = CrawlCheckpoint(checkpoint_dir)
+
+    # A disk-backed frontier is its own checkpoint; resume from it once it has been created
+    disk_frontier = None
+    if frontier_backend == 'sqlite':
+        disk_frontier = SQLiteCrawlFrontier(os.path.join(checkpoint_dir, 'crawl_frontier.sqlite'), memory_limit_mb)
+        if disk_frontier.exists():
+            discard_uncommitted_leagues(league_store, disk_frontier.load())
+            return league_store, disk_frontier, None
+    elif frontier_backend != 'memory':
+        raise ValueError(f"Unknown frontier backend: {frontier_backend!r}")
+
+    # Replay the checkpoint log to pick up where last left off
+    state = checkpoint.load()
+    if state is not None:
+        frontier, league_parts = state
+        discard_uncommitted_leagues(league_store, league_parts)
     else:
-        league_data = pd.DataFrame()
-        league_queue = {initial_league_id: sleeper.get_league_info(initial_league_id)}
-        user_queue = []
-        users_queried = []
-        
-    return league_data, league_queue, users_queried, user_queue
+        # Otherwise load the queue data saved by older versions, or start a new crawl
+        if len(league_store) > 0 and queue_csv is not None and os.path.exists(queue_csv):
+            with open(queue_csv, 'r') as f:
+                queue_data = json.load(f)
+                league_queue = queue_data['league_queue']
+                user_queue = list(dict.fromkeys(queue_data['user_queue']))
+                users_queried = queue_data['users_queried']
+        else:
+            league_queue = {initial_league_id: sleeper.get_league_info(initial_league_id, ttl=None)}
+            user_queue = []
+            users_queried = []
+        frontier = CrawlFrontier(user_queue, user_queue + users_queried, league_queue,
+                                 load_league_index(index_file, league_store), len(users_queried))
+        league_parts = [os.path.basename(path) for path in league_store.part_files()]
+        if disk_frontier is None:
+            checkpoint.compact(frontier, league_parts)
+
+    # Move an in-memory crawl into a new disk-backed frontier
+    if disk_frontier is not None:
+        disk_frontier.import_frontier(frontier, league_parts)
+        print(f'Moved crawl frontier to {disk_frontier.path}')
+        return league_store, disk_frontier, None
+
+    return league_store, frontier, checkpoint
+
+def discard_uncommitted_leagues(league_store, league_parts):
+    # Drop league chunks flushed after the last checkpoint; their leagues are still queued
+    removed = league_store.discard_uncommitted(league_parts)
+    if removed:
+        print(f'Discarded {removed:,} league chunks written after the last checkpoint')
+
+def migrate_league_csv(league_data_csv, league_store_dir, chunksize=50000):
+    """
+    Converts a legacy flattened sleeper_leagues.csv into the columnar league store.
+
+    The CSV is streamed in chunks so the conversion runs in bounded memory.
 
-def search_user_queue(user_queue, users_queried, league_queue, league_data, leagues_per_cycle):
+    Parameters:
+        league_data_csv (str): Path to the legacy leagues CSV.
+        league_store_dir (str): Directory of the league store to create.
+        chunksize (int): Number of CSV rows converted per chunk.
+            - Defaults to 50000.
+    """
+    print(f'Migrating {league_data_csv} to {league_store_dir}')
+    league_store = LeagueRecordBuffer(league_store_dir, batch_size=chunksize)
+    for chunk in pd.read_csv(league_data_csv, chunksize=chunksize, low_memory=False):
+        league_store.extend(denormalize_league_frame(chunk))
+    league_store.flush()
+    print(f'Migrated {len(league_store):,} Leagues')
+
+def load_league_index(index_file, league_store=None):
+    """
+    Loads the set of league IDs that have already been captured.
+
+    The index is stored as a sorted int64 array next to the other checkpoint files, so
+    restoring it does not require reading the stored leagues. If no index has been saved
+    yet (checkpoints from before the index was added), it is rebuilt once from the league
+    store's league_id column.
+
+    Parameters:
+        index_file (str): Path to the saved .npy league index, if any.
+        league_store (LeagueRecordBuffer, optional): League store used as a fallback source.
+
+    Returns:
+        Int64HashSet: The captured league IDs, for O(1) membership checks.
+    """
+    if index_file is not None and os.path.exists(index_file):
+        league_ids = np.load(index_file)
+    elif league_store is not None and len(league_store) > 0:
+        league_ids = league_store.read(columns=['league_id'])['league_id'].values
+    else:
+        league_ids = np.array([], dtype=np.int64)
+    return Int64HashSet(league_ids)
+
+def search_user_queue(frontier, league_store, leagues_per_cycle):
     # Cycle through queued users to find new unique leagues
     current_query_count = 0
-    current_query_total = len(user_queue)
-    while len(league_queue) < leagues_per_cycle and len(user_queue) > 0:
+    current_query_total = len(frontier.user_queue)
+    while len(frontier.league_queue) < leagues_per_cycle and len(frontier.user_queue) > 0:
         # Pop from the user queue and print status update
-        user_id = user_queue.pop(0)
-        users_queried.append(user_id)
+        user_id, = frontier.pop_users(1)
         current_query_count += 1
         # Connect to sleeper API to get al leagues for the user
         try:
-            user_leagues = sleeper.get_user_leagues(user_id)
-            user_leagues = {
-                league['league_id']: league
-                for league in user_leagues
-                if int(league['league_id']) not in list(map(int, league_data.league_id.values))
-            }
-            league_queue.update(user_leagues)
+            frontier.push_leagues(sleeper.get_user_leagues(user_id))
         except Exception as e:
             print()
             print(f'League Processing Error: {e}')
             continue
-        print(f'\rProcessing User Queue | Progress: {current_query_count:,}/{current_query_total:,} | Unique Leagues Found: {len(league_queue):,}', end='', flush=True)
+        print(f'\rProcessing User Queue | Progress: {current_query_count:,}/{current_query_total:,} | Unique Leagues Found: {len(frontier.league_queue):,}', end='', flush=True)
     print()
-    print(f'Leagues Queued: {len(league_queue):,}')
+    print(f'Leagues Queued: {len(frontier.league_queue):,}')
     
-    return user_queue, users_queried, league_queue, league_data
+    return frontier, league_store
 
-def search_league_queue(user_queue, users_queried, league_queue, league_data):
+def search_league_queue(frontier, league_store):
     # Cycle through each queued league to get set of unique users
     current_query_count = 0
-    current_query_total = len(league_queue)
-    original_user_queue_length = len(user_queue)
-    while len(league_queue) > 0:
-        # Pop from the leageu queue and print status update
-        league_id = next(iter(league_queue))
+    current_query_total = len(frontier.league_queue)
+    users_added = 0
+    while len(frontier.league_queue) > 0:
+        # Pop from the league queue and print status update
+        (league_id, league), = frontier.pop_leagues(1)
         current_query_count += 1
-        league_data = pd.concat([league_data, pd.json_normalize(league_queue.pop(league_id)).convert_dtypes()], ignore_index=True)
+        league_store.append(league)
         # Query sleeper API for all users in each league
         try:
-            league_users = sleeper.get_league_users(league_id)
-            league_users = [user['user_id'] for user in league_users]
-            user_queue.extend(league_users)
+            league_users = sleeper.get_league_users(league_id, ttl=None)
+            users_added += frontier.push_users(user['user_id'] for user in league_users)
         except Exception as e:
             print()
             print(f'User Processing Error: {e}')
             continue
-        print(f'\rProcessing League Queue | Progress: {current_query_count:,}/{current_query_total:,} | Total Users in Leagues: {len(user_queue)-original_user_queue_length:,} | Total League Count: {len(league_data):,}', end='', flush=True)
-    user_queue = list(set(user_queue))
+        print(f'\rProcessing League Queue | Progress: {current_query_count:,}/{current_query_total:,} | Unique Users Added: {users_added:,} | Total League Count: {len(league_store):,}', end='', flush=True)
     print()
-    print(f'Total Users Queued: {len(user_queue):,} | Unique Users Added: {len(user_queue)-original_user_queue_length:,} | Total Users Discovered: {len(user_queue) + len(users_queried):,}')
+    print(f'Total Users Queued: {len(frontier.user_queue):,} | Unique Users Added: {users_added:,} | Total Users Discovered: {len(frontier.seen_users):,}')
     
-    return user_queue, users_queried, league_queue, league_data
+    return frontier, league_store
+
+def _call_safely(api_function, arg):
+    # Run an uncached API call in a worker thread, handing any exception back to the caller.
+    # call_API returns None on a 404 or once its retries run out, which is an error here too.
+    try:
+        result = api_function(arg, ttl=None)
+    except Exception as e:
+        return None, e
+    if result is None:
+        return None, ValueError(f'No response from {api_function.__name__} for {arg}')
+    return result, None
 
-def save_progress(last_save_time, league_data, league_queue, users_queried, user_queue):
+def search_user_queue_concurrent(frontier, league_store, leagues_per_cycle, executor, workers):
+    """
+    Concurrent version of search_user_queue.
+
+    Users are taken from the front of the queue in batches and their leagues are
+    requested in parallel on the executor. Results are merged in queue order on the
+    calling thread, so the frontier and checkpoint see the same mutations as the serial
+    crawl. The cycle may overshoot leagues_per_cycle by up to one batch.
+
+    Parameters:
+        executor (concurrent.futures.Executor): Pool used to run the API calls.
+        workers (int): Number of requests kept in flight; batches are a small multiple of this.
+    """
+    current_query_count = 0
+    current_query_total = len(frontier.user_queue)
+    batch_size = workers * 4
+    while len(frontier.league_queue) < leagues_per_cycle and len(frontier.user_queue) > 0:
+        user_batch = frontier.pop_users(batch_size)
+        for user_leagues, error in executor.map(_call_safely, [sleeper.get_user_leagues] * len(user_batch), user_batch):
+            current_query_count += 1
+            try:
+                if error is not None:
+                    raise error
+                frontier.push_leagues(user_leagues)
+            except Exception as e:
+                print()
+                print(f'League Processing Error: {e}')
+                continue
+        print(f'\rProcessing User Queue | Progress: {current_query_count:,}/{current_query_total:,} | Unique Leagues Found: {len(frontier.league_queue):,}', end='', flush=True)
+    print()
+    print(f'Leagues Queued: {len(frontier.league_queue):,}')
+
+    return frontier, league_store
+
+def search_league_queue_concurrent(frontier, league_store, executor, workers):
+    """
+    Concurrent version of search_league_queue.
+
+    League members are requested in parallel on the executor in batches, while storing
+    leagues and queueing users stay on the calling thread.
+
+    Parameters:
+        executor (concurrent.futures.Executor): Pool used to run the API calls.
+        workers (int): Number of requests kept in flight; batches are a small multiple of this.
+    """
+    current_query_count = 0
+    current_query_total = len(frontier.league_queue)
+    users_added = 0
+    batch_size = workers * 4
+    while len(frontier.league_queue) > 0:
+        league_batch = frontier.pop_leagues(batch_size)
+        league_store.extend(league for _, league in league_batch)
+        league_ids = [league_id for league_id, _ in league_batch]
+        for league_users, error in executor.map(_call_safely, [sleeper.get_league_users] * len(league_ids), league_ids):
+            current_query_count += 1
+            try:
+                if error is not None:
+                    raise error
+                users_added += frontier.push_users(user['user_id'] for user in league_users)
+            except Exception as e:
+                print()
+                print(f'User Processing Error: {e}')
+                continue
+        print(f'\rProcessing League Queue | Progress: {current_query_count:,}/{current_query_total:,} | Unique Users Added: {users_added:,} | Total League Count: {len(league_store):,}', end='', flush=True)
+    print()
+    print(f'Total Users Queued: {len(frontier.user_queue):,} | Unique Users Added: {users_added:,} | Total Users Discovered: {len(frontier.seen_users):,}')
+
+    return frontier, league_store
+
+class CrawlMetrics:
+    """
+    Crawler metrics computed from real counts at every save.
+
+    Queue depths, seen-set sizes, league counts and checkpoint durations are recorded in
+    the shared metrics registry, next to the per-endpoint request metrics from sleeper_API.
+    Each cycle also reports rates over the cycle: leagues per minute from the change in
+    stored leagues, requests per second, the share of 429 responses, and dedup hit rates
+    (the share of discovered users and leagues that had already been seen).
+    """
+
+    def __init__(self):
+        self.leagues_captured = metrics.gauge('crawl_leagues_captured', 'Leagues stored in the league store.')
+        self.queue_depth = metrics.gauge('crawl_queue_depth', 'Users or leagues waiting in the crawl frontier.')
+        self.seen = metrics.gauge('crawl_seen_ids', 'Distinct users or leagues discovered.')
+        self.discovered = metrics.counter('crawl_discovered_total', 'Users and leagues discovered by kind and result (new, duplicate).')
+        self.checkpoint_duration = metrics.histogram('crawl_checkpoint_duration_seconds', 'Time spent flushing and checkpointing a cycle.')
+        self.leagues_per_minute = metrics.gauge('crawl_leagues_per_minute', 'Leagues stored per minute over the last cycle.')
+        self.metrics_file = None
+        self._previous = None
+
+    def start(self, league_store, frontier, metrics_file=None):
+        # Take the baseline the first cycle's rates are measured against
+        self.metrics_file = metrics_file
+        self._previous = self._snapshot(league_store, frontier)
+
+    @staticmethod
+    def _snapshot(league_store, frontier):
+        responses = sleeper.request_count
+        return {
+            'time': time.time(),
+            'leagues': len(league_store),
+            'requests': responses.value(),
+            'rate_limited': responses.value(status=429),
+            'users': len(frontier.seen_users),
+            'duplicate_users': frontier.duplicate_users,
+            'leagues_seen': len(frontier.league_index) + len(frontier.league_queue),
+            'duplicate_leagues': frontier.duplicate_leagues,
+        }
+
+    def record_cycle(self, league_store, frontier, checkpoint_seconds):
+        """
+        Records the state after a save and returns the rates over the cycle.
+
+        Returns:
+            dict: leagues_per_minute, requests_per_second, rate_limited_share,
+            duplicate_user_share and duplicate_league_share.
+        """
+        current = self._snapshot(league_store, frontier)
+        previous = self._previous or current
+        self._previous = current
+        elapsed = max(current['time'] - previous['time'], 1e-9)
+        delta = {key: current[key] - previous[key] for key in current}
+
+        self.checkpoint_duration.observe(checkpoint_seconds)
+        self.leagues_captured.set(current['leagues'])
+        self.queue_depth.set(len(frontier.user_queue), queue='users')
+        self.queue_depth.set(len(frontier.league_queue), queue='leagues')
+        self.seen.set(current['users'], kind='users')
+        self.seen.set(current['leagues_seen'], kind='leagues')
+        self.discovered.inc(delta['users'], kind='users', result='new')
+        self.discovered.inc(delta['duplicate_users'], kind='users', result='duplicate')
+        self.discovered.inc(delta['leagues_seen'], kind='leagues', result='new')
+        self.discovered.inc(delta['duplicate_leagues'], kind='leagues', result='duplicate')
+
+        rates = {
+            'leagues_per_minute': delta['leagues'] / (elapsed / 60),
+            'requests_per_second': delta['requests'] / elapsed,
+            'rate_limited_share': delta['rate_limited'] / delta['requests'] if delta['requests'] else 0.0,
+            'duplicate_user_share': delta['duplicate_users'] / max(delta['users'] + delta['duplicate_users'], 1),
+            'duplicate_league_share': delta['duplicate_leagues'] / max(delta['leagues_seen'] + delta['duplicate_leagues'], 1),
+        }
+        self.leagues_per_minute.set(rates['leagues_per_minute'])
+        if self.metrics_file is not None:
+            metrics.write(self.metrics_file)
+        return rates
+
+# Shared by the crawl functions so rates carry over from one cycle to the next
+crawl_metrics = CrawlMetrics()
+
+def save_progress(last_save_time, league_store, frontier, checkpoint):
     """
     Saves the current progress of league and user data retrieval to disk.
 
-    This function ensures that progress is preserved by saving the league data
-    and the current state of the queues to disk in a structured format. It also
-    logs the number of leagues captured and calculates the rate of league processing.
+    This function ensures that progress is preserved by flushing buffered leagues
+    to the columnar league store and appending the changes to the frontier since the
+    last save to the checkpoint log, so the cost of a save depends only on the work
+    done in the cycle. It also logs the number of leagues captured and records the
+    cycle's throughput in crawl_metrics.
 
     Parameters:
         last_save_time (float): The timestamp of the last save operation.
-        league_data (pandas.DataFrame): A dataframe containing all retrieved league information.
-        league_queue (dict): A dictionary of leagues queued for processing.
-        users_queried (list): A list of user IDs that have been queried.
-        user_queue (list): A list of user IDs still queued for querying.
+        league_store (LeagueRecordBuffer): The columnar store holding all retrieved league information.
+        frontier (CrawlFrontier or SQLiteCrawlFrontier): The user and league queues with their seen-sets.
+        checkpoint (CrawlCheckpoint): The incremental checkpoint the changes are logged to,
+            or None when the frontier is disk-backed and commits itself.
 
     Returns:
         tuple: A tuple containing:
             - current_time (float): The updated timestamp of the save operation.
-            - processing_rate (float): The calculated rate of leagues processed per minute since the last save.
+            - processing_rate (float): The number of leagues stored per minute since the last save.
     """
-    # Create Data folder if it does not exist
-    directory = os.path.join('data', 'fantasy_leagues')
-    league_data_file = os.path.join(directory, 'sleeper_leagues.csv')
-    queue_data_file = os.path.join(directory, 'sleeper_leagues_queue.json')
-    if not os.path.exists(directory):
-        os.makedirs(directory)
-    league_data = league_data.drop(columns=[col for col in league_data.columns if col.startswith('Unnamed')])
-    league_data.to_csv(league_data_file)
-    queue_dict = {'league_queue': league_queue, 'users_queried': users_queried, 'user_queue': user_queue}
-    with open(queue_data_file, 'w') as f:
-        json.dump(queue_dict, f)
+    # Flush new leagues before logging the cycle so the log never references missing data
+    checkpoint_start = time.perf_counter()
+    league_store.flush()
+    if checkpoint is None:
+        frontier.commit(league_store)
+    else:
+        checkpoint.save(league_store, frontier)
+        if checkpoint.maybe_compact(frontier):
+            print('Compacted checkpoint log into a new snapshot')
+    checkpoint_seconds = time.perf_counter() - checkpoint_start
+    rates = crawl_metrics.record_cycle(league_store, frontier, checkpoint_seconds)
     time_since_last_save = (time.time() - last_save_time) / 60 # in minutes
     print()
-    print(f'Saved Progress | {len(league_data):,} Leagues Captured')
-    print(f'Time since last save: {time_since_last_save:.2f} minutes | {1000 / time_since_last_save:.2f} Leagues/min')
+    print(f'Saved Progress | {len(league_store):,} Leagues Captured | Checkpoint: {checkpoint_seconds:.2f}s')
+    print(f'Time since last save: {time_since_last_save:.2f} minutes | {rates["leagues_per_minute"]:.2f} Leagues/min')
+    print(f'Requests/sec: {rates["requests_per_second"]:.2f} | 429 Rate: {rates["rate_limited_share"]:.2%} | '
+          f'Duplicate Users: {rates["duplicate_user_share"]:.2%} | Duplicate Leagues: {rates["duplicate_league_share"]:.2%}')
     print()
-    return time.time(), 1000 / time_since_last_save
+    return time.time(), rates['leagues_per_minute']
+
+def get_league_IDs_sharded(num_shards=4, initial_league_id='1095093570517798912', batch_size=1000, workers=4, calls_per_minute=1000, restart_delay=10):
+    """
+    Runs the league crawl as one worker process per shard.
+
+    User and league IDs are partitioned across shards by hash and coordinated through a
+    shared CrawlCoordinator database next to the other checkpoint files. Each worker has
+    its own rate limiter, session and league store, so throughput grows with the number
+    of workers as long as the combined request rate fits the available IP budgets. A
+    worker that dies is restarted without stopping the others, and the whole crawl
+    resumes from the coordinator when this function is run again.
+
+    On the first run the coordinator is seeded from an existing single-process crawl,
+    either its SQLite frontier or its checkpoint log, so a running crawl can be switched
+    to sharded mode without re-storing the leagues it already captured.
+
+    Parameters:
+        num_shards (int): Number of worker processes. Fixed for the lifetime of a crawl.
+            - Defaults to 4.
+        initial_league_id (str): The league to start a new crawl from.
+        batch_size (int): Number of users or leagues a worker leases at a time.
+            - Defaults to 1000.
+        workers (int): Number of requests each worker keeps in flight.
+            - Defaults to 4.
+        calls_per_minute (int): Rate limit of each worker. Workers sharing an IP address
+            should split that address's budget between them.
+            - Defaults to 1000.
+        restart_delay (float): Seconds to wait before restarting a failed worker.
+            - Defaults to 10.
+
+    Returns:
+        dict: Per-shard progress from CrawlCoordinator.progress().
+    """
+    checkpoint_dir = os.path.join('data', 'fantasy_leagues')
+    coordinator_path = os.path.join(checkpoint_dir, 'crawl_coordinator.sqlite')
+    league_store_dir = os.path.join(checkpoint_dir, 'sleeper_leagues')
+    coordinator = CrawlCoordinator(coordinator_path, num_shards)
+    if all(sum(counts.values()) == 0 for counts in coordinator.progress().values()):
+        seed_coordinator(coordinator, checkpoint_dir, initial_league_id, league_store_dir)
+
+    context = multiprocessing.get_context('spawn')
+    def start(shard):
+        process = context.Process(target=crawl_shard, name=f'crawl-shard-{shard}', args=(
+            shard, num_shards, coordinator_path, league_store_dir, batch_size, workers, calls_per_minute, 5,
+            os.path.join('data', 'metrics', f'sleeper_crawl_shard_{shard:03d}.prom')))
+        process.start()
+        return process
+
+    processes = {shard: start(shard) for shard in range(num_shards)}
+    while processes:
+        time.sleep(restart_delay)
+        for shard, process in list(processes.items()):
+            if process.is_alive():
+                continue
+            if process.exitcode == 0:
+                del processes[shard]
+            else:
+                print(f'Shard {shard} exited with code {process.exitcode}, restarting')
+                processes[shard] = start(shard)
+        progress = coordinator.progress()
+        print(f'Sharded Crawl | Leagues Captured: {sum(p["leagues_captured"] for p in progress.values()):,} | '
+              f'Users Queried: {sum(p["users_queried"] for p in progress.values()):,} | '
+              f'Users Queued: {sum(p["users_queued"] for p in progress.values()):,}')
+
+    progress = coordinator.progress()
+    coordinator.close()
+    return progress
+
+def seed_coordinator(coordinator, checkpoint_dir, initial_league_id, league_store_dir=None):
+    # Start the sharded crawl from a single-process crawl (SQLite frontier or checkpoint log) if one exists,
+    # otherwise from the initial league
+    frontier_path = os.path.join(checkpoint_dir, 'crawl_frontier.sqlite')
+    disk_frontier = SQLiteCrawlFrontier(frontier_path) if os.path.exists(frontier_path) else None
+    if disk_frontier is not None and disk_frontier.exists():
+        leagues, user_ids, captured_league_ids, seen_user_ids = disk_frontier.export_state()
+        league_parts = disk_frontier.load()
+        disk_frontier.close()
+        source = 'SQLite frontier'
+    else:
+        if disk_frontier is not None:
+            disk_frontier.close()
+        state = CrawlCheckpoint(checkpoint_dir).load()
+        if state is None:
+            coordinator.seed([sleeper.get_league_info(initial_league_id, ttl=None)])
+            return
+        frontier, league_parts = state
+        leagues, user_ids = list(frontier.league_queue.values()), frontier.user_queue
+        captured_league_ids, seen_user_ids = frontier.league_index.to_array().tolist(), frontier.seen_users.to_array().tolist()
+        source = 'checkpoint'
+    # Leagues flushed after the last commit are still queued and would be stored twice
+    if league_store_dir is not None:
+        discard_uncommitted_leagues(LeagueRecordBuffer(league_store_dir), league_parts)
+    coordinator.seed(leagues, user_ids, captured_league_ids, seen_user_ids)
+    print(f'Seeded sharded crawl from {source} | {len(captured_league_ids):,} Leagues Captured')
+
+def crawl_shard(shard, num_shards, coordinator_path, league_store_dir, batch_size=1000, workers=4, calls_per_minute=None, idle_wait=5, metrics_file=None):
+    """
+    Crawls one shard of a sharded league crawl until no shard has work left.
+
+    The worker leases batches of its shard's leagues (preferred, to keep the league
+    queue short) or users from the coordinator, queries the Sleeper API, and reports
+    the users and leagues found. Leagues are written to the shard's own league store
+    under league_store_dir/shard-NNN before their batch is reported, so the store and
+    the coordinator always agree. Readers of the shared league store (clean_leagues,
+    load_harvest_targets) include the shard stores. The worker can be killed and
+    restarted at any time.
+
+    Parameters:
+        shard (int): The shard crawled by this worker.
+        num_shards (int): Total number of shards.
+        coordinator_path (str): Path of the shared CrawlCoordinator database.
+        league_store_dir (str): Directory holding the per-shard league stores.
+        batch_size (int): Number of users or leagues leased at a time.
+            - Defaults to 1000.
+        workers (int): Number of requests kept in flight.
+            - Defaults to 4.
+        calls_per_minute (int, optional): Rate limit for this worker's process.
+        idle_wait (float): Seconds to wait when the shard is idle but others still have work.
+            - Defaults to 5.
+        metrics_file (str, optional): File this worker's request metrics are written to
+            after every batch.
+    """
+    if calls_per_minute is not None:
+        sleeper.set_rate_limit(calls_per_minute)
+    sleeper.configure_session(pool_size=max(workers, 10))
+    coordinator = CrawlCoordinator(coordinator_path, num_shards)
+    requeued = coordinator.reset_leases(shard)
+    if requeued:
+        print(f'Shard {shard} | Requeued {requeued:,} unfinished users and leagues')
+    league_store = LeagueRecordBuffer(os.path.join(league_store_dir, f'shard-{shard:03d}'), batch_size=batch_size)
+    discard_uncommitted_leagues(league_store, coordinator.league_parts(shard))
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        while True:
+            leagues = coordinator.lease_leagues(shard, batch_size)
+            if leagues:
+                # Store the batch first; its part file is committed with the batch below
+                existing_parts = set(league_store.part_files())
+                league_store.extend(league for _, league in leagues)
+                league_store.flush()
+                new_parts = [os.path.basename(path) for path in league_store.part_files() if path not in existing_parts]
+                league_ids = [league_id for league_id, _ in leagues]
+                user_ids = []
+                for league_users, error in executor.map(_call_safely, [sleeper.get_league_users] * len(league_ids), league_ids):
+                    if error is not None:
+                        print(f'Shard {shard} | User Processing Error: {error}')
+                        continue
+                    user_ids.extend(user['user_id'] for user in league_users)
+                added = coordinator.complete_leagues(shard, league_ids, user_ids, new_parts)
+                print(f'Shard {shard} | Leagues Stored: {len(league_ids):,} | Unique Users Added: {added:,} | Total League Count: {len(league_store):,}')
+                if metrics_file is not None:
+                    metrics.write(metrics_file)
+                continue
+
+            user_ids = coordinator.lease_users(shard, batch_size)
+            if user_ids:
+                found_leagues = []
+                for user_leagues, error in executor.map(_call_safely, [sleeper.get_user_leagues] * len(user_ids), user_ids):
+                    if error is not None:
+                        print(f'Shard {shard} | League Processing Error: {error}')
+                        continue
+                    found_leagues.extend(user_leagues)
+                added = coordinator.complete_users(user_ids, found_leagues)
+                print(f'Shard {shard} | Users Queried: {len(user_ids):,} | Unique Leagues Found: {added:,}')
+                if metrics_file is not None:
+                    metrics.write(metrics_file)
+                continue
+
+            # Other shards may still queue work for this one
+            if coordinator.is_finished():
+                break
+            time.sleep(idle_wait)
+    coordinator.close()
 
 def upload_directory_to_s3(s3, bucket_name, local_directory):
     """
     Uploads a directory and its contents to an S3 bucket, preserving the full folder structure as S3 prefixes.
 
+    Only files that changed since the previous upload are sent, in parallel; see S3Sync.
+
     Args:
         s3 (boto3.client): An initialized S3 client.
         bucket_name (str): Name of the S3 bucket.
@@ -178,25 +646,39 @@ def upload_directory_to_s3(s3, bucket_name, local_directory):
     """
     print('Uploading Files to S3:')
     try:
-        for root, _, files in os.walk(local_directory):
-            for file in files:
-                # Construct full local file path
-                local_file_path = os.path.join(root, file)
-
-                # Use os.path.relpath for relative paths to ensure portability
-                s3_file_key = os.path.relpath(local_file_path, local_directory).replace(os.sep, "/")
-                
-                # Upload the file
-                s3.upload_file(local_file_path, bucket_name, s3_file_key)
-                print(f"  Uploaded {local_file_path} to s3://{bucket_name}/{s3_file_key}")
+        S3Sync(s3, bucket_name, '', local_directory).upload()
     except Exception as e:
         print(f"Error uploading directory: {e}")
         
+def upload_to_s3_in_background(s3_sync, uploads):
+    """
+    Starts a background upload of the crawl directory without letting S3 errors stop the crawl.
+
+    Failures of earlier background passes are reported once they have finished, and an
+    error starting the new pass (e.g. listing the bucket with bad credentials) is printed
+    like upload_directory_to_s3 does.
+
+    Args:
+        s3_sync (S3Sync): The crawl directory's sync.
+        uploads (list): Background passes not yet reported, updated in place.
+    """
+    for upload in [upload for upload in uploads if upload.done()]:
+        uploads.remove(upload)
+        if not upload.cancelled() and upload.exception() is not None:
+            print(f"Error uploading directory: {upload.exception()}")
+    try:
+        uploads.append(s3_sync.upload_in_background())
+    except Exception as e:
+        print(f"Error uploading directory: {e}")
+
 def download_files_from_s3(s3, bucket_name, s3_prefix, local_directory):
     """
     Downloads all files from an S3 prefix and saves them into a specified local directory,
     preserving the prefix and filenames.
 
+    Listings are paginated and files already present with the same content are skipped;
+    see S3Sync.
+
     Args:
         s3 (boto3.client): An initialized S3 client.
         bucket_name (str): Name of the S3 bucket.
@@ -208,40 +690,25 @@ def download_files_from_s3(s3, bucket_name, s3_prefix, local_directory):
         # Normalize the base local directory path
         base_local_directory = os.path.normpath(os.path.join(local_directory, s3_prefix.strip('/').replace("/", "_")))
         os.makedirs(base_local_directory, exist_ok=True)
-
-        # List all objects under the given prefix
-        response = s3.list_objects_v2(Bucket=bucket_name, Prefix=s3_prefix)
-
-        if 'Contents' not in response:
-            print(f"No files found under prefix '{s3_prefix}' in bucket '{bucket_name}'.")
-            return
-
-        # Download all files
-        for obj in response['Contents']:
-            s3_file_key = obj['Key']
-
-            # Use relative paths and normalize them for the local system
-            relative_path = os.path.normpath(s3_file_key[len(s3_prefix):].lstrip('/'))
-            local_file_path = os.path.normpath(os.path.join(base_local_directory, relative_path))
-
-            # Ensure local directories exist
-            os.makedirs(os.path.dirname(local_file_path), exist_ok=True)
-
-            # Download the file
-            s3.download_file(bucket_name, s3_file_key, local_file_path)
-            print(f"  Downloaded {s3_file_key} to {local_file_path}")
-    
+        S3Sync(s3, bucket_name, s3_prefix, base_local_directory).download()
     except Exception as e:
         print(f"Error downloading files: {e}")
 
 def initialize_plot():
     # Initialize plot
     plt.ion()  # Turn on interactive mode
-    _, (ax1, ax2) = plt.subplots(2, 1, figsize=(10, 13))  # Create two vertically stacked subplots
-    ax1.plot([], [], 'o-', label='User Queue Points')  # Initial empty scatter plot
+    figure, (ax1, ax2) = plt.subplots(2, 1, figsize=(10, 13))  # Create two vertically stacked subplots
+    ax1.plot([], [], 'o-', label='League ID Gathering Status')
+    ax1.set_xlabel('Leagues Captured')
+    ax1.set_ylabel('User IDs Queued')
+    ax1.set_title('Leagues Captured vs. User ID Queue Size')
     ax1.grid(True)
-    ax2.plot([], [], 'o-', label='LPM Points', color='orange')  # Initial empty scatter plot
+    ax2.plot([], [], 'o-', label='Leagues Found per Minute', color='orange')
+    ax2.set_xlabel('Total Leagues Captured')
+    ax2.set_ylabel('Leagues/Minute')
+    ax2.set_title('League Capture Rate Monitor')
     ax2.grid(True)
+    figure.show()
     
     return ax1, ax2
 
@@ -253,7 +720,9 @@ def update_plot(ax1, ax2, new_x, new_y, lpm):
     1. A plot showing the number of user IDs queued versus leagues captured.
     2. A plot monitoring the rate of league capture (leagues per minute).
 
-    It recalculates the data, clears the plots, and redraws them with the latest information.
+    The new points are appended to the existing lines and the figure is redrawn
+    without blocking, so monitoring does not stall the crawl. For headless runs use
+    the metrics file written by save_progress instead.
 
     Parameters:
         ax1 (matplotlib.axes.Axes): The first subplot for league-to-user data visualization.
@@ -265,64 +734,52 @@ def update_plot(ax1, ax2, new_x, new_y, lpm):
     Returns:
         None
     """
-    # Update main chart (ax1)
-    line1 = ax1.lines[0] if ax1.lines else None
-    if line1:
-        x_data1 = list(line1.get_xdata())
-        y_data1 = list(line1.get_ydata())
-    else:
-        x_data1 = []
-        y_data1 = []
-    # Append new data point
-    x_data1.append(new_x)
-    y_data1.append(new_y)
-
-    # Calculate the slope for ax1
-    if len(x_data1) > 1:
-        x1, y1 = x_data1[-2], y_data1[-2]
-        x2, y2 = x_data1[-1], y_data1[-1]
-        slope1 = (y2 - y1) / (x2 - x1) if x2 != x1 else 0
-        slope_text1 = f"{slope1:.2f} New Users Found/League Captured"
-    else:
-        slope_text1 = ""
-
-    # Clear and re-plot ax1
-    ax1.clear()
-    ax1.plot(x_data1, y_data1, 'o-', label='League ID Gathering Status')
-    ax1.set_xlabel('Leagues Captured')
-    ax1.set_ylabel('User IDs Queued')
-    ax1.set_title('Leagues Captured vs. User ID Queue Size')
-    ax1.grid(True)
-    ax1.legend([slope_text1], loc='best')
-
-    # Update subplot for lpm (ax2)
-    line2 = ax2.lines[0] if ax2.lines else None
-    if line2:
-        x_data2 = list(line2.get_xdata())
-        y_data2 = list(line2.get_ydata())
-    else:
-        x_data2 = []
-        y_data2 = []
+    # Append the new points to both lines
+    line1, line2 = ax1.lines[0], ax2.lines[0]
+    x_data1 = np.append(line1.get_xdata(), new_x)
+    y_data1 = np.append(line1.get_ydata(), new_y)
+    line1.set_data(x_data1, y_data1)
+    line2.set_data(np.append(line2.get_xdata(), new_x), np.append(line2.get_ydata(), lpm))
+
+    # Slope of the latest segment for ax1
+    if len(x_data1) > 1 and x_data1[-1] != x_data1[-2]:
+        slope1 = (y_data1[-1] - y_data1[-2]) / (x_data1[-1] - x_data1[-2])
+        ax1.legend([f"{slope1:.2f} New Users Found/League Captured"], loc='best')
+
+    for ax in (ax1, ax2):
+        ax.relim()
+        ax.autoscale_view()
+
+    # Redraw when the GUI is idle and process its events without sleeping
+    figure = ax1.figure
+    figure.canvas.draw_idle()
+    figure.canvas.flush_events()
+    
+def clean_sleeper_league_data(league_data=os.path.join('data', 'fantasy_leagues', 'sleeper_leagues'), output_file=os.path.join('data', 'fantasy_leagues', 'sleeper_leagues_clean.parquet'), chunksize=100000):
+    """
+    Converts the crawled leagues into a typed, analysis-ready Parquet file.
 
-    # Append new lpm data point
-    x_data2.append(new_x)
-    y_data2.append(lpm)
+    Leagues are streamed in chunks with an explicit schema: categoricals for status,
+    season type and sport, downcast integers for scalar fields and settings, per-slot
+    roster counts and one float32 column per scoring setting. See
+    data_storage.league_cleaning for the details.
 
-    # Clear and re-plot ax2
-    ax2.clear()
-    ax2.plot(x_data2, y_data2, 'o-', label='Leagues Found per Minute', color='orange')
-    ax2.set_xlabel('Total Leagues Captured')
-    ax2.set_ylabel('Leagues/Minute')
-    ax2.set_title('League Capture Rate Monitor')
-    ax2.grid(True)
+    Parameters:
+        league_data (LeagueRecordBuffer or str): The league store, its directory, or a
+            legacy flattened sleeper_leagues.csv.
+            - Defaults to 'data/fantasy_leagues/sleeper_leagues'.
+        output_file (str): Path of the cleaned Parquet file.
+            - Defaults to 'data/fantasy_leagues/sleeper_leagues_clean.parquet'.
+        chunksize (int): Number of leagues processed at a time.
+            - Defaults to 100000.
 
-    # Update the plots
-    plt.draw()
-    plt.pause(1)
-    
-def clean_sleeper_league_data(league_data):
-    pass
+    Returns:
+        int: The number of leagues written.
+    """
+    written = clean_leagues(league_data, output_file, chunksize)
+    print(f'Cleaned {written:,} Leagues into {output_file}')
+    return written
 
 if __name__ == "__main__":
-    get_league_IDs(leagues_per_cycle=5000)
+    get_league_IDs(leagues_per_cycle=5000, workers=16)
     
\ No newline at end of file
@@ -1,35 +1,210 @@
-from requests_html import HTMLSession
+import os
+import json
+import time
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from itertools import product
+import requests
+from requests_html import HTML, AsyncHTMLSession
 import pandas as pd
 
-def pull_sleeper_ADP(position='all', format='ppr', league='dynasty'):
-    # Assumes a 12-man league size
+ADP_POSITIONS = ['all', 'qb', 'rb', 'wr', 'te']
+ADP_FORMATS = ['standard', 'half-ppr', 'ppr']
+ADP_LEAGUES = ['redraft', 'dynasty']
+
+ADP_SNAPSHOT_DIRECTORY = os.path.join('data', 'sleeper_ADP', 'snapshots')
+
+# DraftSharks updates ADP at most daily
+SNAPSHOT_MAX_AGE = 6 * 60 * 60
+
+HEADERS = {'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36'}
+
 
+def adp_url(position='all', format='ppr', league='dynasty'):
+    # Assumes a 12-man league size
     base_url = 'https://www.draftsharks.com/adp/'
     format_url = '' if format == 'standard' else format + '/'
     league_url = '' if league == 'redraft' else league + '/'
     position_url = '' if position == 'all' else position + '/'
+    return base_url + league_url + format_url + 'sleeper/12/' + position_url
+
+
+def parse_ADP_html(html):
+    """
+    Reads the ADP table from a DraftSharks page.
+
+    Parameters:
+        html (requests_html.HTML): The page, rendered or as served.
+
+    Returns:
+        pandas.DataFrame: SleeperADP, Name, Position and Team, empty if the page holds no table.
+    """
+    names = [name.full_text for name in html.find('span.name')]
+    positions = [pos.full_text for pos in html.find('span.position')]
+    teams = [team.full_text for team in html.find('span.team')]
+    if not (len(names) == len(positions) == len(teams)):
+        return pd.DataFrame(columns=['SleeperADP', 'Name', 'Position', 'Team'])
+    return pd.DataFrame({'SleeperADP': list(range(1, len(names) + 1)), 'Name': names, 'Position': positions, 'Team': teams})
+
+
+def _snapshot_paths(cache_dir, url):
+    key = hashlib.sha1(url.encode()).hexdigest()
+    return os.path.join(cache_dir, f'{key}.json'), os.path.join(cache_dir, f'{key}.parquet')
+
+
+def _load_snapshot(cache_dir, url):
+    if cache_dir is None:
+        return None, None
+    meta_path, data_path = _snapshot_paths(cache_dir, url)
+    if not os.path.exists(meta_path) or not os.path.exists(data_path):
+        return None, None
+    with open(meta_path, 'r') as f:
+        return json.load(f), data_path
+
+
+def _save_snapshot(cache_dir, url, source_hash, df):
+    # An empty table means a blocked, broken or changed page; never serve one from the cache
+    if cache_dir is None or df is None or not len(df):
+        return
+    os.makedirs(cache_dir, exist_ok=True)
+    meta_path, data_path = _snapshot_paths(cache_dir, url)
+    df.to_parquet(data_path + '.tmp', index=False)
+    os.replace(data_path + '.tmp', data_path)
+    with open(meta_path + '.tmp', 'w') as f:
+        json.dump({'url': url, 'source_hash': source_hash, 'fetched_at': time.time()}, f)
+    os.replace(meta_path + '.tmp', meta_path)
+
+
+def _fetch_page(http, url):
+    # Download one page, handing errors back so one failure does not abort the batch
+    try:
+        response = http.get(url, timeout=30)
+        response.raise_for_status()
+        return response.text, None
+    except requests.RequestException as e:
+        return None, e
+
+
+def _render_pages(urls, max_renders):
+    # Render pages in one shared headless browser, max_renders tabs at a time; failed pages map to None
+    session = AsyncHTMLSession()
+    pages = {}
+
+    def render(url):
+        async def task():
+            try:
+                response = await session.get(url, headers=HEADERS)
+                response.raise_for_status()
+                await response.html.arender(timeout=60)
+                return url, response.html
+            except Exception as e:
+                print(f'Error rendering {url}: {e}')
+                return url, None
+        return task
+
+    try:
+        for start in range(0, len(urls), max_renders):
+            pages.update(session.run(*[render(url) for url in urls[start:start + max_renders]]))
+    finally:
+        session.run(session.close)
+    return pages
+
+
+def pull_sleeper_ADP_batch(combinations=None, render='auto', cache_dir=ADP_SNAPSHOT_DIRECTORY,
+                           max_age=SNAPSHOT_MAX_AGE, max_workers=8, max_renders=4):
+    """
+    Pulls Sleeper ADP from DraftSharks for many position, format and league combinations.
+
+    Pages are first downloaded concurrently as plain HTML and parsed without a browser.
+    Only pages whose table is built by JavaScript are rendered, all in one shared
+    headless browser. Each URL's result is kept as a snapshot: it is reused without any
+    request while younger than max_age, and reused without rendering while the page
+    source is unchanged. A page that fails to download, returns an error status or yields
+    no table falls back to its last snapshot, however old, or to an empty frame; empty
+    tables are never stored as snapshots.
+
+    Parameters:
+        combinations (list, optional): (position, format, league) tuples.
+            - Defaults to every combination of ADP_POSITIONS, ADP_FORMATS and ADP_LEAGUES.
+        render (str): 'auto' renders only pages without a static table, 'never' skips
+            rendering, 'always' renders every page that is not cached.
+            - Defaults to 'auto'.
+        cache_dir (str, optional): Directory of the per-URL snapshots; None disables them.
+            - Defaults to 'data/sleeper_ADP/snapshots'.
+        max_age (float): Seconds a snapshot is used without checking the page.
+            - Defaults to 6 hours.
+        max_workers (int): Concurrent page downloads.
+            - Defaults to 8.
+        max_renders (int): Pages rendered concurrently in the browser.
+            - Defaults to 4.
+
+    Returns:
+        dict: (position, format, league) -> DataFrame of SleeperADP, Name, Position, Team.
+    """
+    if combinations is None:
+        combinations = list(product(ADP_POSITIONS, ADP_FORMATS, ADP_LEAGUES))
+    urls = {combination: adp_url(*combination) for combination in combinations}
+    results = {}
+    snapshots = {}
+    for combination, url in urls.items():
+        meta, data_path = _load_snapshot(cache_dir, url)
+        snapshots[url] = (meta, data_path)
+        if meta is not None and time.time() - meta['fetched_at'] < max_age:
+            results[combination] = pd.read_parquet(data_path)
+
+    def fallback(combination):
+        # The last good snapshot of a page that could not be read now, else an empty table
+        meta, data_path = snapshots[urls[combination]]
+        return pd.read_parquet(data_path) if meta is not None else parse_ADP_html(HTML(html=''))
+
+    pending = [combination for combination in urls if combination not in results]
+    with requests.Session() as http:
+        http.headers.update(HEADERS)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            fetched = dict(zip(pending, executor.map(lambda c: _fetch_page(http, urls[c]), pending)))
+
+    to_render = []
+    for combination in pending:
+        url = urls[combination]
+        source, error = fetched[combination]
+        if error is not None:
+            print(f'Error downloading {url}: {error}')
+            results[combination] = fallback(combination)
+            continue
+        source_hash = hashlib.sha1(source.encode()).hexdigest()
+        meta, data_path = snapshots[url]
+        if meta is not None and meta['source_hash'] == source_hash:
+            results[combination] = pd.read_parquet(data_path)
+            _save_snapshot(cache_dir, url, source_hash, results[combination])
+            continue
+        df = parse_ADP_html(HTML(html=source, url=url)) if render != 'always' else None
+        if df is not None and len(df):
+            results[combination] = df
+            _save_snapshot(cache_dir, url, source_hash, df)
+        elif render == 'never':
+            results[combination] = fallback(combination)
+        else:
+            to_render.append((combination, source_hash))
+
+    if to_render:
+        pages = _render_pages([urls[combination] for combination, _ in to_render], max_renders)
+        for combination, source_hash in to_render:
+            page = pages.get(urls[combination])
+            df = parse_ADP_html(page) if page is not None else None
+            if df is None or not len(df):
+                results[combination] = fallback(combination)
+                continue
+            results[combination] = df
+            _save_snapshot(cache_dir, urls[combination], source_hash, df)
+    return {combination: results[combination] for combination in combinations}
+
+
+def pull_sleeper_ADP(position='all', format='ppr', league='dynasty', render='auto', cache_dir=ADP_SNAPSHOT_DIRECTORY):
+    # Single-page convenience wrapper around pull_sleeper_ADP_batch
+    return pull_sleeper_ADP_batch([(position, format, league)], render, cache_dir)[(position, format, league)]
+
 
-    full_url = base_url + league_url + format_url + 'sleeper/12/' + position_url
-
-    session = HTMLSession()
-    response = session.get(full_url)
-    response.html.render()  # This renders the JavaScript content
-    
-    # Find the span with class 'name'
-    name_data = response.html.find('span.name')
-    pos_data = response.html.find('span.position')
-    team_data = response.html.find('span.team')
-    names = [name.full_text for name in name_data]
-    adps = list(range(1, len(names) + 1))
-    positions = [pos.full_text for pos in pos_data]
-    teams = [team.full_text for team in team_data]
-    
-    # Create a DataFrame
-    df = pd.DataFrame({ 'SleeperADP': adps, 'Name': names, 'Position': positions, 'Team': teams})
-
-    return df
-    
 if __name__ == "__main__":
     #test the code
     sleeper_data = pull_sleeper_ADP()
-    print(sleeper_data)
\ No newline at end of file
+    print(sleeper_data)
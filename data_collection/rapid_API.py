@@ -1,11 +1,29 @@
+import threading
+import time
+from concurrent.futures import Future
 import requests
+from requests.adapters import HTTPAdapter
 from environs import Env
 from datetime import datetime
+from .rapid_API_usage import RapidAPIUsageTracker, UNCHANGED
 
 __all__ = ['get_news', 'get_game_info', 'get_scores', 'get_weekly_schedule',
            'get_team_schedule', 'get_gameday_schedule', 'get_box_score', 'get_fantasy_projections',
            'get_team_stats', 'get_ADP_data', 'get_player_info', 'get_player_stats',
-           'get_betting_odds', 'get_team_roster', 'get_player_list']
+           'get_betting_odds', 'get_team_roster', 'get_player_list', 'RapidAPIClient', 'get_client',
+           'configure_usage_limits', 'usage_report']
+
+def get_usage_limits():
+    # Optional quota settings from .env; unset limits are not enforced
+    env = Env()
+    env.read_env()
+
+    return {
+        'per_minute_limit': env.int('RAPID_API_PER_MINUTE_LIMIT', None),
+        'per_month_limit': env.int('RAPID_API_PER_MONTH_LIMIT', None),
+        'cost_per_call': env.float('RAPID_API_COST_PER_CALL', 0.0),
+    }
+
 
 def get_headers_and_host():
 
@@ -21,6 +39,111 @@ def get_headers_and_host():
     return headers
 
 
+class RapidAPIClient:
+    """
+    Shared client for the Tank01 NFL API on RapidAPI.
+
+    Credentials are read from .env once when the client is created and every request goes
+    through one pooled keep-alive session. Identical requests made while one is already in
+    flight (same endpoint and query string) wait for and share that response rather than
+    sending a duplicate, billed request. Every request that is sent is checked against and
+    recorded by a RapidAPIUsageTracker.
+
+    Parameters:
+        headers (dict, optional): RapidAPI headers; read from .env when omitted.
+        usage (RapidAPIUsageTracker, optional): Quota tracker; created from the
+            RAPID_API_* limits in .env when omitted.
+        pool_size (int): Maximum number of pooled connections.
+            - Defaults to 10.
+        timeout (float): Per-request timeout in seconds.
+            - Defaults to 30.
+    """
+
+    def __init__(self, headers=None, usage=None, pool_size=10, timeout=30):
+        self.headers = headers if headers is not None else get_headers_and_host()
+        self.usage = usage if usage is not None else RapidAPIUsageTracker(**get_usage_limits())
+        self.base_url = f"https://{self.headers['x-rapidapi-host']}"
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        self.session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def get(self, database_name, querystring):
+        """
+        Requests an endpoint, sharing the result with identical concurrent requests.
+
+        Parameters:
+            database_name (str): The endpoint name, e.g. 'getNFLBoxScore'.
+            querystring (dict): Query parameters.
+
+        Returns:
+            dict or None: The decoded JSON response, or None if the request failed.
+        """
+        key = (database_name, tuple(sorted(querystring.items())))
+        with self._lock:
+            future = self._in_flight.get(key)
+            is_owner = future is None
+            if is_owner:
+                future = Future()
+                self._in_flight[key] = future
+        if not is_owner:
+            return future.result()
+
+        try:
+            data = self._request(database_name, querystring)
+            future.set_result(data)
+            return data
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+    def _request(self, database_name, querystring):
+        if not self.usage.reserve(database_name):
+            return None
+        start_time = time.time()
+        try:
+            response = self.session.get(f'{self.base_url}/{database_name}', params=querystring, timeout=self.timeout)
+        except Exception:
+            self.usage.record(database_name, None, time.time() - start_time)
+            raise
+        self.usage.record(database_name, response.status_code, time.time() - start_time, response.headers)
+
+        # Check if the request was successful
+        if response.status_code == 200:
+            # Parse the JSON response
+            return response.json()
+        else:
+            print(f'Failed to retrieve data: {response.status_code}')
+            print(querystring)
+
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_client():
+    # Create the shared client on first use so importing the module does not require .env
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = RapidAPIClient()
+        return _client
+
+
+def configure_usage_limits(per_minute_limit=UNCHANGED, per_month_limit=UNCHANGED, cost_per_call=UNCHANGED):
+    # Override the quota ceilings loaded from .env for the shared client; only the arguments passed change, None clears a limit
+    get_client().usage.configure(per_minute_limit, per_month_limit, cost_per_call)
+
+
+def usage_report(since=None):
+    # Calls, errors, latency and cost per endpoint, most used first
+    return get_client().usage.report(since)
+
+
 def get_news(playerID, teamID, teamAbv, topNews, fantasyNews, recentNews, maxItems):
     
     database_name = 'getNFLNews'
@@ -34,19 +157,7 @@ def get_news(playerID, teamID, teamAbv, topNews, fantasyNews, recentNews, maxIte
         "recentNews": str(recentNews),
         "maxItems": str(maxItems)
     }
-    headers = get_headers_and_host()
-    url = f"https://{headers['x-rapidapi-host']}/{database_name}"
-
-    response = requests.get(url, headers=headers, params=querystring)
-
-    # Check if the request was successful
-    if response.status_code == 200:
-        # Parse the JSON response
-        data = response.json()
-        return data
-    else:
-        print(f'Failed to retrieve data: {response.status_code}')
-        print(querystring)
+    return get_client().get(database_name, querystring)
 
 
 def get_game_info(gameID):
@@ -56,19 +167,7 @@ def get_game_info(gameID):
     querystring = {
         'gameID': str(gameID)
     }
-    headers = get_headers_and_host()
-    url = f"https://{headers['x-rapidapi-host']}/{database_name}"
-
-    response = requests.get(url, headers=headers, params=querystring)
-
-    # Check if the request was successful
-    if response.status_code == 200:
-        # Parse the JSON response
-        data = response.json()
-        return data
-    else:
-        print(f'Failed to retrieve data: {response.status_code}')
-        print(querystring)
+    return get_client().get(database_name, querystring)
 
 
 def get_scores(gameDate, gameID, topPerformers, gameWeek, season, seasonType):
@@ -83,19 +182,7 @@ def get_scores(gameDate, gameID, topPerformers, gameWeek, season, seasonType):
         "season": str(season),
         "seasonType": str(seasonType)
     }
-    headers = get_headers_and_host()
-    url = f"https://{headers['x-rapidapi-host']}/{database_name}"
-
-    response = requests.get(url, headers=headers, params=querystring)
-
-    # Check if the request was successful
-    if response.status_code == 200:
-        # Parse the JSON response
-        data = response.json()
-        return data
-    else:
-        print(f'Failed to retrieve data: {response.status_code}')
-        print(querystring)
+    return get_client().get(database_name, querystring)
 
 
 def get_weekly_schedule(week, seasonType, season):
@@ -107,19 +194,7 @@ def get_weekly_schedule(week, seasonType, season):
         "seasonType": str(seasonType),
         "season": str(season)
     } 
-    headers = get_headers_and_host()
-    url = f"https://{headers['x-rapidapi-host']}/{database_name}"
-
-    response = requests.get(url, headers=headers, params=querystring)
-
-    # Check if the request was successful
-    if response.status_code == 200:
-        # Parse the JSON response
-        data = response.json()
-        return data
-    else:
-        print(f'Failed to retrieve data: {response.status_code}')
-        print(querystring)
+    return get_client().get(database_name, querystring)
 
 
 def get_team_schedule(teamID, teamAbv, season):
@@ -131,19 +206,7 @@ def get_team_schedule(teamID, teamAbv, season):
         "teamAbv": str(teamAbv),
         "season": str(season)
     }
-    headers = get_headers_and_host()
-    url = f"https://{headers['x-rapidapi-host']}/{database_name}"
-
-    response = requests.get(url, headers=headers, params=querystring)
-
-    # Check if the request was successful
-    if response.status_code == 200:
-        # Parse the JSON response
-        data = response.json()
-        return data
-    else:
-        print(f'Failed to retrieve data: {response.status_code}')
-        print(querystring)
+    return get_client().get(database_name, querystring)
 
 
 def get_gameday_schedule(gameDate):
@@ -153,20 +216,7 @@ def get_gameday_schedule(gameDate):
     querystring = {
         "gameDate": str(gameDate)
     }
-    headers = get_headers_and_host()
-    url = f"https://{headers['x-rapidapi-host']}/{database_name}"
-
-    response = requests.get(url, headers=headers, params=querystring)
-
-    # Check if the request was successful
-    if response.status_code == 200:
-        # Parse the JSON response
-        data = response.json()
-        return data
-    else:
-        print(f'Failed to retrieve data: {response.status_code}')
-        print()
-        print(querystring)
+    return get_client().get(database_name, querystring)
 
 
 def get_box_score(gameID, playByPlay):
@@ -177,19 +227,7 @@ def get_box_score(gameID, playByPlay):
         "gameID": str(gameID),
         "playByPlay": str(playByPlay)
     }
-    headers = get_headers_and_host()
-    url = f"https://{headers['x-rapidapi-host']}/{database_name}"
-
-    response = requests.get(url, headers=headers, params=querystring)
-
-    # Check if the request was successful
-    if response.status_code == 200:
-        # Parse the JSON response
-        data = response.json()
-        return data
-    else:
-        print(f'Failed to retrieve data: {response.status_code}')
-        print(querystring)
+    return get_client().get(database_name, querystring)
 
 
 def get_fantasy_projections(week, season=2024, ppr=1.0, passTD=6.0):
@@ -206,19 +244,7 @@ def get_fantasy_projections(week, season=2024, ppr=1.0, passTD=6.0):
         "carries": "0.0",
         "targets": "0.0"
     }
-    headers = get_headers_and_host()
-    url = f"https://{headers['x-rapidapi-host']}/{database_name}"
-
-    response = requests.get(url, headers=headers, params=querystring)
-
-    # Check if the request was successful
-    if response.status_code == 200:
-        # Parse the JSON response
-        data = response.json()
-        return data
-    else:
-        print(f'Failed to retrieve data: {response.status_code}')
-        print(querystring)
+    return get_client().get(database_name, querystring)
 
 
 def get_team_stats(season=2024):
@@ -233,19 +259,7 @@ def get_team_stats(season=2024):
         "teamStats": "true",
         "teamStatsSeason": str(season)
     }
-    headers = get_headers_and_host()
-    url = f"https://{headers['x-rapidapi-host']}/{database_name}"
-
-    response = requests.get(url, headers=headers, params=querystring)
-
-    # Check if the request was successful
-    if response.status_code == 200:
-        # Parse the JSON response
-        data = response.json()
-        return data
-    else:
-        print(f'Failed to retrieve data: {response.status_code}')
-        print(querystring)
+    return get_client().get(database_name, querystring)
 
 
 def get_ADP_data(adp_type='PPR', adpDate='today', pos=''):
@@ -264,19 +278,7 @@ def get_ADP_data(adp_type='PPR', adpDate='today', pos=''):
     if pos == '':
         querystring.pop('pos')
 
-    headers = get_headers_and_host()
-    url = f"https://{headers['x-rapidapi-host']}/{database_name}"
-
-    response = requests.get(url, headers=headers, params=querystring)
-
-    # Check if the request was successful
-    if response.status_code == 200:
-        # Parse the JSON response
-        data = response.json()
-        return data
-    else:
-        print(f'Failed to retrieve data: {response.status_code}')
-        print(querystring)
+    return get_client().get(database_name, querystring)
 
 
 def get_player_info(playerName='', playerID='', getStats='true'):
@@ -294,19 +296,7 @@ def get_player_info(playerName='', playerID='', getStats='true'):
     if playerID=='':
         querystring.pop('playerID')
 
-    headers = get_headers_and_host()
-    url = f"https://{headers['x-rapidapi-host']}/{database_name}"
-
-    response = requests.get(url, headers=headers, params=querystring)
-
-    # Check if the request was successful
-    if response.status_code == 200:
-        # Parse the JSON response
-        data = response.json()
-        return data
-    else:
-        print(f'Failed to retrieve data: {response.status_code}')
-        print(querystring)
+    return get_client().get(database_name, querystring)
 
 
 def get_player_stats(playerID='', gameID='', numberOfGames='', ppr=1.0, passTD=6.0):
@@ -332,19 +322,7 @@ def get_player_stats(playerID='', gameID='', numberOfGames='', ppr=1.0, passTD=6
     if numberOfGames=='':
         querystring.pop('numberOfGames')
 
-    headers = get_headers_and_host()
-    url = f"https://{headers['x-rapidapi-host']}/{database_name}"
-
-    response = requests.get(url, headers=headers, params=querystring)
-
-    # Check if the request was successful
-    if response.status_code == 200:
-        # Parse the JSON response
-        data = response.json()
-        return data
-    else:
-        print(f'Failed to retrieve data: {response.status_code}')
-        print(querystring)
+    return get_client().get(database_name, querystring)
 
 
 def get_betting_odds(gameDate, gameID):
@@ -355,46 +333,22 @@ def get_betting_odds(gameDate, gameID):
         "gameDate": str(gameDate),
         "gameID": str(gameID)
     }
-    headers = get_headers_and_host()
-    url = f"https://{headers['x-rapidapi-host']}/{database_name}"
-
-    response = requests.get(url, headers=headers, params=querystring)
-
-    # Check if the request was successful
-    if response.status_code == 200:
-        # Parse the JSON response
-        data = response.json()
-        return data
-    else:
-        print(f'Failed to retrieve data: {response.status_code}')
-        print(querystring)
+    return get_client().get(database_name, querystring)
 
 
 def get_team_roster(teamAbv, archiveDate='today'):
     
     database_name = 'getNFLTeamRoster'
 
-    if adpDate == 'today':
-        adpDate = datetime.today().strftime('%Y%m%d')
+    if archiveDate == 'today':
+        archiveDate = datetime.today().strftime('%Y%m%d')
 
     querystring = {
         "teamAbv": str(teamAbv),
         "archiveDate": str(archiveDate),
         "getStats": "true"
     }
-    headers = get_headers_and_host()
-    url = f"https://{headers['x-rapidapi-host']}/{database_name}"
-
-    response = requests.get(url, headers=headers, params=querystring)
-
-    # Check if the request was successful
-    if response.status_code == 200:
-        # Parse the JSON response
-        data = response.json()
-        return data
-    else:
-        print(f'Failed to retrieve data: {response.status_code}')
-        print(querystring)
+    return get_client().get(database_name, querystring)
 
 
 def get_player_list():
@@ -402,16 +356,4 @@ def get_player_list():
     database_name = 'getNFLPlayerList'
 
     querystring = {}
-    headers = get_headers_and_host()
-    url = f"https://{headers['x-rapidapi-host']}/{database_name}"
-
-    response = requests.get(url, headers=headers, params=querystring)
-
-    # Check if the request was successful
-    if response.status_code == 200:
-        # Parse the JSON response
-        data = response.json()
-        return data
-    else:
-        print(f'Failed to retrieve data: {response.status_code}')
-        print(querystring)
\ No newline at end of file
+    return get_client().get(database_name, querystring)
\ No newline at end of file
@@ -0,0 +1,257 @@
+import os
+import json
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+from . import rapid_API
+
+__all__ = ['get_season_schedule', 'get_season_box_scores', 'get_season_projections',
+           'get_season_betting_odds']
+
+REGULAR_SEASON_WEEKS = range(1, 19)
+PAYLOAD_DIRECTORY = os.path.join('data', 'rapid_API')
+
+
+def _payload_path(store_dir, kind, key):
+    return os.path.join(store_dir, kind, f'{key}.json')
+
+
+def _load_payload(path):
+    if os.path.exists(path):
+        with open(path, 'r') as f:
+            return json.load(f)
+    return None
+
+
+def _save_payload(path, payload):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w') as f:
+        json.dump(payload, f)
+    os.replace(temp_path, path)
+
+
+def _body(payload):
+    # Tank01 responses wrap their data as {'statusCode': 200, 'body': ...}
+    if not isinstance(payload, dict):
+        return None
+    return payload.get('body')
+
+
+def _is_final(game):
+    # Tank01 sometimes answers with a message string instead of a game
+    if not isinstance(game, dict):
+        return False
+    status = str(game.get('gameStatus', '')).lower()
+    return 'complete' in status or 'final' in status
+
+
+def _games(payload):
+    # The games of a getNFLGamesForWeek payload, skipping anything that is not a game
+    body = _body(payload)
+    return [game for game in body if isinstance(game, dict)] if isinstance(body, list) else []
+
+
+def _week_is_final(payload):
+    body = _body(payload)
+    return isinstance(body, list) and len(body) > 0 and all(_is_final(game) for game in body)
+
+
+def _fetch_all(fetch, keys, store_dir, kind, is_complete, max_workers, refresh=False):
+    """
+    Fetches one payload per key concurrently, reusing payloads stored locally.
+
+    Payloads for which `is_complete(key, payload)` returns True are saved under
+    store_dir/kind and never requested again; anything else (e.g. games still in
+    progress) is refetched on the next run. The shared RapidAPI client enforces the rate
+    limit across workers.
+
+    Returns:
+        dict: Payload per key; keys whose request failed are omitted.
+    """
+    payloads = {}
+    missing = []
+    for key in keys:
+        payload = None if refresh else _load_payload(_payload_path(store_dir, kind, key))
+        if payload is not None:
+            payloads[key] = payload
+        else:
+            missing.append(key)
+    print(f'{kind}: {len(payloads):,} stored locally, {len(missing):,} to fetch')
+
+    def fetch_safely(key):
+        # One failed request (e.g. a timeout) only loses its own key
+        try:
+            return fetch(key)
+        except Exception as e:
+            print(f'{kind}: request for {key} failed: {e}')
+            return None
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for key, payload in zip(missing, executor.map(fetch_safely, missing)):
+            if _body(payload) is None:
+                continue
+            payloads[key] = payload
+            if is_complete(key, payload):
+                _save_payload(_payload_path(store_dir, kind, key), payload)
+    return payloads
+
+
+def _schedule_payloads(season, weeks, seasonType, max_workers, store_dir):
+    # Weekly schedule payloads keyed like their stored files; a week is stored once all its games are final
+    keys = [f'{season}_{seasonType}_{week:02d}' for week in weeks]
+    week_by_key = dict(zip(keys, weeks))
+    payloads = _fetch_all(
+        lambda key: rapid_API.get_weekly_schedule(week_by_key[key], seasonType, season),
+        keys, store_dir, 'schedules', lambda key, payload: _week_is_final(payload), max_workers)
+    return keys, payloads
+
+
+def get_season_schedule(season, weeks=REGULAR_SEASON_WEEKS, seasonType='reg', max_workers=8,
+                        store_dir=PAYLOAD_DIRECTORY, history_store=None):
+    """
+    Retrieves every game of a season, one concurrent getNFLGamesForWeek call per week.
+
+    A week's schedule is stored locally once all of its games are final.
+
+    Parameters:
+        season (int): The season, e.g. 2024.
+        weeks (iterable): Weeks to include.
+            - Defaults to weeks 1-18.
+        seasonType (str): 'reg', 'post' or 'pre'.
+            - Defaults to 'reg'.
+        history_store (HistoryStore, optional): Store the games are also ingested into.
+
+    Returns:
+        pandas.DataFrame: One row per game.
+    """
+    keys, payloads = _schedule_payloads(season, weeks, seasonType, max_workers, store_dir)
+    games = [game for key in keys if key in payloads for game in _games(payloads[key])]
+    if history_store is not None:
+        history_store.ingest_schedule(games)
+    return pd.DataFrame(games)
+
+
+def get_season_box_scores(season, weeks=REGULAR_SEASON_WEEKS, playByPlay=False, max_workers=8,
+                          store_dir=PAYLOAD_DIRECTORY, schedule=None, history_store=None):
+    """
+    Retrieves the box score of every game in a season concurrently.
+
+    Games whose final box score is already stored locally are not requested again.
+
+    Parameters:
+        season (int): The season, e.g. 2024.
+        weeks (iterable): Weeks to include.
+            - Defaults to weeks 1-18.
+        playByPlay (bool): Whether to request play-by-play data.
+            - Defaults to False.
+        schedule (pandas.DataFrame, optional): Output of get_season_schedule, to avoid
+            refetching the schedule.
+        history_store (HistoryStore, optional): Store the games and stat lines are also
+            ingested into.
+
+    Returns:
+        pandas.DataFrame: One row per player per game with flattened stat columns.
+    """
+    if schedule is None:
+        schedule = get_season_schedule(season, weeks, max_workers=max_workers, store_dir=store_dir,
+                                       history_store=history_store)
+    if schedule.empty:
+        return pd.DataFrame()
+    game_ids = schedule['gameID'].tolist()
+    kind = 'box_scores_pbp' if playByPlay else 'box_scores'
+    payloads = _fetch_all(
+        lambda game_id: rapid_API.get_box_score(game_id, str(playByPlay).lower()),
+        game_ids, store_dir, kind,
+        lambda game_id, payload: _is_final(_body(payload)),
+        max_workers)
+
+    player_lines = []
+    for game_id in game_ids:
+        body = _body(payloads.get(game_id))
+        if not isinstance(body, dict):
+            continue
+        if history_store is not None:
+            history_store.ingest_box_score(body)
+        for player_id, stats in (body.get('playerStats') or {}).items():
+            player_lines.append(dict(stats, playerID=player_id, gameID=game_id))
+    return pd.json_normalize(player_lines)
+
+
+def get_season_projections(season, weeks=REGULAR_SEASON_WEEKS, ppr=1.0, passTD=6.0, max_workers=8,
+                           store_dir=PAYLOAD_DIRECTORY, refresh=False, history_store=None):
+    """
+    Retrieves weekly fantasy projections for a range of weeks concurrently.
+
+    Projections are stored locally only for weeks whose games are all final, so weeks
+    still to be played are refetched on every run; pass refresh=True to also update
+    stored weeks.
+
+    Parameters:
+        season (int): The season, e.g. 2024.
+        weeks (iterable): Weeks to include.
+            - Defaults to weeks 1-18.
+        ppr (float): Points per reception.
+        passTD (float): Points per passing touchdown.
+        history_store (HistoryStore, optional): Store the projections are also ingested into.
+
+    Returns:
+        pandas.DataFrame: One row per player per week with flattened projection columns.
+    """
+    keys = [f'{season}_{week:02d}_ppr{ppr}_ptd{passTD}' for week in weeks]
+    week_by_key = dict(zip(keys, weeks))
+    # Only weeks that have been played have projections that will not change
+    missing_weeks = [week for key, week in week_by_key.items()
+                     if refresh or not os.path.exists(_payload_path(store_dir, 'projections', key))]
+    schedule_keys, schedules = _schedule_payloads(season, missing_weeks, 'reg', max_workers, store_dir)
+    played_weeks = {week for key, week in zip(schedule_keys, missing_weeks) if _week_is_final(schedules.get(key))}
+    payloads = _fetch_all(
+        lambda key: rapid_API.get_fantasy_projections(week_by_key[key], season, ppr, passTD),
+        keys, store_dir, 'projections', lambda key, payload: week_by_key[key] in played_weeks, max_workers, refresh)
+
+    projections = []
+    for key in keys:
+        body = _body(payloads.get(key))
+        if not isinstance(body, dict):
+            continue
+        if history_store is not None:
+            history_store.ingest_projections(body, season, week_by_key[key], ppr, passTD)
+        for player_id, projection in (body.get('playerProjections') or {}).items():
+            projections.append(dict(projection, playerID=player_id, season=season, week=week_by_key[key]))
+    return pd.json_normalize(projections)
+
+
+def get_season_betting_odds(season, weeks=REGULAR_SEASON_WEEKS, max_workers=8, store_dir=PAYLOAD_DIRECTORY,
+                            schedule=None):
+    """
+    Retrieves betting odds for every game in a season concurrently.
+
+    Odds for games that are final are stored locally and not requested again.
+
+    Parameters:
+        season (int): The season, e.g. 2024.
+        weeks (iterable): Weeks to include.
+            - Defaults to weeks 1-18.
+        schedule (pandas.DataFrame, optional): Output of get_season_schedule.
+
+    Returns:
+        pandas.DataFrame: One row per game with flattened odds columns.
+    """
+    if schedule is None:
+        schedule = get_season_schedule(season, weeks, max_workers=max_workers, store_dir=store_dir)
+    if schedule.empty:
+        return pd.DataFrame()
+    final_games = {game['gameID'] for game in schedule.to_dict('records') if _is_final(game)}
+    game_dates = dict(zip(schedule['gameID'], schedule['gameDate']))
+    payloads = _fetch_all(
+        lambda game_id: rapid_API.get_betting_odds(game_dates[game_id], game_id),
+        list(game_dates), store_dir, 'betting_odds',
+        lambda game_id, payload: game_id in final_games,
+        max_workers)
+
+    odds = []
+    for game_id in game_dates:
+        body = _body(payloads.get(game_id))
+        if isinstance(body, dict):
+            odds.append(dict(body.get(game_id, body), gameID=game_id))
+    return pd.json_normalize(odds)
+
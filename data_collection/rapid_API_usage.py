@@ -0,0 +1,187 @@
+import os
+import time
+import sqlite3
+import threading
+from collections import deque
+from datetime import datetime
+import pandas as pd
+
+__all__ = ['RapidAPIUsageTracker', 'UNCHANGED']
+
+# Default of configure() arguments that keep their current setting; None clears a limit
+UNCHANGED = object()
+
+
+def _month_start(timestamp):
+    return datetime.fromtimestamp(timestamp).replace(day=1, hour=0, minute=0, second=0, microsecond=0).timestamp()
+
+
+class RapidAPIUsageTracker:
+    """
+    Per-endpoint accounting and quota enforcement for RapidAPI requests.
+
+    Every request is recorded in a small SQLite ledger together with the rate-limit
+    headers RapidAPI returns. Before each request the tracker enforces the configured
+    ceilings: calls over the per-minute limit wait until the oldest call in the window
+    ages out, while calls over the per-month limit (or made after RapidAPI reports no
+    requests remaining) are refused.
+
+    Parameters:
+        ledger_file (str): Path of the SQLite ledger.
+            - Defaults to 'data/rapid_api_usage.sqlite'.
+        per_minute_limit (int, optional): Maximum requests in any 60 second window.
+        per_month_limit (int, optional): Maximum requests per calendar month.
+        cost_per_call (float): Price of one request, used by report().
+            - Defaults to 0.0.
+    """
+
+    def __init__(self, ledger_file=os.path.join('data', 'rapid_api_usage.sqlite'), per_minute_limit=None,
+                 per_month_limit=None, cost_per_call=0.0):
+        self.ledger_file = ledger_file
+        self.per_minute_limit = per_minute_limit
+        self.per_month_limit = per_month_limit
+        self.cost_per_call = cost_per_call
+        self._lock = threading.Lock()
+        self._recent_calls = deque()
+        self._blocked_until = 0.0
+
+        directory = os.path.dirname(ledger_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connection = sqlite3.connect(ledger_file, check_same_thread=False)
+        self._connection.execute("""
+            CREATE TABLE IF NOT EXISTS calls (
+                timestamp REAL NOT NULL,
+                endpoint TEXT NOT NULL,
+                status INTEGER,
+                latency REAL,
+                requests_limit INTEGER,
+                requests_remaining INTEGER,
+                requests_reset INTEGER
+            )""")
+        self._connection.execute('CREATE INDEX IF NOT EXISTS calls_timestamp ON calls (timestamp)')
+        self._connection.commit()
+
+        now = time.time()
+        self._month = _month_start(now)
+        self._month_count = self._connection.execute(
+            'SELECT COUNT(*) FROM calls WHERE timestamp >= ?', (self._month,)).fetchone()[0]
+        self._recent_calls.extend(row[0] for row in self._connection.execute(
+            'SELECT timestamp FROM calls WHERE timestamp >= ? ORDER BY timestamp', (now - 60,)))
+
+    def configure(self, per_minute_limit=UNCHANGED, per_month_limit=UNCHANGED, cost_per_call=UNCHANGED):
+        """
+        Changes the quota ceilings or the price per call.
+
+        Only the arguments passed are changed, so the other settings (e.g. the limits
+        loaded from .env) stay in force. Pass None as a limit to stop enforcing it.
+
+        Parameters:
+            per_minute_limit (int or None, optional): Maximum requests in any 60 second window.
+            per_month_limit (int or None, optional): Maximum requests per calendar month.
+            cost_per_call (float, optional): Price of one request.
+        """
+        with self._lock:
+            if per_minute_limit is not UNCHANGED:
+                self.per_minute_limit = per_minute_limit
+            if per_month_limit is not UNCHANGED:
+                self.per_month_limit = per_month_limit
+            if cost_per_call is not UNCHANGED:
+                self.cost_per_call = 0.0 if cost_per_call is None else cost_per_call
+
+    def reserve(self, endpoint):
+        """
+        Claims quota for one request, waiting out the per-minute window if needed.
+
+        Parameters:
+            endpoint (str): The endpoint about to be called.
+
+        Returns:
+            bool: True if the request may be sent, False if it was refused.
+        """
+        while True:
+            with self._lock:
+                now = time.time()
+                if _month_start(now) != self._month:
+                    self._month, self._month_count = _month_start(now), 0
+                if now < self._blocked_until:
+                    print(f'RapidAPI quota exhausted until {datetime.fromtimestamp(self._blocked_until)}, refusing {endpoint}')
+                    return False
+                if self.per_month_limit is not None and self._month_count >= self.per_month_limit:
+                    print(f'Monthly RapidAPI limit of {self.per_month_limit:,} calls reached, refusing {endpoint}')
+                    return False
+                while self._recent_calls and self._recent_calls[0] <= now - 60:
+                    self._recent_calls.popleft()
+                if self.per_minute_limit is None or len(self._recent_calls) < self.per_minute_limit:
+                    self._recent_calls.append(now)
+                    self._month_count += 1
+                    return True
+                wait_time = self._recent_calls[0] + 60 - now
+            time.sleep(wait_time)
+
+    def record(self, endpoint, status, latency, headers=None):
+        """
+        Writes one request to the ledger and applies any rate-limit headers it returned.
+
+        Parameters:
+            endpoint (str): The endpoint called.
+            status (int or None): HTTP status code, or None if no response was received.
+            latency (float): Request duration in seconds.
+            headers (Mapping, optional): Response headers.
+        """
+        headers = {name.lower(): value for name, value in (headers or {}).items()}
+        limit = _header_int(headers, 'x-ratelimit-requests-limit')
+        remaining = _header_int(headers, 'x-ratelimit-requests-remaining')
+        reset = _header_int(headers, 'x-ratelimit-requests-reset')
+        now = time.time()
+        with self._lock:
+            if remaining is not None and remaining <= 0 and reset is not None:
+                self._blocked_until = max(self._blocked_until, now + reset)
+            self._connection.execute('INSERT INTO calls VALUES (?, ?, ?, ?, ?, ?, ?)',
+                                     (now, endpoint, status, latency, limit, remaining, reset))
+            self._connection.commit()
+
+    def report(self, since=None):
+        """
+        Summarizes recorded usage per endpoint.
+
+        Parameters:
+            since (float or datetime, optional): Only count calls after this time.
+                Defaults to the start of the current month.
+
+        Returns:
+            pandas.DataFrame: Calls, errors, mean latency and cost per endpoint, most
+            expensive first.
+        """
+        if since is None:
+            since = _month_start(time.time())
+        elif isinstance(since, datetime):
+            since = since.timestamp()
+        with self._lock:
+            report = pd.read_sql_query("""
+                SELECT endpoint,
+                       COUNT(*) AS calls,
+                       SUM(CASE WHEN status = 200 THEN 0 ELSE 1 END) AS errors,
+                       AVG(latency) AS mean_latency
+                FROM calls WHERE timestamp >= ?
+                GROUP BY endpoint""", self._connection, params=(since,))
+        report['cost'] = report['calls'] * self.cost_per_call
+        return report.sort_values('calls', ascending=False, ignore_index=True)
+
+    def latest_quota(self):
+        # Most recent rate-limit headers reported by RapidAPI, if any
+        with self._lock:
+            row = self._connection.execute("""
+                SELECT requests_limit, requests_remaining, requests_reset FROM calls
+                WHERE requests_remaining IS NOT NULL ORDER BY timestamp DESC LIMIT 1""").fetchone()
+        if row is None:
+            return None
+        return {'limit': row[0], 'remaining': row[1], 'reset': row[2]}
+
+
+def _header_int(headers, name):
+    value = headers.get(name)
+    try:
+        return int(value) if value is not None else None
+    except ValueError:
+        return None
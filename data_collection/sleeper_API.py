@@ -1,19 +1,176 @@
-import requests
+import random
+import re
 import time
+from email.utils import parsedate_to_datetime
+import requests
+from requests.adapters import HTTPAdapter
+from utils.rate_limiter import TokenBucket
+from utils.response_cache import ResponseCache, IMMUTABLE
+from utils.metrics import registry as metrics
 
 __all__ = ['fetch_all_players', 'get_league_info', 'get_league_rosters', 'get_league_users',
            'get_league_matchups', 'get_league_playoff_brackets', 'get_league_transactions', 'get_nfl_state',
            'get_league_traded_picks', 'get_user_drafts', 'get_league_drafts', 'get_draft',
            'get_draft_picks', 'get_traded_draft_picks', 'get_trending_players']
 
-def call_API(url):
-    start_time = time.time()
-    response = requests.get(url)
-    apply_API_call_delay(start_time)
-    return check_sleeper_API_response(response)
+# Shared by every thread calling the API so the per-minute budget holds across workers
+rate_limiter = TokenBucket(calls_per_minute=1000)
+
+# Responses worth retrying: rate limiting and transient server errors
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+retry_policy = {'max_retries': 5, 'backoff_factor': 0.5, 'max_backoff': 60, 'timeout': 30}
+session = None
+
+# Cache consulted by call_API for endpoints called with a TTL; None disables caching
+response_cache = ResponseCache()
+
+# Default freshness per endpoint, in seconds
+PLAYERS_TTL = 24 * 60 * 60
+NFL_STATE_TTL = 5 * 60
+LEAGUE_TTL = 60 * 60
+LEAGUE_USERS_TTL = 60 * 60
+ROSTERS_TTL = 10 * 60
+MATCHUPS_TTL = 10 * 60
+DRAFT_TTL = 5 * 60
+
+request_latency = metrics.histogram('sleeper_request_duration_seconds', 'Sleeper API request latency by endpoint.')
+request_count = metrics.counter('sleeper_requests_total', 'Sleeper API responses by endpoint and status code.')
+request_errors = metrics.counter('sleeper_request_errors_total', 'Sleeper API requests that failed without a response.')
+rate_limit_wait = metrics.counter('sleeper_rate_limit_wait_seconds_total', 'Time spent waiting for the shared rate limiter.')
+cache_lookups = metrics.counter('sleeper_cache_lookups_total', 'Response cache lookups by result (fresh, revalidated, miss).')
+
+def configure_session(pool_size=32, max_retries=5, backoff_factor=0.5, max_backoff=60, timeout=30):
+    """
+    Creates the shared HTTP session used for every Sleeper API call.
 
-def apply_API_call_delay(start_time=time.time(), API_calls_per_minute=1000):
-    time.sleep(max(60 / API_calls_per_minute - (time.time() - start_time), 0))
+    The session keeps connections to api.sleeper.app alive and pools them, so requests
+    reuse an open TCP/TLS connection instead of handshaking each time.
+
+    Parameters:
+        pool_size (int): Maximum number of pooled connections; should be at least the
+            number of crawler workers.
+            - Defaults to 32.
+        max_retries (int): Retries for 429/5xx responses and connection errors.
+            - Defaults to 5.
+        backoff_factor (float): Base delay in seconds; the nth retry waits a random time
+            of up to backoff_factor * 2**n seconds, unless the server sends Retry-After.
+            - Defaults to 0.5.
+        max_backoff (float): Upper bound on any single retry delay in seconds.
+            - Defaults to 60.
+        timeout (float): Per-request timeout in seconds.
+            - Defaults to 30.
+    """
+    global session
+    new_session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, pool_block=True)
+    new_session.mount('https://', adapter)
+    new_session.mount('http://', adapter)
+    retry_policy.update(max_retries=max_retries, backoff_factor=backoff_factor, max_backoff=max_backoff, timeout=timeout)
+    old_session, session = session, new_session
+    if old_session is not None:
+        old_session.close()
+
+def set_response_cache(cache):
+    # Swap in a different cache (e.g. another directory), or pass None to disable caching
+    global response_cache
+    response_cache = cache
+
+def call_API(url, ttl=None):
+    """
+    Requests a Sleeper API URL, consulting the response cache when a TTL is given.
+
+    Fresh cached responses are returned without a network call. Stale entries are
+    revalidated with If-None-Match/If-Modified-Since when the server supplied an ETag or
+    Last-Modified header, and served as-is if the request fails.
+
+    Parameters:
+        url (str): The endpoint URL.
+        ttl (float or callable, optional): Seconds the response stays fresh, IMMUTABLE,
+            or a function mapping the decoded response to either. None skips the cache.
+
+    Returns:
+        The decoded JSON response, or None if the request failed.
+    """
+    cache = response_cache if ttl is not None else None
+    entry = cache.get(url) if cache is not None else None
+    if cache is not None and cache.is_fresh(entry):
+        cache_lookups.inc(result='fresh')
+        return entry['data']
+
+    headers = {}
+    if entry is not None:
+        if entry['etag']:
+            headers['If-None-Match'] = entry['etag']
+        if entry['last_modified']:
+            headers['If-Modified-Since'] = entry['last_modified']
+    response = send_request(url, headers)
+    if response is None:
+        return entry['data'] if entry is not None else None
+    etag, last_modified = response.headers.get('ETag'), response.headers.get('Last-Modified')
+    if response.status_code == 304 and entry is not None:
+        cache_lookups.inc(result='revalidated')
+        data = entry['data']
+        # A 304 may omit the validators; keep the stored ones for the next revalidation
+        etag, last_modified = etag or entry['etag'], last_modified or entry['last_modified']
+    else:
+        if cache is not None:
+            cache_lookups.inc(result='miss')
+        data = check_sleeper_API_response(response)
+    if cache is not None and data is not None:
+        cache.put(url, data, ttl(data) if callable(ttl) else ttl, etag, last_modified)
+    return data
+
+def send_request(url, headers=None):
+    # Send a GET through the shared session, retrying 429/5xx responses and connection errors
+    if session is None:
+        configure_session()
+    max_retries = retry_policy['max_retries']
+    endpoint = endpoint_name(url)
+    for attempt in range(max_retries + 1):
+        rate_limit_wait.inc(rate_limiter.acquire())
+        start = time.perf_counter()
+        try:
+            response = session.get(url, headers=headers, timeout=retry_policy['timeout'])
+        except requests.RequestException as e:
+            request_errors.inc(endpoint=endpoint)
+            if attempt == max_retries:
+                print()
+                print(f'Request failed after {attempt + 1} attempts: {e}')
+                return None
+            time.sleep(get_retry_delay(attempt))
+            continue
+        request_latency.observe(time.perf_counter() - start, endpoint=endpoint)
+        request_count.inc(endpoint=endpoint, status=response.status_code)
+        if response.status_code in RETRY_STATUS_CODES and attempt < max_retries:
+            if response.status_code == 429:
+                rate_limiter.drain()
+            time.sleep(get_retry_delay(attempt, response))
+            continue
+        return response
+
+def endpoint_name(url):
+    # Metric label for a URL: the path with IDs, seasons and weeks replaced by placeholders
+    path = url.split('sleeper.app', 1)[-1].split('?', 1)[0]
+    return re.sub(r'/\d+(?=/|$)', '/:id', path)
+
+def get_retry_delay(attempt, response=None):
+    # Honor the server's Retry-After header, otherwise use exponential backoff with full jitter
+    retry_after = response.headers.get('Retry-After') if response is not None else None
+    if retry_after:
+        try:
+            delay = float(retry_after)
+        except ValueError:
+            try:
+                delay = parsedate_to_datetime(retry_after).timestamp() - time.time()
+            except (TypeError, ValueError):
+                delay = None
+        if delay is not None:
+            return min(max(delay, 0), retry_policy['max_backoff'])
+    return random.uniform(0, min(retry_policy['max_backoff'], retry_policy['backoff_factor'] * 2 ** attempt))
+
+def set_rate_limit(API_calls_per_minute=1000, burst=10):
+    rate_limiter.configure(API_calls_per_minute, burst)
 
 def check_sleeper_API_response(response):
     # Check if the request was successful
@@ -37,30 +194,49 @@ def check_sleeper_API_response(response):
     
     return None
 
-def fetch_all_players():
-    print('WARNING: Only do this max once per day!')
+def _completed_ttl(ttl):
+    # Leagues and drafts never change once their status is complete
+    return lambda data: IMMUTABLE if isinstance(data, dict) and data.get('status') == 'complete' else ttl
+
+def fetch_all_players(ttl=PLAYERS_TTL):
     url = 'https://api.sleeper.app/v1/players/nfl'
-    return call_API(url)
+    if response_cache is None or ttl is None or not response_cache.is_fresh(response_cache.get(url)):
+        print('WARNING: Only do this max once per day!')
+    return call_API(url, ttl)
 
-def get_league_info(league_id='1095093570517798912'):
+def get_league_info(league_id='1095093570517798912', ttl=LEAGUE_TTL):
     url = f'https://api.sleeper.app/v1/league/{league_id}'
-    return call_API(url)
+    return call_API(url, _completed_ttl(ttl) if ttl is not None else None)
 
-def get_league_rosters(league_id='1095093570517798912'):
+def get_league_rosters(league_id='1095093570517798912', ttl=ROSTERS_TTL):
     url = f'https://api.sleeper.app/v1/league/{league_id}/rosters'
-    return call_API(url)
+    return call_API(url, ttl)
 
-def get_league_users(league_id='1095093570517798912'):
+def get_league_users(league_id='1095093570517798912', ttl=LEAGUE_USERS_TTL):
     url = f'https://api.sleeper.app/v1/league/{league_id}/users'
-    return call_API(url)
+    return call_API(url, ttl)
 
-def get_user_leagues(user_id='474988809218420736', year=2024):
+def get_user_leagues(user_id='474988809218420736', year=2024, ttl=None):
     url = f'https://api.sleeper.app/v1/user/{user_id}/leagues/nfl/{year}'
-    return call_API(url)
+    return call_API(url, ttl)
 
-def get_league_matchups(league_id='1095093570517798912', week=1):
+def get_league_matchups(league_id='1095093570517798912', week=1, ttl=MATCHUPS_TTL):
     url = f'https://api.sleeper.app/v1/league/{league_id}/matchups/{week}'
-    return call_API(url)
+    # Only a cache miss pays for the league and NFL state lookups that pick the TTL
+    if ttl is not None and response_cache is not None and not response_cache.is_fresh(response_cache.get(url)) \
+            and is_final_week(league_id, week):
+        ttl = IMMUTABLE
+    return call_API(url, ttl)
+
+def is_final_week(league_id, week):
+    # A week's matchups are final once the league is complete or the NFL has moved past that week
+    league = get_league_info(league_id)
+    if not league:
+        return False
+    if league.get('status') == 'complete':
+        return True
+    state = get_nfl_state()
+    return bool(state) and str(league.get('season')) == str(state.get('season')) and int(week) < int(state.get('week') or 0)
 
 def get_league_playoff_brackets(league_id='1095093570517798912'):
     url_winners = f'https://api.sleeper.app/v1/league/{league_id}/winners_bracket'
@@ -71,9 +247,9 @@ def get_league_transactions(league_id='1095093570517798912', round=1):
     url = f'https://api.sleeper.app/v1/league/{league_id}/transactions/{round}'
     return call_API(url)
     
-def get_nfl_state(sport='nfl'):
+def get_nfl_state(sport='nfl', ttl=NFL_STATE_TTL):
     url = f'https://api.sleeper.app/v1/state/{sport}'
-    return call_API(url)
+    return call_API(url, ttl)
     
 def get_league_traded_picks(league_id='1095093570517798912'):
     url = f'https://api.sleeper.app/v1/league/{league_id}/traded_picks'
@@ -87,13 +263,17 @@ def get_league_drafts(league_id='1095093570517798912', year=2024):
     url = f'https://api.sleeper.app/v1/league/{league_id}/drafts'
     return call_API(url)
 
-def get_draft(draft_id=''):
+def get_draft(draft_id='', ttl=DRAFT_TTL):
     url = f'https://api.sleeper.app/v1/draft/{draft_id}'
-    return call_API(url)
+    return call_API(url, _completed_ttl(ttl) if ttl is not None else None)
 
-def get_draft_picks(draft_id=''):
+def get_draft_picks(draft_id='', ttl=DRAFT_TTL):
     url = f'https://api.sleeper.app/v1/draft/{draft_id}/picks'
-    return call_API(url)
+    if ttl is not None:
+        draft = get_draft(draft_id)
+        if draft and draft.get('status') == 'complete':
+            ttl = IMMUTABLE
+    return call_API(url, ttl)
 
 def get_traded_draft_picks(draft_id=''):
     url = f'https://api.sleeper.app/v1/draft/{draft_id}/traded_picks'
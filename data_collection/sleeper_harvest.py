@@ -0,0 +1,415 @@
+import os
+import json
+import time
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pyarrow.dataset as ds
+from . import sleeper_API as sleeper
+from data_storage.league_store import LeagueRecordBuffer
+
+__all__ = ['SleeperHarvester', 'load_harvest_targets', 'read_harvest', 'HARVEST_SCHEMAS']
+
+HARVEST_DIRECTORY = os.path.join('data', 'sleeper_harvest')
+REGULAR_SEASON_WEEKS = 18
+
+_STRINGS = pa.list_(pa.string())
+HARVEST_SCHEMAS = {
+    'matchups': pa.schema([
+        ('league_id', pa.int64()), ('season', pa.int16()), ('week', pa.int8()), ('roster_id', pa.int16()),
+        ('matchup_id', pa.int16()), ('points', pa.float32()), ('custom_points', pa.float32()),
+        ('starters', _STRINGS), ('starters_points', pa.list_(pa.float32())), ('players', _STRINGS),
+        ('fetched_at', pa.int64()),
+    ]),
+    'transactions': pa.schema([
+        ('league_id', pa.int64()), ('season', pa.int16()), ('week', pa.int8()), ('transaction_id', pa.int64()),
+        ('type', pa.string()), ('status', pa.string()), ('creator', pa.string()), ('created', pa.int64()),
+        ('status_updated', pa.int64()), ('roster_ids', pa.list_(pa.int16())), ('adds', pa.string()),
+        ('drops', pa.string()), ('draft_picks', pa.string()), ('waiver_budget', pa.string()),
+        ('settings', pa.string()), ('fetched_at', pa.int64()),
+    ]),
+    'rosters': pa.schema([
+        ('league_id', pa.int64()), ('season', pa.int16()), ('roster_id', pa.int16()), ('owner_id', pa.string()),
+        ('players', _STRINGS), ('starters', _STRINGS), ('reserve', _STRINGS), ('taxi', _STRINGS),
+        ('wins', pa.int16()), ('losses', pa.int16()), ('ties', pa.int16()), ('fpts', pa.float32()),
+        ('fpts_against', pa.float32()), ('fetched_at', pa.int64()),
+    ]),
+    'drafts': pa.schema([
+        ('draft_id', pa.int64()), ('league_id', pa.int64()), ('season', pa.int16()), ('type', pa.string()),
+        ('status', pa.string()), ('start_time', pa.int64()), ('last_picked', pa.int64()), ('teams', pa.int8()),
+        ('rounds', pa.int16()), ('scoring_type', pa.string()), ('superflex', pa.int8()), ('fetched_at', pa.int64()),
+    ]),
+    'draft_picks': pa.schema([
+        ('draft_id', pa.int64()), ('season', pa.int16()), ('player_id', pa.string()), ('pick_no', pa.int16()),
+        ('round', pa.int16()), ('draft_slot', pa.int8()), ('roster_id', pa.int16()), ('is_keeper', pa.bool_()),
+        ('position', pa.string()), ('fetched_at', pa.int64()),
+    ]),
+}
+
+# Columns identifying a row; read_harvest keeps the latest fetch of each
+HARVEST_KEYS = {
+    'matchups': ['league_id', 'week', 'roster_id'],
+    'transactions': ['league_id', 'transaction_id'],
+    'rosters': ['league_id', 'roster_id'],
+    'drafts': ['draft_id'],
+    'draft_picks': ['draft_id', 'pick_no'],
+}
+
+MANIFEST_SCHEMA = """
+CREATE TABLE IF NOT EXISTS harvested (
+    kind TEXT NOT NULL,
+    league_id INTEGER NOT NULL,
+    week INTEGER NOT NULL,
+    final INTEGER NOT NULL,
+    PRIMARY KEY (kind, league_id, week)
+)
+"""
+
+STATUS_PRIORITY = {'in_season': 0, 'post_season': 1, 'complete': 2, 'drafting': 3, 'pre_draft': 4}
+
+
+def _json(value):
+    return json.dumps(value, separators=(',', ':')) if value is not None else None
+
+
+def _points(settings, name):
+    if not settings or settings.get(name) is None:
+        return None
+    return settings[name] + (settings.get(f'{name}_decimal') or 0) / 100
+
+
+def _matchup_rows(league_id, season, week, matchups, fetched_at):
+    return [{
+        'league_id': league_id, 'season': season, 'week': week, 'roster_id': m.get('roster_id'),
+        'matchup_id': m.get('matchup_id'), 'points': m.get('points'), 'custom_points': m.get('custom_points'),
+        'starters': m.get('starters'), 'starters_points': m.get('starters_points'), 'players': m.get('players'),
+        'fetched_at': fetched_at,
+    } for m in matchups or []]
+
+
+def _transaction_rows(league_id, season, week, transactions, fetched_at):
+    return [{
+        'league_id': league_id, 'season': season, 'week': week, 'transaction_id': int(t['transaction_id']),
+        'type': t.get('type'), 'status': t.get('status'), 'creator': t.get('creator'), 'created': t.get('created'),
+        'status_updated': t.get('status_updated'), 'roster_ids': t.get('roster_ids'), 'adds': _json(t.get('adds')),
+        'drops': _json(t.get('drops')), 'draft_picks': _json(t.get('draft_picks')),
+        'waiver_budget': _json(t.get('waiver_budget')), 'settings': _json(t.get('settings')), 'fetched_at': fetched_at,
+    } for t in transactions or []]
+
+
+def _roster_rows(league_id, season, week, rosters, fetched_at):
+    return [{
+        'league_id': league_id, 'season': season, 'roster_id': r.get('roster_id'), 'owner_id': r.get('owner_id'),
+        'players': r.get('players'), 'starters': r.get('starters'), 'reserve': r.get('reserve'), 'taxi': r.get('taxi'),
+        'wins': (r.get('settings') or {}).get('wins'), 'losses': (r.get('settings') or {}).get('losses'),
+        'ties': (r.get('settings') or {}).get('ties'), 'fpts': _points(r.get('settings'), 'fpts'),
+        'fpts_against': _points(r.get('settings'), 'fpts_against'), 'fetched_at': fetched_at,
+    } for r in rosters or []]
+
+
+def _draft_rows(league_id, season, draft, fetched_at):
+    settings = draft.get('settings') or {}
+    return {
+        'draft_id': int(draft['draft_id']), 'league_id': league_id, 'season': int(draft.get('season') or season),
+        'type': draft.get('type'), 'status': draft.get('status'), 'start_time': draft.get('start_time'),
+        'last_picked': draft.get('last_picked'), 'teams': settings.get('teams'), 'rounds': settings.get('rounds'),
+        'scoring_type': (draft.get('metadata') or {}).get('scoring_type'),
+        'superflex': int((settings.get('slots_super_flex') or 0) > 0 or (settings.get('slots_qb') or 0) >= 2),
+        'fetched_at': fetched_at,
+    }
+
+
+def _draft_pick_rows(draft_id, season, picks, fetched_at):
+    return [{
+        'draft_id': draft_id, 'season': season, 'player_id': p.get('player_id'), 'pick_no': p.get('pick_no'),
+        'round': p.get('round'), 'draft_slot': p.get('draft_slot'), 'roster_id': p.get('roster_id'),
+        'is_keeper': bool(p.get('is_keeper')), 'position': (p.get('metadata') or {}).get('position'),
+        'fetched_at': fetched_at,
+    } for p in picks or []]
+
+
+HARVEST_KINDS = {
+    'matchups': (lambda league_id, week: sleeper.get_league_matchups(league_id, week, ttl=None), _matchup_rows),
+    'transactions': (lambda league_id, week: sleeper.get_league_transactions(league_id, week), _transaction_rows),
+    'rosters': (lambda league_id, week: sleeper.get_league_rosters(league_id, ttl=None), _roster_rows),
+}
+
+
+def load_harvest_targets(league_store_dir=os.path.join('data', 'fantasy_leagues', 'sleeper_leagues')):
+    """
+    Reads the leagues to harvest from the crawled league store.
+
+    Parameters:
+        league_store_dir (str): Directory of the league store written by the crawler, or a
+            legacy flattened sleeper_leagues.csv.
+
+    Returns:
+        pandas.DataFrame: league_id, season, status, start_week and last_scored_leg.
+    """
+    if league_store_dir.endswith('.csv'):
+        columns = ['league_id', 'season', 'status', 'settings.start_week', 'settings.last_scored_leg']
+        leagues = pd.read_csv(league_store_dir, usecols=lambda column: column in columns, dtype=str)
+        return pd.DataFrame({
+            'league_id': leagues['league_id'].astype('int64'),
+            'season': pd.to_numeric(leagues.get('season'), errors='coerce'),
+            'status': leagues.get('status'),
+            'start_week': pd.to_numeric(leagues.get('settings.start_week'), errors='coerce'),
+            'last_scored_leg': pd.to_numeric(leagues.get('settings.last_scored_leg'), errors='coerce'),
+        })
+    frames = []
+    for chunk in LeagueRecordBuffer(league_store_dir).iter_batches(columns=['league_id', 'season', 'status', 'settings']):
+        settings = pd.DataFrame([json.loads(s) if isinstance(s, str) else {} for s in chunk['settings']],
+                                columns=['start_week', 'last_scored_leg'], index=chunk.index)
+        frames.append(pd.DataFrame({
+            'league_id': chunk['league_id'].astype('int64'),
+            'season': pd.to_numeric(chunk['season'], errors='coerce'),
+            'status': chunk['status'],
+            'start_week': pd.to_numeric(settings['start_week'], errors='coerce'),
+            'last_scored_leg': pd.to_numeric(settings['last_scored_leg'], errors='coerce'),
+        }))
+    if not frames:
+        return pd.DataFrame(columns=['league_id', 'season', 'status', 'start_week', 'last_scored_leg'])
+    return pd.concat(frames, ignore_index=True)
+
+
+def read_harvest(kind, directory=HARVEST_DIRECTORY, filters=None, latest=True):
+    """
+    Loads harvested rows of one kind.
+
+    Rows for weeks that were still in progress can be fetched more than once; by default
+    only the latest fetch of each row is kept.
+
+    Parameters:
+        kind (str): 'matchups', 'transactions' or 'rosters'.
+        filters (list, optional): pyarrow filters, e.g. [('season', '=', 2024), ('week', '<=', 4)].
+        latest (bool): Drop superseded fetches.
+            - Defaults to True.
+
+    Returns:
+        pandas.DataFrame: The harvested rows.
+    """
+    path = os.path.join(directory, kind)
+    if not os.path.exists(path):
+        return HARVEST_SCHEMAS[kind].empty_table().to_pandas()
+    dataset = ds.dataset(path, format='parquet', partitioning='hive', schema=HARVEST_SCHEMAS[kind])
+    table = dataset.to_table(filter=pq.filters_to_expression(filters) if filters else None)
+    frame = table.to_pandas()
+    if latest and len(frame):
+        frame = frame.sort_values('fetched_at').drop_duplicates(HARVEST_KEYS[kind], keep='last').reset_index(drop=True)
+    return frame
+
+
+class SleeperHarvester:
+    """
+    Resumable, concurrent harvester of league matchups, transactions and rosters.
+
+    Leagues are processed most recent and most active first: by season, then in-season
+    before complete leagues, then by the number of weeks scored. Each (kind, league,
+    week) call runs on a thread pool under sleeper_API's shared rate limiter.
+
+    Results are buffered per partition and written as Parquet files under
+    directory/<kind>/season=<season>/week=<week>/. A SQLite manifest records each
+    finished call after its rows are on disk, and whether the data was final: the week
+    has passed, the league is complete, or the season is over. Final calls are never
+    repeated. Calls for the current week are fetched again on the next run, and
+    read_harvest keeps the latest fetch. An interrupted run resumes where it stopped.
+
+    Parameters:
+        directory (str): Root directory of the harvested files and manifest.
+            - Defaults to 'data/sleeper_harvest'.
+        max_workers (int): Number of requests kept in flight.
+            - Defaults to 16.
+        flush_rows (int): Buffered rows per kind that trigger a write.
+            - Defaults to 50000.
+    """
+
+    def __init__(self, directory=HARVEST_DIRECTORY, max_workers=16, flush_rows=50000):
+        self.directory = directory
+        self.max_workers = max_workers
+        self.flush_rows = flush_rows
+        os.makedirs(directory, exist_ok=True)
+        self._connection = sqlite3.connect(os.path.join(directory, 'harvest_manifest.sqlite'))
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute(MANIFEST_SCHEMA)
+        self._connection.commit()
+        self._buffers = {kind: [] for kind in HARVEST_SCHEMAS}
+        self._finished = []
+        self._stored_drafts = set()
+
+    def close(self):
+        self._connection.close()
+
+    def _final_calls(self, kind):
+        rows = self._connection.execute('SELECT league_id, week FROM harvested WHERE kind = ? AND final = 1', (kind,))
+        return {(league_id, week) for league_id, week in rows}
+
+    @staticmethod
+    def prioritize(leagues):
+        # Most recent season first, then in-season leagues, then the most weeks scored
+        order = pd.DataFrame({
+            'season': -pd.to_numeric(leagues['season'], errors='coerce').fillna(0).to_numpy(),
+            'status': leagues['status'].map(STATUS_PRIORITY).fillna(len(STATUS_PRIORITY)).to_numpy(),
+            'activity': -pd.to_numeric(leagues['last_scored_leg'], errors='coerce').fillna(0).to_numpy(),
+        })
+        return leagues.iloc[np.lexsort((order['activity'], order['status'], order['season']))].reset_index(drop=True)
+
+    def plan(self, leagues, kinds=('matchups', 'transactions', 'rosters'), nfl_state=None):
+        """
+        Lists the calls still needed, in priority order.
+
+        Matchups and transactions are requested for every week from the league's start
+        week through its last scored week. Rosters and drafts are requested once per league.
+
+        Parameters:
+            leagues (pandas.DataFrame): Output of load_harvest_targets.
+            kinds (tuple): Kinds of data to harvest.
+            nfl_state (dict, optional): Result of sleeper_API.get_nfl_state, used to tell
+                finished weeks from the current one.
+
+        Yields:
+            tuple: (kind, league_id, season, week, final).
+        """
+        state = nfl_state or {}
+        current_season = int(state.get('season') or 0)
+        current_week = int(state.get('week') or 0)
+        done = {kind: self._final_calls(kind) for kind in kinds}
+        if 'drafts' in kinds:
+            self._stored_drafts = {draft_id for draft_id, _ in self._final_calls('draft_picks')}
+        for league in self.prioritize(leagues).itertuples(index=False):
+            league_id = int(league.league_id)
+            season = int(league.season) if pd.notna(league.season) else 0
+            complete = league.status == 'complete' or 0 < season < current_season
+            last_week = int(league.last_scored_leg) if pd.notna(league.last_scored_leg) else 0
+            if complete and last_week == 0:
+                last_week = REGULAR_SEASON_WEEKS
+            start_week = int(league.start_week) if pd.notna(league.start_week) else 1
+            for kind in kinds:
+                if kind == 'drafts':
+                    # Whether every draft is complete is only known once the league's drafts are fetched
+                    if (league_id, 0) not in done[kind]:
+                        yield kind, league_id, season, 0, bool(complete)
+                    continue
+                if kind == 'rosters':
+                    if (league_id, 0) not in done[kind]:
+                        yield kind, league_id, season, 0, bool(complete)
+                    continue
+                for week in range(max(start_week, 1), last_week + 1):
+                    if (league_id, week) in done[kind]:
+                        continue
+                    final = bool(complete) or (season == current_season and week < current_week)
+                    yield kind, league_id, season, week, final
+
+    def _fetch(self, call):
+        # Returns (call, rows per kind, manifest entries, error)
+        kind, league_id, season, week, final = call
+        if kind == 'drafts':
+            return self._fetch_drafts(call)
+        fetch, to_rows = HARVEST_KINDS[kind]
+        # A malformed payload fails this call only, like a request error
+        try:
+            data = fetch(league_id, week)
+            if data is None:
+                return call, None, None, None
+            rows = to_rows(league_id, season, week, data, time.time_ns())
+        except Exception as e:
+            return call, None, None, e
+        return call, {kind: rows}, [(kind, league_id, week, int(final))], None
+
+    def _fetch_drafts(self, call):
+        # Picks are only stored for complete drafts, and each draft's picks are fetched once
+        _, league_id, season, _, final = call
+        try:
+            drafts = sleeper.get_league_drafts(league_id)
+            if drafts is None:
+                return call, None, None, None
+            tables = {'drafts': [], 'draft_picks': []}
+            finished = []
+            for draft in drafts:
+                draft_id = int(draft['draft_id'])
+                if draft.get('status') != 'complete' or draft_id in self._stored_drafts:
+                    continue
+                picks = sleeper.get_draft_picks(draft_id, ttl=None)
+                if picks is None:
+                    return call, None, None, None
+                fetched_at = time.time_ns()
+                row = _draft_rows(league_id, season, draft, fetched_at)
+                tables['drafts'].append(row)
+                tables['draft_picks'].extend(_draft_pick_rows(draft_id, row['season'], picks, fetched_at))
+                finished.append(('draft_picks', draft_id, 0, 1))
+        except Exception as e:
+            return call, None, None, e
+        all_complete = bool(drafts) and all(draft.get('status') == 'complete' for draft in drafts)
+        finished.append(('drafts', league_id, 0, int(final or all_complete)))
+        return call, tables, finished, None
+
+    def _write_partition(self, kind, rows):
+        table = pa.Table.from_pylist(rows, schema=HARVEST_SCHEMAS[kind])
+        frame = table.select(['season', 'week']).to_pandas() if 'week' in HARVEST_SCHEMAS[kind].names else \
+            table.select(['season']).to_pandas().assign(week=None)
+        for (season, week), indices in frame.groupby(['season', 'week'], dropna=False).indices.items():
+            partition = os.path.join(self.directory, kind, f'season={season}')
+            if week is not None and not pd.isna(week):
+                partition = os.path.join(partition, f'week={int(week):02d}')
+            os.makedirs(partition, exist_ok=True)
+            part_file = os.path.join(partition, f'part-{time.time_ns()}.parquet')
+            pq.write_table(table.take(indices), part_file + '.tmp', compression='zstd')
+            os.replace(part_file + '.tmp', part_file)
+
+    def flush(self):
+        # Write buffered rows, then record their calls as finished so a crash never skips unwritten data
+        for kind, rows in self._buffers.items():
+            if rows:
+                self._write_partition(kind, rows)
+                self._buffers[kind] = []
+        self._connection.executemany('INSERT OR REPLACE INTO harvested (kind, league_id, week, final) VALUES (?, ?, ?, ?)',
+                                     self._finished)
+        self._connection.commit()
+        self._finished = []
+
+    def harvest(self, leagues, kinds=('matchups', 'transactions', 'rosters'), max_calls=None):
+        """
+        Runs the harvest.
+
+        Parameters:
+            leagues (pandas.DataFrame): Output of load_harvest_targets.
+            kinds (tuple): Kinds of data to harvest; 'drafts' also stores the picks of
+                every complete draft.
+            max_calls (int, optional): Stop after this many calls, e.g. to harvest the
+                highest-priority leagues first and continue in a later run.
+
+        Returns:
+            dict: Number of successful calls and rows written per kind.
+        """
+        calls = self.plan(leagues, kinds, sleeper.get_nfl_state())
+        if max_calls is not None:
+            calls = islice(calls, max_calls)
+        summary = {kind: {'calls': 0, 'rows': 0} for kind in kinds}
+        failures = 0
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while True:
+                batch = list(islice(calls, self.max_workers * 16))
+                if not batch:
+                    break
+                for call, tables, finished, error in executor.map(self._fetch, batch):
+                    kind, league_id, _, week, _ = call
+                    if tables is None:
+                        failures += 1
+                        if error is not None:
+                            print(f'Harvest Error ({kind} {league_id} week {week}): {error}')
+                        continue
+                    for table_kind, rows in tables.items():
+                        self._buffers[table_kind].extend(rows)
+                        summary[kind]['rows'] += len(rows)
+                    self._finished.extend(finished)
+                    summary[kind]['calls'] += 1
+                if any(len(rows) >= self.flush_rows for rows in self._buffers.values()):
+                    self.flush()
+                print(f'\rHarvesting | ' + ' | '.join(f'{kind}: {s["calls"]:,} calls, {s["rows"]:,} rows' for kind, s in summary.items())
+                      + f' | Failed: {failures:,}', end='', flush=True)
+        self.flush()
+        print()
+        return summary
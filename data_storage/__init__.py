@@ -0,0 +1,23 @@
+from .league_store import *
+from .league_cleaning import *
+from .crawl_checkpoint import *
+from .crawl_frontier import *
+from .sqlite_frontier import *
+from .crawl_coordinator import *
+from .id_set import *
+from .history_store import *
+from .s3_sync import *
+from .player_crosswalk import *
+
+__all__ = (
+    league_store.__all__ +
+    league_cleaning.__all__ +
+    crawl_checkpoint.__all__ +
+    crawl_frontier.__all__ +
+    sqlite_frontier.__all__ +
+    crawl_coordinator.__all__ +
+    id_set.__all__ +
+    history_store.__all__ +
+    s3_sync.__all__ +
+    player_crosswalk.__all__
+)
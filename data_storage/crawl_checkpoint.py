@@ -0,0 +1,207 @@
+import os
+import glob
+import json
+import zlib
+import numpy as np
+import pyarrow.parquet as pq
+from .id_set import Int64HashSet
+from .crawl_frontier import CrawlFrontier
+
+__all__ = ['CrawlCheckpoint']
+
+
+def _fsync_directory(directory):
+    # Make renames durable on filesystems that support directory fsync
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _atomic_write(path, write):
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as f:
+        write(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+    _fsync_directory(os.path.dirname(path) or '.')
+
+
+class CrawlCheckpoint:
+    """
+    Incremental checkpoint for the Sleeper league crawler.
+
+    Progress is stored as a periodic snapshot plus a write-ahead log. Each save appends a
+    single log record holding only what changed in the CrawlFrontier since the previous
+    save: users queried, users queued, the (normally empty) league queue, new league IDs
+    and the league store part files written that cycle. Every `compact_every` records the
+    full state is written to a new snapshot and the log is reset, so save time stays flat
+    as the crawl grows.
+
+    Log records are checksummed and fsynced, and snapshots are written to a temporary file
+    and renamed into place, so a crash mid-write never corrupts earlier progress. A torn
+    final record is dropped on load, rolling the crawl back to the previous save.
+
+    Parameters:
+        directory (str): Directory holding the snapshot and log files.
+        compact_every (int): Number of log records between snapshots.
+            - Defaults to 50.
+    """
+
+    def __init__(self, directory, compact_every=50):
+        self.directory = directory
+        self.compact_every = compact_every
+        self.snapshot_file = os.path.join(directory, 'crawl_snapshot.json')
+        self.log_file = os.path.join(directory, 'crawl_log.jsonl')
+        self.seq = 0
+        self.records_since_snapshot = 0
+        self.league_parts = set()
+        os.makedirs(directory, exist_ok=True)
+
+    def exists(self):
+        return os.path.exists(self.snapshot_file)
+
+    def load(self):
+        """
+        Rebuilds the crawl frontier by replaying the log on top of the latest snapshot.
+
+        Returns:
+            tuple or None: (frontier, league_parts) where frontier is a CrawlFrontier and
+            league_parts the set of committed league store part files, or None if no
+            checkpoint has been written yet.
+        """
+        if not self.exists():
+            return None
+        with open(self.snapshot_file, 'r') as f:
+            snapshot = json.load(f)
+
+        self.seq = snapshot['seq']
+        league_queue = snapshot['league_queue']
+        user_queue = dict.fromkeys(snapshot['user_queue'])
+        league_index = Int64HashSet(np.load(os.path.join(self.directory, snapshot['league_index_file'])))
+        if 'seen_users_file' in snapshot:
+            seen_users = Int64HashSet(np.load(os.path.join(self.directory, snapshot['seen_users_file'])))
+            users_queried_count = snapshot['users_queried_count']
+        else:
+            # Older snapshots listed every queried user instead of storing a seen-set
+            seen_users = Int64HashSet(snapshot['users_queried'])
+            users_queried_count = len(snapshot['users_queried'])
+        self.league_parts = set(snapshot['league_parts'])
+
+        self.records_since_snapshot = 0
+        for record in self._read_log():
+            if record['seq'] <= self.seq:
+                continue
+            for user_id in record['users_queried']:
+                user_queue.pop(user_id, None)
+            users_queried_count += len(record['users_queried'])
+            user_queue.update(dict.fromkeys(record['users_queued']))
+            seen_users.update(record['users_queued'])
+            league_queue = record['league_queue']
+            league_index.update(record['league_ids'])
+            self.league_parts.update(record['league_parts'])
+            self.seq = record['seq']
+            self.records_since_snapshot += 1
+
+        frontier = CrawlFrontier(user_queue, seen_users, league_queue, league_index, users_queried_count)
+        return frontier, set(self.league_parts)
+
+    def _read_log(self):
+        # Yield valid records, truncating the log at the first torn or corrupt line
+        if not os.path.exists(self.log_file):
+            return
+        valid_bytes = 0
+        with open(self.log_file, 'rb') as f:
+            for line in f:
+                checksum, _, payload = line.rstrip(b'\n').partition(b' ')
+                if not line.endswith(b'\n') or checksum != b'%08x' % zlib.crc32(payload):
+                    break
+                valid_bytes += len(line)
+                yield json.loads(payload)
+        if valid_bytes < os.path.getsize(self.log_file):
+            print(f'Discarding incomplete checkpoint record in {self.log_file}')
+            with open(self.log_file, 'r+b') as f:
+                f.truncate(valid_bytes)
+
+    def save(self, league_store, frontier):
+        """
+        Appends the changes made since the previous save to the log.
+
+        Parameters:
+            league_store (LeagueRecordBuffer): The flushed league store.
+            frontier (CrawlFrontier): The crawl frontier; its pending delta is consumed.
+        """
+        users_queried, users_queued = frontier.take_delta()
+        new_parts = [os.path.basename(path) for path in league_store.part_files()
+                     if os.path.basename(path) not in self.league_parts]
+        league_ids = []
+        for part in new_parts:
+            column = pq.read_table(os.path.join(league_store.directory, part), columns=['league_id'])
+            league_ids.extend(column['league_id'].to_pylist())
+
+        record = {
+            'seq': self.seq + 1,
+            'users_queried': users_queried,
+            'users_queued': users_queued,
+            'league_queue': frontier.league_queue,
+            'league_ids': league_ids,
+            'league_parts': new_parts,
+        }
+        payload = json.dumps(record, separators=(',', ':')).encode()
+        with open(self.log_file, 'ab') as f:
+            f.write(b'%08x ' % zlib.crc32(payload) + payload + b'\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+        self.seq += 1
+        self.records_since_snapshot += 1
+        self.league_parts.update(new_parts)
+
+    def maybe_compact(self, frontier):
+        if self.records_since_snapshot >= self.compact_every:
+            self.compact(frontier)
+            return True
+        return False
+
+    def compact(self, frontier, league_parts=None):
+        """
+        Writes the full crawl state to a new snapshot and resets the log.
+
+        Parameters:
+            frontier (CrawlFrontier): The crawl frontier; its pending delta is discarded
+                since the snapshot already contains it.
+            league_parts (iterable, optional): League store part files covered by the
+                snapshot. Defaults to the parts recorded so far.
+        """
+        if league_parts is not None:
+            self.league_parts = set(league_parts)
+        frontier.take_delta()
+        league_index_file = f'crawl_snapshot_{self.seq:08d}_leagues.npy'
+        seen_users_file = f'crawl_snapshot_{self.seq:08d}_users.npy'
+        _atomic_write(os.path.join(self.directory, league_index_file), lambda f: np.save(f, frontier.league_index.to_array()))
+        _atomic_write(os.path.join(self.directory, seen_users_file), lambda f: np.save(f, frontier.seen_users.to_array()))
+
+        snapshot = {
+            'seq': self.seq,
+            'league_index_file': league_index_file,
+            'seen_users_file': seen_users_file,
+            'users_queried_count': frontier.users_queried_count,
+            'league_queue': frontier.league_queue,
+            'user_queue': list(frontier.user_queue),
+            'league_parts': sorted(self.league_parts),
+        }
+        _atomic_write(self.snapshot_file, lambda f: f.write(json.dumps(snapshot).encode()))
+        _atomic_write(self.log_file, lambda f: None)
+
+        # Remove arrays from older snapshots
+        for path in glob.glob(os.path.join(self.directory, 'crawl_snapshot_*.npy')):
+            if os.path.basename(path) not in (league_index_file, seen_users_file):
+                os.remove(path)
+        self.records_since_snapshot = 0
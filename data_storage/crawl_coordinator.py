@@ -0,0 +1,249 @@
+import os
+import json
+import time
+import sqlite3
+from contextlib import contextmanager
+
+__all__ = ['CrawlCoordinator', 'shard_of']
+
+_MULTIPLIER = 0x9E3779B97F4A7C15  # 2**64 / golden ratio, for Fibonacci hashing
+_UINT64_MASK = (1 << 64) - 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    user_id INTEGER PRIMARY KEY,
+    shard INTEGER NOT NULL,
+    state INTEGER NOT NULL,
+    position INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS users_queue ON users (shard, position) WHERE state = 0;
+CREATE INDEX IF NOT EXISTS users_leased ON users (shard) WHERE state = 1;
+
+CREATE TABLE IF NOT EXISTS leagues (
+    league_id INTEGER PRIMARY KEY,
+    shard INTEGER NOT NULL,
+    state INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    payload TEXT
+);
+CREATE INDEX IF NOT EXISTS leagues_queue ON leagues (shard, position) WHERE state = 0;
+CREATE INDEX IF NOT EXISTS leagues_leased ON leagues (shard) WHERE state = 1;
+
+CREATE TABLE IF NOT EXISTS league_parts (
+    shard INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    PRIMARY KEY (shard, name)
+);
+
+CREATE TABLE IF NOT EXISTS state (
+    key TEXT PRIMARY KEY,
+    value INTEGER
+);
+"""
+
+
+def shard_of(id, num_shards):
+    """
+    Assigns a user or league ID to a shard.
+
+    Sleeper IDs are sequential snowflakes, so they are hashed before taking the modulus
+    to spread neighbouring IDs across shards.
+
+    Returns:
+        int: The shard, in [0, num_shards).
+    """
+    return (((int(id) * _MULTIPLIER) & _UINT64_MASK) >> 32) % num_shards
+
+
+class CrawlCoordinator:
+    """
+    Shared work queue for a league crawl sharded across worker processes.
+
+    Every user and league ID is assigned to a shard by hash, and each shard is crawled by
+    one worker. Workers lease batches of their shard's queued users or leagues, query the
+    Sleeper API, and report the results back. Reporting a batch marks it done and adds
+    the users and leagues it discovered in a single transaction. The tables double as
+    the global seen-sets, so an ID discovered by several workers is still queued once,
+    on its owning shard.
+
+    The SQLite database is the checkpoint for the whole crawl. Each worker writes leagues
+    to its own league store, and the part files are recorded together with the batch that
+    produced them. A worker that crashes is restarted on its own. reset_leases() returns
+    its unfinished batches to the queue, and league_parts() tells it which part files to
+    keep. The other workers are not affected.
+
+    Parameters:
+        path (str): Path of the SQLite database shared by the workers.
+        num_shards (int): Number of shards. Fixed when the database is created.
+        timeout (float): Seconds to wait for another worker's write transaction.
+            - Defaults to 60.
+    """
+
+    def __init__(self, path, num_shards, timeout=60):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._connection = sqlite3.connect(path, timeout=timeout, isolation_level=None)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA synchronous=FULL')
+        with self._transaction() as connection:
+            # executescript() would commit, so the schema is applied statement by statement
+            for statement in SCHEMA.split(';'):
+                if statement.strip():
+                    connection.execute(statement)
+            connection.execute("INSERT OR IGNORE INTO state (key, value) VALUES ('num_shards', ?)", (num_shards,))
+            self.num_shards = connection.execute("SELECT value FROM state WHERE key = 'num_shards'").fetchone()[0]
+        if self.num_shards != num_shards:
+            raise ValueError(f'{path} was created with {self.num_shards} shards, not {num_shards}')
+
+    def close(self):
+        self._connection.close()
+
+    @contextmanager
+    def _transaction(self):
+        # BEGIN IMMEDIATE takes the write lock up front, so concurrent workers queue instead of deadlocking
+        self._connection.execute('BEGIN IMMEDIATE')
+        try:
+            yield self._connection
+        except BaseException:
+            self._connection.execute('ROLLBACK')
+            raise
+        self._connection.execute('COMMIT')
+
+    def _user_rows(self, user_ids):
+        position = time.time_ns()
+        return [(int(user_id), shard_of(user_id, self.num_shards), position + i) for i, user_id in enumerate(user_ids)]
+
+    def _league_rows(self, leagues):
+        position = time.time_ns()
+        return [(int(league['league_id']), shard_of(league['league_id'], self.num_shards), position + i,
+                 json.dumps(league, separators=(',', ':'))) for i, league in enumerate(leagues)]
+
+    @staticmethod
+    def _insert_users(connection, rows):
+        before = connection.total_changes
+        connection.executemany('INSERT OR IGNORE INTO users (user_id, shard, state, position) VALUES (?, ?, 0, ?)', rows)
+        return connection.total_changes - before
+
+    @staticmethod
+    def _insert_leagues(connection, rows):
+        before = connection.total_changes
+        connection.executemany('INSERT OR IGNORE INTO leagues (league_id, shard, state, position, payload) VALUES (?, ?, 0, ?, ?)', rows)
+        return connection.total_changes - before
+
+    def seed(self, leagues=(), user_ids=(), captured_league_ids=(), queried_user_ids=()):
+        """
+        Adds starting work, or the state of an existing crawl, to the queue.
+
+        Parameters:
+            leagues (iterable): League dictionaries to queue.
+            user_ids (iterable): User IDs to queue.
+            captured_league_ids (iterable): League IDs already stored, never to be queued.
+            queried_user_ids (iterable): User IDs already queried or seen, never to be
+                queued unless also listed in user_ids.
+        """
+        user_rows = self._user_rows(user_ids)
+        league_rows = self._league_rows(list(leagues))
+        with self._transaction() as connection:
+            # Queued IDs go in first so they stay queued if they also appear in the done sets
+            self._insert_users(connection, user_rows)
+            self._insert_leagues(connection, league_rows)
+            connection.executemany('INSERT OR IGNORE INTO users (user_id, shard, state, position) VALUES (?, ?, 2, 0)',
+                                   ((int(i), shard_of(i, self.num_shards)) for i in queried_user_ids))
+            connection.executemany('INSERT OR IGNORE INTO leagues (league_id, shard, state, position) VALUES (?, ?, 2, 0)',
+                                   ((int(i), shard_of(i, self.num_shards)) for i in captured_league_ids))
+
+    def reset_leases(self, shard):
+        """
+        Returns a shard's leased but unfinished batches to the queue. Called when the
+        shard's worker (re)starts.
+
+        Returns:
+            int: The number of users and leagues requeued.
+        """
+        with self._transaction() as connection:
+            before = connection.total_changes
+            connection.execute('UPDATE users SET state = 0 WHERE shard = ? AND state = 1', (shard,))
+            connection.execute('UPDATE leagues SET state = 0 WHERE shard = ? AND state = 1', (shard,))
+            return connection.total_changes - before
+
+    def lease_users(self, shard, count):
+        # Lease up to `count` of the shard's queued users, oldest first
+        with self._transaction() as connection:
+            rows = connection.execute('SELECT user_id FROM users WHERE shard = ? AND state = 0 ORDER BY position LIMIT ?',
+                                      (shard, count)).fetchall()
+            connection.executemany('UPDATE users SET state = 1 WHERE user_id = ?', rows)
+        return [str(user_id) for user_id, in rows]
+
+    def lease_leagues(self, shard, count):
+        # Lease up to `count` of the shard's queued leagues, oldest first, with their payloads
+        with self._transaction() as connection:
+            rows = connection.execute('SELECT league_id, payload FROM leagues WHERE shard = ? AND state = 0 ORDER BY position LIMIT ?',
+                                      (shard, count)).fetchall()
+            connection.executemany('UPDATE leagues SET state = 1 WHERE league_id = ?', [(league_id,) for league_id, _ in rows])
+        return [(str(league_id), json.loads(payload)) for league_id, payload in rows]
+
+    def complete_users(self, user_ids, leagues):
+        """
+        Marks leased users as queried and queues the leagues found for them.
+
+        Parameters:
+            user_ids (list): The users of the finished batch.
+            leagues (list): League dictionaries returned for those users.
+
+        Returns:
+            int: The number of leagues that had not been seen before.
+        """
+        league_rows = self._league_rows(leagues)
+        with self._transaction() as connection:
+            connection.executemany('UPDATE users SET state = 2 WHERE user_id = ?', [(int(user_id),) for user_id in user_ids])
+            return self._insert_leagues(connection, league_rows)
+
+    def complete_leagues(self, shard, league_ids, user_ids, league_parts):
+        """
+        Marks leased leagues as captured and queues the users found in them.
+
+        Parameters:
+            shard (int): The worker's shard.
+            league_ids (list): The leagues of the finished batch.
+            user_ids (list): Member user IDs of those leagues.
+            league_parts (list): League store part files holding the batch.
+
+        Returns:
+            int: The number of users that had not been seen before.
+        """
+        user_rows = self._user_rows(user_ids)
+        with self._transaction() as connection:
+            connection.executemany('INSERT OR IGNORE INTO league_parts (shard, name) VALUES (?, ?)',
+                                   [(shard, name) for name in league_parts])
+            connection.executemany('UPDATE leagues SET state = 2, payload = NULL WHERE league_id = ?',
+                                   [(int(league_id),) for league_id in league_ids])
+            return self._insert_users(connection, user_rows)
+
+    def league_parts(self, shard):
+        # League store part files committed by the shard's worker
+        return {name for name, in self._connection.execute('SELECT name FROM league_parts WHERE shard = ?', (shard,))}
+
+    def is_finished(self):
+        # True when no shard has queued or leased work left
+        for table in ('users', 'leagues'):
+            if self._connection.execute(f'SELECT 1 FROM {table} WHERE state < 2 LIMIT 1').fetchone() is not None:
+                return False
+        return True
+
+    def progress(self):
+        """
+        Summarizes the crawl per shard.
+
+        Returns:
+            dict: {shard: {'users_queued', 'users_leased', 'users_queried', 'leagues_queued',
+            'leagues_leased', 'leagues_captured'}}.
+        """
+        names = {'users': ('users_queued', 'users_leased', 'users_queried'),
+                 'leagues': ('leagues_queued', 'leagues_leased', 'leagues_captured')}
+        summary = {shard: {name: 0 for pair in names.values() for name in pair} for shard in range(self.num_shards)}
+        for table, columns in names.items():
+            for shard, state, count in self._connection.execute(f'SELECT shard, state, COUNT(*) FROM {table} GROUP BY shard, state'):
+                summary[shard][columns[state]] = count
+        return summary
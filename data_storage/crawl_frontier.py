@@ -0,0 +1,104 @@
+from collections import deque
+from .id_set import Int64HashSet
+
+__all__ = ['CrawlFrontier']
+
+
+class CrawlFrontier:
+    """
+    In-memory breadth-first frontier for the Sleeper league crawler.
+
+    Users wait in a FIFO deque and leagues in an insertion-ordered dict, so pushing and
+    popping are O(1). Every user ID ever queued is remembered in a compact seen-set, so a
+    user is queued, and therefore queried, at most once. Captured league IDs live in a
+    second seen-set used to skip leagues that were already stored.
+
+    The frontier also records the users queued and queried since the last call to
+    take_delta(), which is what the incremental checkpoint writes each cycle.
+
+    Parameters:
+        user_queue (iterable): User IDs waiting to be queried, in order.
+        seen_users (iterable or Int64HashSet): Every user ID queued or queried so far.
+        league_queue (dict, optional): Leagues waiting to be stored, keyed by league ID.
+        league_index (iterable or Int64HashSet): IDs of leagues already captured.
+        users_queried_count (int): Number of users queried so far.
+    """
+
+    def __init__(self, user_queue=(), seen_users=(), league_queue=None, league_index=(), users_queried_count=0):
+        self.user_queue = deque(user_queue)
+        self.seen_users = seen_users if isinstance(seen_users, Int64HashSet) else Int64HashSet(seen_users)
+        self.seen_users.update(self.user_queue)
+        self.league_queue = dict(league_queue or {})
+        self.league_index = league_index if isinstance(league_index, Int64HashSet) else Int64HashSet(league_index)
+        self.users_queried_count = users_queried_count
+        self.duplicate_users = 0
+        self.duplicate_leagues = 0
+        self._queued_since_save = []
+        self._queried_since_save = []
+
+    def has_work(self):
+        return len(self.user_queue) > 0 or len(self.league_queue) > 0
+
+    def push_users(self, user_ids):
+        """
+        Queues users that have never been queued before.
+
+        Returns:
+            int: The number of users added to the queue.
+        """
+        added = 0
+        for user_id in user_ids:
+            if self.seen_users.add(user_id):
+                self.user_queue.append(user_id)
+                self._queued_since_save.append(user_id)
+                added += 1
+            else:
+                self.duplicate_users += 1
+        return added
+
+    def pop_users(self, count=1):
+        # Take up to `count` users from the front of the queue and mark them as queried
+        users = [self.user_queue.popleft() for _ in range(min(count, len(self.user_queue)))]
+        self._queried_since_save.extend(users)
+        self.users_queried_count += len(users)
+        return users
+
+    def push_leagues(self, leagues):
+        """
+        Queues leagues that are neither captured nor already queued.
+
+        Parameters:
+            leagues (list): League dictionaries from the Sleeper API.
+
+        Returns:
+            int: The number of leagues added to the queue.
+        """
+        added = 0
+        for league in leagues:
+            league_id = league['league_id']
+            if league_id in self.league_queue or int(league_id) in self.league_index:
+                self.duplicate_leagues += 1
+                continue
+            self.league_queue[league_id] = league
+            added += 1
+        return added
+
+    def pop_leagues(self, count=1):
+        # Take up to `count` leagues from the queue and mark them as captured
+        leagues = []
+        for _ in range(min(count, len(self.league_queue))):
+            league_id = next(iter(self.league_queue))
+            leagues.append((league_id, self.league_queue.pop(league_id)))
+            self.league_index.add(league_id)
+        return leagues
+
+    def take_delta(self):
+        """
+        Returns and resets the users queried and queued since the previous call.
+
+        Returns:
+            tuple: (users_queried, users_queued) lists of user IDs.
+        """
+        delta = (self._queried_since_save, self._queued_since_save)
+        self._queried_since_save, self._queued_since_save = [], []
+        return delta
@@ -0,0 +1,320 @@
+import os
+import json
+import sqlite3
+import threading
+import pandas as pd
+
+__all__ = ['HistoryStore']
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    game_id TEXT PRIMARY KEY,
+    season INTEGER,
+    week INTEGER,
+    season_type TEXT,
+    game_date TEXT,
+    home TEXT,
+    away TEXT,
+    home_points REAL,
+    away_points REAL,
+    game_status TEXT
+);
+CREATE INDEX IF NOT EXISTS games_season_week ON games (season, week);
+
+CREATE TABLE IF NOT EXISTS player_game_stats (
+    player_id TEXT NOT NULL,
+    game_id TEXT NOT NULL,
+    season INTEGER,
+    week INTEGER,
+    player_name TEXT,
+    team TEXT,
+    pass_attempts REAL,
+    pass_completions REAL,
+    pass_yards REAL,
+    pass_td REAL,
+    interceptions REAL,
+    carries REAL,
+    rush_yards REAL,
+    rush_td REAL,
+    targets REAL,
+    receptions REAL,
+    rec_yards REAL,
+    rec_td REAL,
+    fumbles_lost REAL,
+    fantasy_points REAL,
+    fantasy_points_standard REAL,
+    fantasy_points_half_ppr REAL,
+    fantasy_points_ppr REAL,
+    stats TEXT,
+    PRIMARY KEY (player_id, game_id)
+);
+CREATE INDEX IF NOT EXISTS player_game_stats_game ON player_game_stats (game_id);
+CREATE INDEX IF NOT EXISTS player_game_stats_season_week ON player_game_stats (season, week);
+
+CREATE TABLE IF NOT EXISTS projections (
+    player_id TEXT NOT NULL,
+    season INTEGER NOT NULL,
+    week INTEGER NOT NULL,
+    scoring TEXT NOT NULL,
+    player_name TEXT,
+    team TEXT,
+    position TEXT,
+    fantasy_points REAL,
+    fantasy_points_standard REAL,
+    fantasy_points_half_ppr REAL,
+    fantasy_points_ppr REAL,
+    stats TEXT,
+    PRIMARY KEY (player_id, season, week, scoring)
+);
+CREATE INDEX IF NOT EXISTS projections_season_week ON projections (season, week);
+
+CREATE TABLE IF NOT EXISTS matchups (
+    league_id INTEGER NOT NULL,
+    season INTEGER,
+    week INTEGER NOT NULL,
+    roster_id INTEGER NOT NULL,
+    matchup_id INTEGER,
+    points REAL,
+    custom_points REAL,
+    starters TEXT,
+    starters_points TEXT,
+    players TEXT,
+    PRIMARY KEY (league_id, week, roster_id)
+);
+CREATE INDEX IF NOT EXISTS matchups_season_week ON matchups (season, week);
+"""
+
+# (column, stat category, Tank01 field) for the typed stat columns
+STAT_FIELDS = [
+    ('pass_attempts', 'Passing', 'passAttempts'),
+    ('pass_completions', 'Passing', 'passCompletions'),
+    ('pass_yards', 'Passing', 'passYds'),
+    ('pass_td', 'Passing', 'passTD'),
+    ('interceptions', 'Passing', 'int'),
+    ('carries', 'Rushing', 'carries'),
+    ('rush_yards', 'Rushing', 'rushYds'),
+    ('rush_td', 'Rushing', 'rushTD'),
+    ('targets', 'Receiving', 'targets'),
+    ('receptions', 'Receiving', 'receptions'),
+    ('rec_yards', 'Receiving', 'recYds'),
+    ('rec_td', 'Receiving', 'recTD'),
+    ('fumbles_lost', 'Defense', 'fumblesLost'),
+]
+
+
+def _number(value):
+    try:
+        return float(value) if value not in (None, '') else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _integer(value):
+    number = _number(value)
+    return int(number) if number is not None else None
+
+
+def _body(payload):
+    # Accept either a full Tank01 response or just its body
+    if isinstance(payload, dict) and 'body' in payload and 'statusCode' in payload:
+        return payload['body']
+    return payload
+
+
+def _default_points(stats):
+    default = stats.get('fantasyPointsDefault') or {}
+    return _number(default.get('standard')), _number(default.get('halfPPR')), _number(default.get('PPR'))
+
+
+class HistoryStore:
+    """
+    Local SQLite store of historical games, player stat lines, projections and matchups.
+
+    Raw JSON payloads from rapid_API.get_weekly_schedule, get_box_score, get_player_stats
+    and get_fantasy_projections, and from sleeper_API.get_league_matchups, are ingested into
+    typed tables indexed on player_id, game_id and (season, week). Re-ingesting a payload
+    replaces the existing rows, so ingestion is idempotent.
+
+    Parameters:
+        path (str): Path of the SQLite database.
+            - Defaults to 'data/history.sqlite'.
+    """
+
+    def __init__(self, path=os.path.join('data', 'history.sqlite')):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.executescript(SCHEMA)
+        self._connection.commit()
+
+    def close(self):
+        self._connection.close()
+
+    def _write(self, sql, rows):
+        with self._lock:
+            self._connection.executemany(sql, rows)
+            self._connection.commit()
+        return len(rows)
+
+    def ingest_schedule(self, payload):
+        """
+        Stores games from a getNFLGamesForWeek/getNFLGamesForDate response.
+
+        Returns:
+            int: The number of games written.
+        """
+        rows = [(
+            game['gameID'], _integer(game.get('season')), _integer(str(game.get('gameWeek', '')).replace('Week ', '')),
+            game.get('seasonType'), game.get('gameDate'), game.get('home'), game.get('away'),
+            _number(game.get('homePts')), _number(game.get('awayPts')), game.get('gameStatus'),
+        ) for game in (_body(payload) or [])]
+        written = self._write('''
+            INSERT INTO games VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (game_id) DO UPDATE SET
+                season = excluded.season, week = excluded.week, season_type = excluded.season_type,
+                game_date = excluded.game_date, home = excluded.home, away = excluded.away,
+                home_points = COALESCE(excluded.home_points, games.home_points),
+                away_points = COALESCE(excluded.away_points, games.away_points),
+                game_status = COALESCE(excluded.game_status, games.game_status)''', rows)
+        self._backfill_season_week()
+        return written
+
+    def _backfill_season_week(self):
+        # Stat lines ingested before their game's schedule row get season/week from it
+        with self._lock:
+            self._connection.execute('''
+                UPDATE player_game_stats SET
+                    season = (SELECT season FROM games WHERE games.game_id = player_game_stats.game_id),
+                    week = (SELECT week FROM games WHERE games.game_id = player_game_stats.game_id)
+                WHERE season IS NULL AND game_id IN (SELECT game_id FROM games WHERE season IS NOT NULL)''')
+            self._connection.commit()
+
+    def ingest_box_score(self, payload, season=None, week=None):
+        """
+        Stores a getNFLBoxScore response as a game row plus one stat line per player.
+
+        Season and week default to the values of the game's schedule row, if ingested.
+
+        Returns:
+            int: The number of player stat lines written.
+        """
+        game = _body(payload)
+        if not isinstance(game, dict) or 'gameID' not in game:
+            return 0
+        game_id = game['gameID']
+        if season is None or week is None:
+            with self._lock:
+                known = self._connection.execute('SELECT season, week FROM games WHERE game_id = ?', (game_id,)).fetchone()
+            if known is not None:
+                season = known[0] if season is None else season
+                week = known[1] if week is None else week
+        self._write('''
+            INSERT INTO games (game_id, season, week, season_type, game_date, home, away, home_points, away_points, game_status)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (game_id) DO UPDATE SET
+                home_points = excluded.home_points, away_points = excluded.away_points, game_status = excluded.game_status,
+                season = COALESCE(games.season, excluded.season), week = COALESCE(games.week, excluded.week)''', [(
+            game_id, season, week, game.get('seasonType'), game.get('gameDate'), game.get('home'), game.get('away'),
+            _number(game.get('homePts')), _number(game.get('awayPts')), game.get('gameStatus'),
+        )])
+        return self._write_stat_lines([dict(stats, playerID=player_id, gameID=game_id)
+                                       for player_id, stats in (game.get('playerStats') or {}).items()], season, week)
+
+    def ingest_player_stats(self, payload):
+        """
+        Stores a getNFLGamesForPlayer response (stat lines keyed by game ID).
+
+        Returns:
+            int: The number of player stat lines written.
+        """
+        games = _body(payload)
+        if not isinstance(games, dict):
+            return 0
+        written = self._write_stat_lines([dict(stats, gameID=stats.get('gameID', game_id))
+                                          for game_id, stats in games.items()])
+        self._backfill_season_week()
+        return written
+
+    def _write_stat_lines(self, stat_lines, season=None, week=None):
+        rows = []
+        for stats in stat_lines:
+            row = [stats.get('playerID'), stats.get('gameID'), season, week, stats.get('longName'),
+                   stats.get('teamAbv') or stats.get('team')]
+            row.extend(_number((stats.get(category) or {}).get(field)) for _, category, field in STAT_FIELDS)
+            row.append(_number(stats.get('fantasyPoints')))
+            row.extend(_default_points(stats))
+            row.append(json.dumps(stats, separators=(',', ':')))
+            rows.append(tuple(row))
+        placeholders = ', '.join('?' * 24)
+        return self._write(f'INSERT OR REPLACE INTO player_game_stats VALUES ({placeholders})', rows)
+
+    def ingest_projections(self, payload, season, week, ppr=1.0, passTD=6.0):
+        """
+        Stores a getNFLProjections response for one week and scoring setting.
+
+        Returns:
+            int: The number of projections written.
+        """
+        body = _body(payload)
+        if not isinstance(body, dict):
+            return 0
+        scoring = f'ppr{ppr}_ptd{passTD}'
+        rows = []
+        for player_id, projection in (body.get('playerProjections') or {}).items():
+            rows.append((
+                player_id, int(season), int(week), scoring, projection.get('longName'), projection.get('team'),
+                projection.get('pos'), _number(projection.get('fantasyPoints')), *_default_points(projection),
+                json.dumps(projection, separators=(',', ':')),
+            ))
+        return self._write('INSERT OR REPLACE INTO projections VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', rows)
+
+    def ingest_matchups(self, league_id, week, matchups, season=None):
+        """
+        Stores a Sleeper get_league_matchups response for one league and week.
+
+        Returns:
+            int: The number of roster matchup rows written.
+        """
+        rows = [(
+            int(league_id), _integer(season), int(week), matchup['roster_id'], matchup.get('matchup_id'),
+            _number(matchup.get('points')), _number(matchup.get('custom_points')),
+            json.dumps(matchup.get('starters')), json.dumps(matchup.get('starters_points')),
+            json.dumps(matchup.get('players')),
+        ) for matchup in (matchups or [])]
+        return self._write('INSERT OR REPLACE INTO matchups VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', rows)
+
+    def stored_game_ids(self, final_only=True):
+        # Games with stat lines already stored, optionally only those marked final
+        sql = 'SELECT DISTINCT s.game_id FROM player_game_stats s JOIN games g ON g.game_id = s.game_id'
+        if final_only:
+            sql += " WHERE lower(g.game_status) LIKE '%complete%' OR lower(g.game_status) LIKE '%final%'"
+        with self._lock:
+            return {row[0] for row in self._connection.execute(sql)}
+
+    def query(self, sql, params=()):
+        """
+        Runs a read query against the store.
+
+        Parameters:
+            sql (str): The SQL query.
+            params (tuple or dict): Query parameters.
+
+        Returns:
+            pandas.DataFrame: The query result.
+        """
+        with self._lock:
+            return pd.read_sql_query(sql, self._connection, params=params)
+
+    def player_stats(self, player_id=None, season=None, week=None):
+        # Convenience accessor for the most common lookups
+        clauses, params = [], []
+        for column, value in (('player_id', player_id), ('season', season), ('week', week)):
+            if value is not None:
+                clauses.append(f'{column} = ?')
+                params.append(value)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ''
+        return self.query(f'SELECT * FROM player_game_stats{where}', tuple(params))
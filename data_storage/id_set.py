@@ -0,0 +1,147 @@
+import numpy as np
+
+__all__ = ['Int64HashSet']
+
+_EMPTY = np.iinfo(np.int64).min
+_MULTIPLIER = 0x9E3779B97F4A7C15  # 2**64 / golden ratio, for Fibonacci hashing
+_UINT64_MASK = (1 << 64) - 1
+
+
+def _as_int64_array(ids):
+    # Accept arrays or any iterable of ints / numeric strings (Sleeper IDs are strings)
+    if isinstance(ids, np.ndarray):
+        return ids.astype(np.int64, copy=False)
+    return np.array([int(i) for i in ids], dtype=np.int64)
+
+
+class Int64HashSet:
+    """
+    Compact hash set of non-negative int64 IDs.
+
+    IDs are stored in a single open-addressing NumPy table (linear probing, between a
+    quarter and half full), so each ID costs 16-32 bytes instead of the ~60 bytes of a
+    Python set entry plus int object. Single lookups and inserts are O(1) expected; bulk operations are
+    vectorized. IDs can only be added, never removed.
+
+    Parameters:
+        ids (iterable, optional): Initial IDs.
+        capacity (int): Initial number of slots, rounded up to a power of two.
+            - Defaults to 1024.
+    """
+
+    def __init__(self, ids=None, capacity=1024):
+        ids = np.unique(_as_int64_array(ids if ids is not None else []))
+        bits = max(int(capacity - 1).bit_length(), int(max(2 * len(ids), 1) - 1).bit_length(), 4)
+        self._allocate(bits)
+        self._insert_unique(ids)
+
+    def _allocate(self, bits):
+        self._bits = bits
+        self._mask = (1 << bits) - 1
+        self._table = np.full(1 << bits, _EMPTY, dtype=np.int64)
+        self._size = 0
+
+    def _slot(self, key):
+        return ((key * _MULTIPLIER) & _UINT64_MASK) >> (64 - self._bits)
+
+    def _slots(self, keys):
+        return ((keys.astype(np.uint64) * np.uint64(_MULTIPLIER)) >> np.uint64(64 - self._bits)).astype(np.int64)
+
+    def _insert_unique(self, keys):
+        # Vectorized linear-probing insert of keys that are unique and not yet present
+        slots = self._slots(keys)
+        pending = keys
+        while len(pending):
+            free = np.flatnonzero(self._table[slots] == _EMPTY)
+            _, first = np.unique(slots[free], return_index=True)
+            chosen = free[first]
+            self._table[slots[chosen]] = pending[chosen]
+            keep = np.ones(len(pending), dtype=bool)
+            keep[chosen] = False
+            pending = pending[keep]
+            slots = (slots[keep] + 1) & self._mask
+        self._size += len(keys)
+
+    def _grow(self):
+        keys = self.to_array()
+        self._allocate(self._bits + 1)
+        self._insert_unique(keys)
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self):
+        return iter(self.to_array().tolist())
+
+    def __contains__(self, key):
+        key = int(key)
+        table = self._table
+        slot = self._slot(key)
+        while True:
+            value = table[slot]
+            if value == key:
+                return True
+            if value == _EMPTY:
+                return False
+            slot = (slot + 1) & self._mask
+
+    def add(self, key):
+        """
+        Adds an ID.
+
+        Returns:
+            bool: True if the ID was not already in the set.
+        """
+        key = int(key)
+        table = self._table
+        slot = self._slot(key)
+        while True:
+            value = table[slot]
+            if value == key:
+                return False
+            if value == _EMPTY:
+                break
+            slot = (slot + 1) & self._mask
+        table[slot] = key
+        self._size += 1
+        if 2 * self._size > len(table):
+            self._grow()
+        return True
+
+    def contains_many(self, keys):
+        """
+        Vectorized membership test.
+
+        Returns:
+            numpy.ndarray: Boolean mask, True where the ID is in the set.
+        """
+        keys = _as_int64_array(keys)
+        found = np.zeros(len(keys), dtype=bool)
+        active = np.arange(len(keys))
+        slots = self._slots(keys)
+        while len(active):
+            values = self._table[slots]
+            hit = values == keys[active]
+            found[active[hit]] = True
+            searching = ~hit & (values != _EMPTY)
+            active = active[searching]
+            slots = (slots[searching] + 1) & self._mask
+        return found
+
+    def update(self, keys):
+        """
+        Adds many IDs at once.
+
+        Returns:
+            numpy.ndarray: The IDs that were not already in the set.
+        """
+        keys = np.unique(_as_int64_array(keys))
+        new_keys = keys[~self.contains_many(keys)]
+        while 2 * (self._size + len(new_keys)) > len(self._table):
+            self._grow()
+        self._insert_unique(new_keys)
+        return new_keys
+
+    def to_array(self):
+        # The IDs as a sorted int64 array
+        return np.sort(self._table[self._table != _EMPTY])
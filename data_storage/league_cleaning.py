@@ -0,0 +1,251 @@
+import os
+import re
+import json
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from .league_store import LeagueRecordBuffer, LEAGUE_SCHEMA, league_to_record, denormalize_league_frame
+
+__all__ = ['clean_leagues', 'clean_league_frame', 'collect_scoring_keys', 'clean_league_schema',
+           'read_clean_leagues', 'scoring_matrix', 'SETTINGS_FIELDS', 'ROSTER_SLOTS']
+
+# League settings kept as typed columns; the rest of the settings object is dropped
+SETTINGS_FIELDS = {
+    'type': pa.int8(),  # 0 redraft, 1 keeper, 2 dynasty
+    'best_ball': pa.int8(),
+    'playoff_teams': pa.int8(),
+    'playoff_week_start': pa.int8(),
+    'playoff_round_type': pa.int8(),
+    'playoff_seed_type': pa.int8(),
+    'start_week': pa.int8(),
+    'leg': pa.int8(),
+    'last_scored_leg': pa.int8(),
+    'trade_deadline': pa.int8(),
+    'divisions': pa.int8(),
+    'league_average_match': pa.int8(),
+    'draft_rounds': pa.int8(),
+    'max_keepers': pa.int8(),
+    'reserve_slots': pa.int8(),
+    'taxi_slots': pa.int8(),
+    'taxi_years': pa.int8(),
+    'bench_lock': pa.int8(),
+    'pick_trading': pa.int8(),
+    'disable_trades': pa.int8(),
+    'daily_waivers': pa.int8(),
+    'waiver_type': pa.int8(),
+    'waiver_clear_days': pa.int8(),
+    'waiver_budget': pa.int32(),
+}
+
+# Roster slot types counted per league; anything else is counted as slots_OTHER
+ROSTER_SLOTS = ['QB', 'RB', 'WR', 'TE', 'FLEX', 'WRRB_FLEX', 'REC_FLEX', 'SUPER_FLEX', 'K', 'DEF',
+                'DL', 'LB', 'DB', 'IDP_FLEX', 'BN', 'OTHER']
+
+_CATEGORY = pa.dictionary(pa.int8(), pa.string())
+_BASE_FIELDS = [
+    ('league_id', pa.int64()),
+    ('name', pa.string()),
+    ('season', pa.int16()),
+    ('season_type', _CATEGORY),
+    ('sport', _CATEGORY),
+    ('status', _CATEGORY),
+    ('total_rosters', pa.int8()),
+    ('previous_league_id', pa.int64()),
+    ('draft_id', pa.int64()),
+]
+_JSON_KEY = re.compile(r'"([A-Za-z0-9_]+)":')
+
+
+def clean_league_schema(scoring_keys):
+    """
+    Builds the schema of the cleaned league file for a scoring key vocabulary.
+
+    Parameters:
+        scoring_keys (list): Scoring settings stored as float32 'scoring_<key>' columns.
+
+    Returns:
+        pyarrow.Schema: The schema, with the scoring keys recorded in its metadata.
+    """
+    fields = list(_BASE_FIELDS)
+    fields += [(f'settings_{name}', dtype) for name, dtype in SETTINGS_FIELDS.items()]
+    fields += [(f'slots_{slot}', pa.uint8()) for slot in ROSTER_SLOTS]
+    fields += [(f'scoring_{key}', pa.float32()) for key in scoring_keys]
+    return pa.schema(fields, metadata={'scoring_keys': json.dumps(list(scoring_keys))})
+
+
+def _parse_json(values, empty):
+    return [json.loads(value) if isinstance(value, str) else empty for value in values]
+
+
+def _numeric(values):
+    return pd.to_numeric(pd.Series(values), errors='coerce')
+
+
+def _id_column(values):
+    # Sleeper IDs are numeric strings; '0' or missing means there is none
+    ids = _numeric(values)
+    return ids.where(ids > 0).astype('Int64').to_numpy()
+
+
+def _slot_counts(roster_positions):
+    positions = pd.Series(_parse_json(roster_positions, []), dtype=object).explode()
+    positions = positions.where(positions.isin(ROSTER_SLOTS[:-1]) | positions.isna(), 'OTHER').dropna()
+    if positions.empty:
+        return pd.DataFrame(0, index=range(len(roster_positions)), columns=ROSTER_SLOTS)
+    counts = positions.groupby([positions.index, positions.values]).size().unstack(fill_value=0)
+    return counts.reindex(index=range(len(roster_positions)), columns=ROSTER_SLOTS, fill_value=0).fillna(0)
+
+
+def clean_league_frame(df, scoring_keys):
+    """
+    Converts stored league rows into typed, analysis-ready columns.
+
+    Status, season type and sport become categoricals. Scalar fields and selected
+    settings are downcast to the smallest integer type that holds them. Roster positions
+    become per-slot counts, and each scoring setting becomes a float32 column, so the
+    scoring settings of a chunk form one dense numeric matrix.
+
+    Parameters:
+        df (pandas.DataFrame): League rows with LEAGUE_SCHEMA columns.
+        scoring_keys (list): Scoring settings to keep, in column order.
+
+    Returns:
+        pyarrow.Table: The chunk in clean_league_schema(scoring_keys).
+    """
+    df = df.reset_index(drop=True)
+    schema = clean_league_schema(scoring_keys)
+    columns = {
+        'league_id': df['league_id'].astype('int64').to_numpy(),
+        'name': df['name'].to_numpy(),
+        'season': _numeric(df['season']).astype('Int16').to_numpy(),
+        'season_type': df['season_type'].to_numpy(),
+        'sport': df['sport'].to_numpy(),
+        'status': df['status'].to_numpy(),
+        'total_rosters': _numeric(df['total_rosters']).astype('Int8').to_numpy(),
+        'previous_league_id': _id_column(df['previous_league_id']),
+        'draft_id': _id_column(df['draft_id']),
+    }
+
+    settings = pd.DataFrame(_parse_json(df['settings'], {}), columns=list(SETTINGS_FIELDS), index=df.index)
+    for name, dtype in SETTINGS_FIELDS.items():
+        columns[f'settings_{name}'] = _numeric(settings[name]).round().astype('Int32' if dtype == pa.int32() else 'Int8').to_numpy()
+
+    slots = _slot_counts(df['roster_positions'])
+    for slot in ROSTER_SLOTS:
+        columns[f'slots_{slot}'] = slots[slot].clip(upper=255).astype(np.uint8).to_numpy()
+
+    scoring = pd.DataFrame(_parse_json(df['scoring_settings'], {}), columns=list(scoring_keys), index=df.index)
+    scoring = scoring.apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float32)
+    for i, key in enumerate(scoring_keys):
+        columns[f'scoring_{key}'] = scoring[:, i]
+
+    return pa.Table.from_pydict(
+        {field.name: pa.array(columns[field.name], type=field.type, from_pandas=True) for field in schema},
+        schema=schema)
+
+
+def _iter_league_frames(source, chunksize):
+    # Yield LEAGUE_SCHEMA-shaped chunks from a league store, its directory, or a legacy flattened CSV
+    if isinstance(source, str) and source.endswith('.csv'):
+        for chunk in pd.read_csv(source, chunksize=chunksize, dtype=str):
+            yield pd.DataFrame([league_to_record(league) for league in denormalize_league_frame(chunk)],
+                               columns=LEAGUE_SCHEMA.names)
+        return
+    league_store = source if isinstance(source, LeagueRecordBuffer) else LeagueRecordBuffer(source)
+    yield from league_store.iter_batches(batch_size=chunksize)
+
+
+def collect_scoring_keys(source, chunksize=100000):
+    """
+    Finds every scoring setting used by at least one league.
+
+    For a legacy CSV only the header is read. For a league store the scoring_settings
+    column is scanned chunk by chunk for keys, without decoding the JSON.
+
+    Returns:
+        list: The scoring keys, sorted.
+    """
+    if isinstance(source, str) and source.endswith('.csv'):
+        header = pd.read_csv(source, nrows=0).columns
+        return sorted(column.split('.', 1)[1] for column in header if column.startswith('scoring_settings.'))
+    league_store = source if isinstance(source, LeagueRecordBuffer) else LeagueRecordBuffer(source)
+    keys = set()
+    for chunk in league_store.iter_batches(columns=['scoring_settings'], batch_size=chunksize):
+        keys.update(_JSON_KEY.findall('\n'.join(chunk['scoring_settings'].dropna())))
+    return sorted(keys)
+
+
+def clean_leagues(source, output_file, chunksize=100000, scoring_keys=None):
+    """
+    Streams crawled leagues into a single typed Parquet file for analysis.
+
+    Chunks are cleaned with clean_league_frame and appended as row groups, so memory use
+    is bounded by the chunk size rather than by the number of leagues. The file is
+    written under a temporary name and renamed when complete.
+
+    Parameters:
+        source (LeagueRecordBuffer or str): The league store, its directory, or a legacy
+            flattened sleeper_leagues.csv.
+        output_file (str): Path of the Parquet file to write.
+        chunksize (int): Number of leagues cleaned at a time.
+            - Defaults to 100000.
+        scoring_keys (list, optional): Scoring settings to keep. Defaults to every key
+            found in the data (an extra pass over the scoring column).
+
+    Returns:
+        int: The number of leagues written.
+    """
+    if scoring_keys is None:
+        scoring_keys = collect_scoring_keys(source, chunksize)
+    schema = clean_league_schema(scoring_keys)
+    directory = os.path.dirname(output_file)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    temp_file = output_file + '.tmp'
+    written = 0
+    with pq.ParquetWriter(temp_file, schema, compression='zstd') as writer:
+        for chunk in _iter_league_frames(source, chunksize):
+            if len(chunk):
+                writer.write_table(clean_league_frame(chunk, scoring_keys))
+                written += len(chunk)
+    os.replace(temp_file, output_file)
+    return written
+
+
+def read_clean_leagues(path, columns=None, filters=None):
+    """
+    Loads a cleaned league file, keeping the compact dtypes.
+
+    Integer columns with missing values are read as pandas nullable integers rather
+    than float64, and categorical columns as pandas categoricals.
+
+    Parameters:
+        path (str): The file written by clean_leagues.
+        columns (list, optional): Subset of columns to read.
+        filters (list, optional): pyarrow filters, e.g. [('season', '=', 2024)].
+
+    Returns:
+        pandas.DataFrame: The leagues.
+    """
+    table = pq.read_table(path, columns=columns, filters=filters)
+    nullable = {pa.int8(): pd.Int8Dtype(), pa.int16(): pd.Int16Dtype(), pa.int32(): pd.Int32Dtype(),
+                pa.int64(): pd.Int64Dtype(), pa.uint8(): pd.UInt8Dtype()}
+    return table.to_pandas(types_mapper=nullable.get)
+
+
+def scoring_matrix(leagues):
+    """
+    Returns the scoring settings of cleaned leagues as a dense matrix.
+
+    Parameters:
+        leagues (pandas.DataFrame): Output of read_clean_leagues.
+
+    Returns:
+        tuple: (matrix, keys) where matrix is a float32 array of shape (leagues, keys) with
+        NaN for settings a league does not define, and keys the matching scoring keys.
+    """
+    columns = [column for column in leagues.columns if column.startswith('scoring_')]
+    keys = [column[len('scoring_'):] for column in columns]
+    return leagues[columns].to_numpy(dtype=np.float32, na_value=np.nan), keys
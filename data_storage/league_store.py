@@ -0,0 +1,228 @@
+import os
+import glob
+import json
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+__all__ = ['LeagueRecordBuffer', 'LEAGUE_SCHEMA', 'LEAGUE_JSON_COLUMNS', 'league_to_record',
+           'denormalize_league_frame']
+
+# Fixed schema for stored Sleeper leagues. Nested objects whose keys vary from league to
+# league are kept as JSON text so every chunk shares the same columns.
+LEAGUE_SCHEMA = pa.schema([
+    ('league_id', pa.int64()),
+    ('name', pa.string()),
+    ('season', pa.int16()),
+    ('season_type', pa.string()),
+    ('sport', pa.string()),
+    ('status', pa.string()),
+    ('total_rosters', pa.int16()),
+    ('previous_league_id', pa.string()),
+    ('draft_id', pa.string()),
+    ('bracket_id', pa.string()),
+    ('loser_bracket_id', pa.string()),
+    ('company_id', pa.string()),
+    ('avatar', pa.string()),
+    ('settings', pa.string()),
+    ('scoring_settings', pa.string()),
+    ('roster_positions', pa.string()),
+    ('metadata', pa.string()),
+])
+
+LEAGUE_JSON_COLUMNS = ['settings', 'scoring_settings', 'roster_positions', 'metadata']
+
+
+def _to_int(value):
+    if value is None or value == '' or (isinstance(value, float) and pd.isna(value)):
+        return None
+    return int(value)
+
+
+def _to_str(value):
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return None
+    return str(value)
+
+
+def _to_json(value):
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return None
+    return json.dumps(value, separators=(',', ':'))
+
+
+def league_to_record(league):
+    """
+    Converts a raw Sleeper league dictionary into a row matching LEAGUE_SCHEMA.
+
+    Parameters:
+        league (dict): A league object as returned by the Sleeper API.
+
+    Returns:
+        dict: The league with typed scalar fields and JSON-encoded nested fields.
+    """
+    record = {}
+    for field in LEAGUE_SCHEMA:
+        value = league.get(field.name)
+        if field.name in LEAGUE_JSON_COLUMNS:
+            record[field.name] = _to_json(value)
+        elif pa.types.is_integer(field.type):
+            record[field.name] = _to_int(value)
+        else:
+            record[field.name] = _to_str(value)
+    return record
+
+
+def denormalize_league_frame(df):
+    """
+    Rebuilds nested league dictionaries from a pd.json_normalize style frame.
+
+    Used to import leagues saved in the legacy flattened CSV format, where nested fields
+    were spread across columns such as 'settings.type' and 'scoring_settings.rec'.
+
+    Parameters:
+        df (pandas.DataFrame): Flattened league rows.
+
+    Returns:
+        list: One league dictionary per row.
+    """
+    df = df.drop(columns=[col for col in df.columns if col.startswith('Unnamed')])
+    leagues = []
+    for row in df.to_dict('records'):
+        league = {}
+        for key, value in row.items():
+            if isinstance(value, float) and pd.isna(value):
+                continue
+            parent, _, child = key.partition('.')
+            if child:
+                league.setdefault(parent, {})[child] = value
+            elif parent == 'roster_positions' and isinstance(value, str):
+                try:
+                    league[parent] = json.loads(value.replace("'", '"'))
+                except ValueError:
+                    league[parent] = value
+            else:
+                league[parent] = value
+        leagues.append(league)
+    return leagues
+
+
+class LeagueRecordBuffer:
+    """
+    Append-only columnar store for crawled Sleeper leagues.
+
+    Leagues are collected in memory as typed rows and flushed in batches as Parquet part
+    files under a single directory, so only the in-flight batch is held in memory no matter
+    how many leagues have been captured. Part files are written to a temporary name and
+    renamed into place, so a crash mid-flush never leaves a partial chunk behind.
+
+    A sharded crawl writes one store per worker under shard-NNN subdirectories of the
+    shared store. Reading the shared store (read, iter_batches, stored_files) includes
+    those shard stores, while writing and checkpointing only touch the directory's own
+    part files.
+
+    Parameters:
+        directory (str): Directory holding the Parquet part files.
+        batch_size (int): Number of buffered leagues that triggers an automatic flush.
+            - Defaults to 1000.
+    """
+
+    def __init__(self, directory, batch_size=1000):
+        self.directory = directory
+        self.batch_size = batch_size
+        self._rows = []
+        os.makedirs(directory, exist_ok=True)
+        self._stored_count = sum(pq.ParquetFile(path).metadata.num_rows for path in self.part_files())
+
+    def __len__(self):
+        return self._stored_count + len(self._rows)
+
+    @property
+    def buffered_count(self):
+        return len(self._rows)
+
+    def part_files(self):
+        # This store's own part files, the ones it writes and checkpoints
+        return sorted(glob.glob(os.path.join(self.directory, 'part-*.parquet')))
+
+    def shard_part_files(self):
+        # Part files written by the workers of a sharded crawl into shard-NNN subdirectories
+        return sorted(glob.glob(os.path.join(self.directory, 'shard-*', 'part-*.parquet')))
+
+    def stored_files(self):
+        # Every part file holding leagues of this crawl, including the shard stores
+        return self.part_files() + self.shard_part_files()
+
+    def append(self, league):
+        self._rows.append(league_to_record(league))
+        if len(self._rows) >= self.batch_size:
+            return self.flush()
+        return None
+
+    def extend(self, leagues):
+        for league in leagues:
+            self.append(league)
+
+    def flush(self):
+        """
+        Writes the buffered leagues as a new Parquet part file.
+
+        Returns:
+            str or None: Path of the part file written, or None if the buffer was empty.
+        """
+        if not self._rows:
+            return None
+        table = pa.Table.from_pylist(self._rows, schema=LEAGUE_SCHEMA)
+        existing = self.part_files()
+        next_part = int(os.path.basename(existing[-1])[5:-8]) + 1 if existing else 0
+        part_file = os.path.join(self.directory, f'part-{next_part:06d}.parquet')
+        temp_file = part_file + '.tmp'
+        pq.write_table(table, temp_file)
+        os.replace(temp_file, part_file)
+        self._stored_count += len(self._rows)
+        self._rows = []
+        return part_file
+
+    def discard_uncommitted(self, committed_parts):
+        """
+        Deletes part files that are not listed in a checkpoint.
+
+        Parts flushed after the last successful checkpoint belong to a cycle that will be
+        re-crawled on restart, so keeping them would store those leagues twice.
+
+        Parameters:
+            committed_parts (iterable): Basenames of the part files to keep.
+
+        Returns:
+            int: The number of part files removed.
+        """
+        committed_parts = set(committed_parts)
+        removed = 0
+        for part_file in self.part_files():
+            if os.path.basename(part_file) not in committed_parts:
+                os.remove(part_file)
+                removed += 1
+        self._stored_count = sum(pq.ParquetFile(path).metadata.num_rows for path in self.part_files())
+        return removed
+
+    def read(self, columns=None):
+        """
+        Loads the stored leagues (excluding the unflushed buffer), including those of
+        any shard stores, into a DataFrame.
+
+        Parameters:
+            columns (list, optional): Subset of columns to read.
+
+        Returns:
+            pandas.DataFrame: The stored leagues.
+        """
+        part_files = self.stored_files()
+        if not part_files:
+            return LEAGUE_SCHEMA.empty_table().to_pandas()
+        return pq.ParquetDataset(part_files, schema=LEAGUE_SCHEMA).read(columns=columns).to_pandas()
+
+    def iter_batches(self, columns=None, batch_size=65536):
+        # Stream stored leagues, shard stores included, chunk by chunk without materializing the full dataset
+        for part_file in self.stored_files():
+            for batch in pq.ParquetFile(part_file).iter_batches(batch_size=batch_size, columns=columns):
+                yield batch.to_pandas()
@@ -0,0 +1,281 @@
+import os
+import time
+import numpy as np
+import pandas as pd
+
+__all__ = ['PlayerCrosswalk', 'normalize_player_names', 'CROSSWALK_ID_COLUMNS']
+
+CROSSWALK_FILE = os.path.join('data', 'players', 'player_crosswalk.parquet')
+
+# Provider ID columns of the crosswalk, named after Sleeper's player fields
+CROSSWALK_ID_COLUMNS = ['sleeper_id', 'tank01_id', 'espn_id', 'yahoo_id', 'sportradar_id', 'gsis_id',
+                        'rotowire_id', 'fantasy_data_id', 'stats_id']
+CROSSWALK_COLUMNS = CROSSWALK_ID_COLUMNS + ['full_name', 'name_key', 'position', 'team', 'birth_date',
+                                            'active', 'row_hash', 'updated_at']
+
+_NAME_SUFFIXES = r'\b(?:jr|sr|ii|iii|iv|v)\b'
+
+# Team abbreviations that differ between providers
+TEAM_ALIASES = {'JAC': 'JAX', 'WSH': 'WAS', 'LA': 'LAR', 'OAK': 'LV', 'SD': 'LAC', 'STL': 'LAR'}
+
+
+def normalize_player_names(names):
+    """
+    Reduces player names to a join key, vectorized over a whole column.
+
+    Accents, punctuation and generational suffixes are removed and whitespace is
+    collapsed, so 'D.J. Moore', 'DJ Moore' and 'Patrick Mahomes II' / 'Patrick Mahomes'
+    match.
+
+    Parameters:
+        names (pandas.Series or list): Player names.
+
+    Returns:
+        pandas.Series: The normalized names, with missing names as NA.
+    """
+    # Normalize each distinct name once; sources repeat names across weeks and positions
+    codes, uniques = pd.factorize(pd.Series(names, dtype='string'))
+    uniques = pd.Series(uniques, dtype='string')
+    normalized = (uniques.str.normalize('NFKD').str.encode('ascii', errors='ignore').str.decode('ascii')
+                  .str.lower()
+                  .str.replace(r"[.'’`-]", '', regex=True)
+                  .str.replace(r'[^a-z0-9 ]', ' ', regex=True)
+                  .str.replace(_NAME_SUFFIXES, ' ', regex=True)
+                  .str.split().str.join(' ')
+                  .replace('', pd.NA))
+    return pd.Series(normalized.array.take(codes, allow_fill=True), dtype='string')
+
+
+def _normalize_teams(teams):
+    teams = pd.Series(teams, dtype='string').str.upper().str.strip()
+    return teams.replace(TEAM_ALIASES)
+
+
+def _id_strings(values):
+    # IDs are kept as strings; numeric IDs read from CSVs as floats lose their '.0'
+    ids = pd.Series(values, dtype='object').astype('string').str.strip()
+    return ids.str.replace(r'\.0$', '', regex=True).replace({'': pd.NA, 'nan': pd.NA, 'None': pd.NA})
+
+
+def _sleeper_frame(players):
+    frame = pd.DataFrame.from_dict(players, orient='index') if isinstance(players, dict) else pd.DataFrame(players)
+    frame = frame.reindex(columns=['player_id', 'full_name', 'first_name', 'last_name', 'position', 'team', 'birth_date',
+                                   'active'] + CROSSWALK_ID_COLUMNS[2:])
+    full_name = frame['full_name'].where(frame['full_name'].notna(),
+                                         frame['first_name'].fillna('') + ' ' + frame['last_name'].fillna(''))
+    return pd.DataFrame({
+        'sleeper_id': _id_strings(frame['player_id']).to_numpy(),
+        'full_name': pd.Series(full_name, dtype='string').str.strip().to_numpy(),
+        'position': pd.Series(frame['position'], dtype='string').to_numpy(),
+        'team': _normalize_teams(frame['team']).to_numpy(),
+        'birth_date': pd.Series(frame['birth_date'], dtype='string').to_numpy(),
+        'active': frame['active'].astype('boolean').to_numpy(),
+        **{column: _id_strings(frame[column]).to_numpy() for column in CROSSWALK_ID_COLUMNS[2:]},
+    })
+
+
+def _tank01_frame(tank01_players):
+    if isinstance(tank01_players, dict):
+        tank01_players = tank01_players.get('body') or []
+    frame = pd.DataFrame(tank01_players).reindex(columns=['playerID', 'sleeperBotID', 'espnID', 'longName', 'pos', 'team'])
+    return pd.DataFrame({
+        'tank01_id': _id_strings(frame['playerID']).to_numpy(),
+        'sleeper_id': _id_strings(frame['sleeperBotID']).to_numpy(),
+        'espn_id': _id_strings(frame['espnID']).to_numpy(),
+        'name_key': normalize_player_names(frame['longName']).to_numpy(),
+        'position': pd.Series(frame['pos'], dtype='string').to_numpy(),
+    })
+
+
+def _unique_lookup(frame, keys):
+    # Map each key combination held by exactly one player to that player's row
+    rows = frame[keys].dropna()
+    rows = rows[~rows.duplicated(keep=False)]
+    if len(keys) == 1:
+        return pd.Index(rows[keys[0]]), rows.index.to_numpy()
+    return pd.MultiIndex.from_frame(rows), rows.index.to_numpy()
+
+
+class PlayerCrosswalk:
+    """
+    Persisted table linking each player's IDs across Sleeper, Tank01 (RapidAPI) and the
+    other providers Sleeper cross-references, plus a normalized name key.
+
+    Joins use hash indexes (pandas Index / MultiIndex get_indexer) built once per
+    crosswalk, so attaching Sleeper IDs to any source is one vectorized O(1)-per-row
+    lookup. Rows without a usable ID are matched on normalized name. Names shared by
+    several players only match when position, and if needed team, single one out.
+
+    Parameters:
+        path (str): Parquet file holding the crosswalk.
+            - Defaults to 'data/players/player_crosswalk.parquet'.
+    """
+
+    def __init__(self, path=CROSSWALK_FILE):
+        self.path = path
+        if os.path.exists(path):
+            self.table = pd.read_parquet(path)
+        else:
+            self.table = pd.DataFrame({column: pd.Series(dtype='string') for column in CROSSWALK_COLUMNS})
+            self.table['active'] = self.table['active'].astype('boolean')
+            self.table['row_hash'] = self.table['row_hash'].astype('uint64')
+            self.table['updated_at'] = self.table['updated_at'].astype('int64')
+        self._indexes = {}
+
+    def __len__(self):
+        return len(self.table)
+
+    def refresh(self, players, tank01_players=None):
+        """
+        Updates the crosswalk from the daily Sleeper player dump.
+
+        Only players that are new or whose fields changed are rewritten and get a new
+        updated_at; players missing from the dump are kept. Tank01 IDs are attached
+        through Tank01's own Sleeper ID, then its ESPN ID, then a unique name and position.
+
+        Parameters:
+            players (dict): Result of sleeper_API.fetch_all_players().
+            tank01_players (dict or list, optional): Result of rapid_API.get_player_list().
+
+        Returns:
+            dict: Number of 'added', 'updated' and 'unchanged' players.
+        """
+        incoming = _sleeper_frame(players).dropna(subset=['sleeper_id']).drop_duplicates('sleeper_id')
+        incoming['name_key'] = normalize_player_names(incoming['full_name']).to_numpy()
+        incoming['tank01_id'] = pd.Series(pd.NA, index=incoming.index, dtype='string')
+        if tank01_players is not None:
+            incoming['tank01_id'] = self._match_tank01(incoming.reset_index(drop=True), _tank01_frame(tank01_players))
+        elif len(self.table):
+            known = self.table.set_index('sleeper_id')['tank01_id']
+            incoming['tank01_id'] = known.reindex(incoming['sleeper_id']).to_numpy()
+
+        content = CROSSWALK_ID_COLUMNS + ['full_name', 'position', 'team', 'birth_date', 'active']
+        # Hash nullable dtypes, whose hashes do not depend on whether other rows hold missing values
+        incoming = incoming.astype({column: 'boolean' if column == 'active' else 'string' for column in content})
+        incoming['row_hash'] = pd.util.hash_pandas_object(incoming[content], index=False).to_numpy()
+        previous = self.table.set_index('sleeper_id')['row_hash']
+        old_hash = previous.reindex(incoming['sleeper_id']).to_numpy()
+        is_new = pd.isna(old_hash)
+        changed = ~is_new & (old_hash != incoming['row_hash'].to_numpy())
+        incoming = incoming[is_new | changed]
+        incoming['updated_at'] = time.time_ns()
+
+        kept = self.table[~self.table['sleeper_id'].isin(incoming['sleeper_id'])]
+        self.table = pd.concat([kept, incoming[CROSSWALK_COLUMNS]], ignore_index=True) if len(kept) else \
+            incoming[CROSSWALK_COLUMNS].reset_index(drop=True)
+        self._indexes = {}
+        return {'added': int(is_new.sum()), 'updated': int(changed.sum()),
+                'unchanged': int(len(is_new) - is_new.sum() - changed.sum())}
+
+    @staticmethod
+    def _match_tank01(sleeper, tank01):
+        tank01_ids = pd.Series(pd.NA, index=sleeper.index, dtype='string')
+        for keys in (['sleeper_id'], ['espn_id'], ['name_key', 'position']):
+            index, rows = _unique_lookup(tank01, keys)
+            values = sleeper[keys[0]] if len(keys) == 1 else pd.MultiIndex.from_frame(sleeper[keys])
+            found = index.get_indexer(values)
+            hit = (found >= 0) & tank01_ids.isna().to_numpy()
+            tank01_ids[hit] = tank01['tank01_id'].to_numpy()[rows[found[hit]]]
+        return tank01_ids.to_numpy()
+
+    def save(self):
+        # Write the crosswalk atomically
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.table.to_parquet(self.path + '.tmp', index=False)
+        os.replace(self.path + '.tmp', self.path)
+
+    def _index(self, keys):
+        keys = tuple(keys)
+        if keys not in self._indexes:
+            self._indexes[keys] = _unique_lookup(self.table, list(keys))
+        return self._indexes[keys]
+
+    def _lookup(self, keys, values, column):
+        index, rows = self._index(keys)
+        found = index.get_indexer(values)
+        result = np.full(len(found), None, dtype=object)
+        result[found >= 0] = self.table[column].to_numpy()[rows[found[found >= 0]]]
+        return pd.array(result, dtype='string')
+
+    def lookup(self, ids, source='espn_id', column='sleeper_id'):
+        """
+        Translates provider IDs.
+
+        Parameters:
+            ids (pandas.Series or list): IDs of the source provider.
+            source (str): One of CROSSWALK_ID_COLUMNS.
+                - Defaults to 'espn_id'.
+            column (str): Crosswalk column to return.
+                - Defaults to 'sleeper_id'.
+
+        Returns:
+            pandas.arrays.StringArray: The translated values, NA where unknown.
+        """
+        return self._lookup([source], _id_strings(ids), column)
+
+    def match_names(self, names, positions=None, teams=None, column='sleeper_id'):
+        """
+        Matches player names to the crosswalk.
+
+        Each name is tried on its normalized name alone, then with position, then with
+        position and team; a key only matches when exactly one player holds it.
+
+        Parameters:
+            names (pandas.Series or list): Player names, in any source's format.
+            positions (pandas.Series or list, optional): Positions, e.g. 'WR'.
+            teams (pandas.Series or list, optional): Team abbreviations.
+            column (str): Crosswalk column to return.
+                - Defaults to 'sleeper_id'.
+
+        Returns:
+            pandas.arrays.StringArray: The matched values, NA where unmatched or ambiguous.
+        """
+        keys = pd.DataFrame({'name_key': normalize_player_names(names).to_numpy()})
+        levels = [['name_key']]
+        if positions is not None:
+            keys['position'] = pd.Series(positions, dtype='string').str.upper().str.strip().to_numpy()
+            levels.append(['name_key', 'position'])
+            if teams is not None:
+                keys['team'] = _normalize_teams(teams).to_numpy()
+                levels.append(['name_key', 'position', 'team'])
+        result = pd.array([pd.NA] * len(keys), dtype='string')
+        for level in levels:
+            values = keys['name_key'] if len(level) == 1 else pd.MultiIndex.from_frame(keys[level])
+            found = self._lookup(level, values, column)
+            result = pd.array(np.where(pd.isna(result), found, result), dtype='string')
+        return result
+
+    def attach(self, frame, name_column=None, id_column=None, source=None, position_column=None, team_column=None,
+               column='sleeper_id'):
+        """
+        Adds a crosswalk column to a frame from any source.
+
+        Rows are matched on their provider ID when id_column and source are given, and
+        the remaining rows on name (with position and team when given).
+
+        Parameters:
+            frame (pandas.DataFrame): The source rows, e.g. FantasyPros rankings.
+            name_column (str, optional): Column of player names.
+            id_column (str, optional): Column of provider IDs.
+            source (str, optional): Provider of id_column, one of CROSSWALK_ID_COLUMNS.
+            position_column (str, optional): Column of positions.
+            team_column (str, optional): Column of team abbreviations.
+            column (str): Crosswalk column to add.
+                - Defaults to 'sleeper_id'.
+
+        Returns:
+            pandas.DataFrame: A copy of frame with the added column.
+        """
+        frame = frame.copy()
+        values = pd.array([pd.NA] * len(frame), dtype='string')
+        if id_column is not None:
+            values = self.lookup(frame[id_column], source, column)
+        if name_column is not None:
+            by_name = self.match_names(frame[name_column],
+                                       frame[position_column] if position_column else None,
+                                       frame[team_column] if team_column else None, column)
+            values = pd.array(np.where(pd.isna(values), by_name, values), dtype='string')
+        frame[column] = values
+        return frame
@@ -0,0 +1,357 @@
+import os
+import json
+import shutil
+import sqlite3
+import hashlib
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from boto3.s3.transfer import TransferConfig
+
+__all__ = ['S3Sync', 'local_etag']
+
+MANIFEST_FILE = '.s3_sync_manifest.json'
+STAGING_DIRECTORY = '.s3_sync_staging'
+EXCLUDED_SUFFIXES = ('.tmp', '-shm', '-wal', '-journal', MANIFEST_FILE)
+
+# SQLite databases are copied with the backup API instead of byte for byte, since their
+# committed state is split between the database file and its live write-ahead log
+SQLITE_SUFFIXES = ('.sqlite', '.sqlite3', '.db')
+
+# Checkpoints, logs and databases reference data files (league parts, ID snapshots), so
+# they are uploaded only after every data file of the same pass
+REFERENCE_SUFFIXES = SQLITE_SUFFIXES + ('.json', '.jsonl')
+
+
+def local_etag(path, chunksize):
+    """
+    Computes the ETag S3 assigns to a file uploaded with the given multipart chunk size.
+
+    Single-part objects have the MD5 of their content as ETag; multipart objects have
+    the MD5 of the concatenated part digests followed by '-<part count>'.
+
+    Parameters:
+        path (str): Path of the local file.
+        chunksize (int): Multipart chunk size in bytes.
+
+    Returns:
+        str: The expected ETag, without quotes.
+    """
+    digests = []
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunksize), b''):
+            digests.append(hashlib.md5(chunk).digest())
+    if len(digests) <= 1:
+        return (digests[0] if digests else hashlib.md5(b'').digest()).hex()
+    return f'{hashlib.md5(b"".join(digests)).hexdigest()}-{len(digests)}'
+
+
+def _etag_matches(path, etag, chunksize):
+    # Remote ETags of multipart objects depend on the chunk size the uploader used
+    etag = etag.strip('"')
+    if '-' in etag:
+        return local_etag(path, chunksize) == etag
+    return local_etag(path, max(os.path.getsize(path), 1)) == etag
+
+
+def _signature(path):
+    # Size and modification time, plus those of a SQLite database's write-ahead log, where recent commits live
+    stat = os.stat(path)
+    signature = [stat.st_size, stat.st_mtime_ns]
+    if path.endswith(SQLITE_SUFFIXES) and os.path.exists(path + '-wal'):
+        wal = os.stat(path + '-wal')
+        signature += [wal.st_size, wal.st_mtime_ns]
+    return signature
+
+
+def _copy_sqlite(source, destination):
+    # Consistent copy of the last committed state, even while another connection is writing
+    source_connection = sqlite3.connect(source)
+    destination_connection = sqlite3.connect(destination)
+    try:
+        source_connection.backup(destination_connection)
+    finally:
+        destination_connection.close()
+        source_connection.close()
+
+
+class S3Sync:
+    """
+    Delta-only, parallel synchronization of a local directory with an S3 prefix.
+
+    Uploads skip files whose size and modification time match the last successful
+    upload, recorded in a small manifest inside the directory. Files that did change are
+    compared with the remote object's ETag before uploading, so a freshly downloaded
+    directory is not pushed back. Changed files are uploaded concurrently with multipart
+    transfers, and upload_in_background() runs a pass on a background thread so the
+    caller is not blocked. Listings are paginated, so prefixes with more than 1000 keys
+    are synchronized completely.
+
+    Every pass uploads a snapshot rather than the live directory: the changed files are
+    copied into a staging directory first (SQLite databases through the backup API, their
+    -wal and -shm files never leave the machine), so the caller may keep writing while
+    the snapshot uploads. Data files are uploaded before the checkpoints and databases
+    that reference them, and those are held back whenever a data file fails, so the
+    bucket never points at objects it does not hold.
+
+    The client is passed in, so any S3-compatible endpoint works, including moto and
+    MinIO for testing.
+
+    Parameters:
+        s3 (boto3.client): An initialized S3 client.
+        bucket_name (str): Name of the S3 bucket.
+        prefix (str): Key prefix mirrored by local_directory; '' for the bucket root.
+        local_directory (str): Local directory mirrored to the prefix.
+        max_workers (int): Number of files transferred concurrently.
+            - Defaults to 8.
+        multipart_chunksize (int): Part size in bytes for multipart transfers; files larger
+            than this are uploaded in parts.
+            - Defaults to 8 MiB.
+    """
+
+    def __init__(self, s3, bucket_name, prefix, local_directory, max_workers=8, multipart_chunksize=8 * 1024 * 1024):
+        self.s3 = s3
+        self.bucket_name = bucket_name
+        self.prefix = prefix.strip('/')
+        self.local_directory = local_directory
+        self.max_workers = max_workers
+        self.multipart_chunksize = multipart_chunksize
+        self.transfer_config = TransferConfig(multipart_threshold=multipart_chunksize,
+                                              multipart_chunksize=multipart_chunksize, max_concurrency=4)
+        self.manifest_file = os.path.join(local_directory, MANIFEST_FILE)
+        self.staging_directory = os.path.join(local_directory, STAGING_DIRECTORY)
+        self._manifest = self._load_manifest()
+        self._lock = threading.Lock()
+        self._manifest_lock = threading.Lock()
+        self._background = ThreadPoolExecutor(max_workers=1)
+        self._pending = None
+        self._pending_staging = None
+        # Snapshots left behind by an interrupted pass
+        shutil.rmtree(self.staging_directory, ignore_errors=True)
+
+    def _load_manifest(self):
+        if os.path.exists(self.manifest_file):
+            with open(self.manifest_file, 'r') as f:
+                return json.load(f)
+        return {}
+
+    def _save_manifest(self):
+        os.makedirs(self.local_directory, exist_ok=True)
+        temp_file = self.manifest_file + '.tmp'
+        with self._manifest_lock:
+            with open(temp_file, 'w') as f:
+                json.dump(self._manifest, f)
+        os.replace(temp_file, self.manifest_file)
+
+    def _key(self, relative_path):
+        relative_path = relative_path.replace(os.sep, '/')
+        return f'{self.prefix}/{relative_path}' if self.prefix else relative_path
+
+    def _relative_path(self, key):
+        return os.path.normpath(key[len(self.prefix):].lstrip('/'))
+
+    def list_objects(self):
+        """
+        Lists every object under the prefix, following pagination.
+
+        Returns:
+            dict: {key: {'size': int, 'etag': str}} for each object.
+        """
+        listing_prefix = f'{self.prefix}/' if self.prefix else ''
+        objects = {}
+        paginator = self.s3.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket_name, Prefix=listing_prefix):
+            for obj in page.get('Contents', []):
+                objects[obj['Key']] = {'size': obj['Size'], 'etag': obj['ETag'].strip('"')}
+        return objects
+
+    def _local_files(self):
+        for root, directories, files in os.walk(self.local_directory):
+            if root == self.local_directory and STAGING_DIRECTORY in directories:
+                directories.remove(STAGING_DIRECTORY)
+            for file in files:
+                if file.endswith(EXCLUDED_SUFFIXES):
+                    continue
+                yield os.path.relpath(os.path.join(root, file), self.local_directory)
+
+    def changed_files(self, remote=None):
+        """
+        Finds local files that differ from the last upload.
+
+        Parameters:
+            remote (dict, optional): Output of list_objects(). When given, changed files
+                whose content already matches the remote object are not reported.
+
+        Returns:
+            list: (relative_path, signature) of the files to upload, where signature is
+            the size and modification time recorded in the manifest once uploaded.
+        """
+        changed = []
+        for relative_path in self._local_files():
+            path = os.path.join(self.local_directory, relative_path)
+            try:
+                signature = _signature(path)
+            except FileNotFoundError:
+                continue
+            with self._manifest_lock:
+                if self._manifest.get(relative_path) == signature:
+                    continue
+            existing = (remote or {}).get(self._key(relative_path))
+            if (existing is not None and not path.endswith(SQLITE_SUFFIXES) and existing['size'] == signature[0]
+                    and _etag_matches(path, existing['etag'], self.multipart_chunksize)):
+                with self._manifest_lock:
+                    self._manifest[relative_path] = signature
+                continue
+            changed.append((relative_path, signature))
+        return changed
+
+    def snapshot(self, remote=None):
+        """
+        Freezes the changed files in a staging directory for upload.
+
+        Parameters:
+            remote (dict, optional): Output of list_objects(), see changed_files.
+
+        Returns:
+            tuple: The staging directory and the (relative_path, signature) of the
+            files copied into it.
+        """
+        os.makedirs(self.staging_directory, exist_ok=True)
+        staging = tempfile.mkdtemp(dir=self.staging_directory)
+        frozen = []
+        for relative_path, signature in self.changed_files(remote):
+            source = os.path.join(self.local_directory, relative_path)
+            destination = os.path.join(staging, relative_path)
+            os.makedirs(os.path.dirname(destination), exist_ok=True)
+            try:
+                if relative_path.endswith(SQLITE_SUFFIXES):
+                    _copy_sqlite(source, destination)
+                else:
+                    shutil.copy2(source, destination)
+            except (FileNotFoundError, sqlite3.Error) as e:
+                print(f'Error snapshotting {relative_path}: {e}')
+                continue
+            frozen.append((relative_path, signature))
+        return staging, frozen
+
+    def _upload_file(self, staging, relative_path):
+        self.s3.upload_file(os.path.join(staging, relative_path), self.bucket_name,
+                            self._key(relative_path), Config=self.transfer_config)
+
+    def _upload_snapshot(self, staging, frozen):
+        # Upload data files first and the files referencing them only once all data files are in place
+        data_files = [entry for entry in frozen if not entry[0].endswith(REFERENCE_SUFFIXES)]
+        reference_files = [entry for entry in frozen if entry[0].endswith(REFERENCE_SUFFIXES)]
+        uploaded = 0
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                for phase in (data_files, reference_files):
+                    futures = {executor.submit(self._upload_file, staging, relative_path): (relative_path, signature)
+                               for relative_path, signature in phase}
+                    failed = 0
+                    for future, (relative_path, signature) in futures.items():
+                        try:
+                            future.result()
+                        except Exception as e:
+                            print(f'Error uploading {relative_path}: {e}')
+                            failed += 1
+                            continue
+                        # Record the signature taken at snapshot time so files modified since are sent again
+                        with self._manifest_lock:
+                            self._manifest[relative_path] = signature
+                        uploaded += 1
+                    if failed:
+                        if reference_files and phase is data_files:
+                            print(f'Holding back {len(reference_files):,} checkpoint files until every data file is uploaded')
+                        break
+            self._save_manifest()
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+        print(f'Uploaded {uploaded:,} changed files to s3://{self.bucket_name}/{self.prefix}')
+        return uploaded
+
+    def upload(self, compare_remote=False):
+        """
+        Uploads a snapshot of the files that changed since the last upload.
+
+        Parameters:
+            compare_remote (bool): Also list the prefix and skip changed files whose
+                content matches the remote object. Useful on the first pass after a
+                download or when the manifest is missing.
+                - Defaults to False.
+
+        Returns:
+            int: The number of files uploaded.
+        """
+        with self._lock:
+            remote = self.list_objects() if compare_remote or not self._manifest else None
+            return self._upload_snapshot(*self.snapshot(remote))
+
+    def _upload_in_background(self, staging, frozen):
+        with self._lock:
+            return self._upload_snapshot(staging, frozen)
+
+    def upload_in_background(self):
+        """
+        Snapshots the changed files and uploads them on the background thread.
+
+        The snapshot is taken before returning, so the caller may modify the directory
+        as soon as this returns. A pass that has not started yet is replaced by the new
+        one, which covers the same changes.
+
+        Returns:
+            concurrent.futures.Future: Resolves to the number of files uploaded.
+        """
+        if self._pending is not None and self._pending.cancel():
+            # The queued pass never started; the new snapshot covers its files
+            shutil.rmtree(self._pending_staging, ignore_errors=True)
+        # The first pass compares with the bucket so a freshly downloaded directory is not pushed back
+        remote = self.list_objects() if not self._manifest else None
+        staging, frozen = self.snapshot(remote)
+        self._pending_staging = staging
+        self._pending = self._background.submit(self._upload_in_background, staging, frozen)
+        return self._pending
+
+    def wait(self):
+        # Block until the background uploads submitted so far have finished
+        if self._pending is not None:
+            self._pending.result()
+
+    def download(self):
+        """
+        Downloads objects that are missing locally or whose content differs.
+
+        Returns:
+            int: The number of files downloaded.
+        """
+        with self._lock:
+            remote = self.list_objects()
+            wanted = []
+            for key, obj in remote.items():
+                # Write-ahead logs uploaded by older versions would be replayed into the restored databases
+                if key.endswith('/') or key.endswith(EXCLUDED_SUFFIXES):
+                    continue
+                relative_path = self._relative_path(key)
+                local_path = os.path.join(self.local_directory, relative_path)
+                if (os.path.exists(local_path) and os.path.getsize(local_path) == obj['size']
+                        and _etag_matches(local_path, obj['etag'], self.multipart_chunksize)):
+                    continue
+                os.makedirs(os.path.dirname(local_path), exist_ok=True)
+                wanted.append((key, relative_path, local_path))
+
+            downloaded = 0
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                futures = {executor.submit(self.s3.download_file, self.bucket_name, key, local_path, Config=self.transfer_config):
+                           (relative_path, local_path) for key, relative_path, local_path in wanted}
+                for future, (relative_path, local_path) in futures.items():
+                    try:
+                        future.result()
+                    except Exception as e:
+                        print(f'Error downloading {relative_path}: {e}')
+                        continue
+                    with self._manifest_lock:
+                        self._manifest[relative_path] = _signature(local_path)
+                    downloaded += 1
+            self._save_manifest()
+        print(f'Downloaded {downloaded:,} files from s3://{self.bucket_name}/{self.prefix} ({len(remote) - len(wanted):,} up to date)')
+        return downloaded
@@ -0,0 +1,237 @@
+import os
+import json
+import sqlite3
+
+__all__ = ['SQLiteCrawlFrontier']
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    user_id INTEGER PRIMARY KEY,
+    position INTEGER
+);
+CREATE INDEX IF NOT EXISTS users_queue ON users (position) WHERE position IS NOT NULL;
+
+CREATE TABLE IF NOT EXISTS leagues (
+    league_id INTEGER PRIMARY KEY,
+    position INTEGER,
+    payload TEXT
+);
+CREATE INDEX IF NOT EXISTS leagues_queue ON leagues (position) WHERE position IS NOT NULL;
+
+CREATE TABLE IF NOT EXISTS league_parts (
+    name TEXT PRIMARY KEY
+);
+
+CREATE TABLE IF NOT EXISTS state (
+    key TEXT PRIMARY KEY,
+    value INTEGER
+);
+"""
+
+
+class _CountedView:
+    # Read-only stand-in for an in-memory queue or seen-set: length and membership only
+    def __init__(self, frontier, name, contains_sql):
+        self._frontier = frontier
+        self._name = name
+        self._contains_sql = contains_sql
+
+    def __len__(self):
+        return self._frontier._counts[self._name]
+
+    def __contains__(self, key):
+        return self._frontier._connection.execute(self._contains_sql, (int(key),)).fetchone() is not None
+
+
+class SQLiteCrawlFrontier:
+    """
+    Disk-backed breadth-first frontier for the Sleeper league crawler.
+
+    Drop-in replacement for CrawlFrontier that keeps the user and league queues, both
+    seen-sets and the queued league payloads in a SQLite database instead of in memory.
+    Queues are ordered by an indexed position column and league payloads are stored once,
+    keyed by league ID, and dropped when the league is captured. Memory use is bounded by
+    the SQLite page cache plus the batch being processed, whatever the size of the crawl.
+
+    The database is also the crawl checkpoint: changes accumulate in one transaction and
+    are made durable by commit(), together with the league store part files written
+    since the previous commit. After a crash the uncommitted cycle is rolled back and
+    load() reports which part files to keep.
+
+    Parameters:
+        path (str): Path of the SQLite database.
+        memory_limit_mb (int): Size of the SQLite page cache, the main contributor to
+            the frontier's memory use.
+            - Defaults to 64.
+    """
+
+    def __init__(self, path, memory_limit_mb=64):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._connection = sqlite3.connect(path)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA synchronous=FULL')
+        self._connection.execute('PRAGMA temp_store=FILE')
+        self._connection.execute('PRAGMA mmap_size=0')
+        self.configure(memory_limit_mb)
+        self._connection.executescript(SCHEMA)
+        self._connection.commit()
+
+        self.user_queue = _CountedView(self, 'user_queue', 'SELECT 1 FROM users WHERE user_id = ? AND position IS NOT NULL')
+        self.seen_users = _CountedView(self, 'seen_users', 'SELECT 1 FROM users WHERE user_id = ?')
+        self.league_queue = _CountedView(self, 'league_queue', 'SELECT 1 FROM leagues WHERE league_id = ? AND position IS NOT NULL')
+        self.league_index = _CountedView(self, 'league_index', 'SELECT 1 FROM leagues WHERE league_id = ? AND position IS NULL')
+        self.duplicate_users = 0
+        self.duplicate_leagues = 0
+        self._load_counts()
+
+    def configure(self, memory_limit_mb):
+        # A negative cache_size is interpreted by SQLite as KiB
+        self.memory_limit_mb = memory_limit_mb
+        self._connection.execute(f'PRAGMA cache_size=-{int(memory_limit_mb * 1024)}')
+
+    def _load_counts(self):
+        execute = self._connection.execute
+        self._counts = {
+            'user_queue': execute('SELECT COUNT(*) FROM users WHERE position IS NOT NULL').fetchone()[0],
+            'seen_users': execute('SELECT COUNT(*) FROM users').fetchone()[0],
+            'league_queue': execute('SELECT COUNT(*) FROM leagues WHERE position IS NOT NULL').fetchone()[0],
+            'league_index': execute('SELECT COUNT(*) FROM leagues WHERE position IS NULL').fetchone()[0],
+        }
+        self._next_user_position = (execute('SELECT MAX(position) FROM users').fetchone()[0] or 0) + 1
+        self._next_league_position = (execute('SELECT MAX(position) FROM leagues').fetchone()[0] or 0) + 1
+        row = execute("SELECT value FROM state WHERE key = 'users_queried_count'").fetchone()
+        self.users_queried_count = row[0] if row is not None else 0
+
+    def close(self):
+        self._connection.close()
+
+    def exists(self):
+        # True once anything has been committed to the frontier
+        return self._counts['seen_users'] > 0 or self._counts['league_queue'] > 0 or self._counts['league_index'] > 0
+
+    def has_work(self):
+        return self._counts['user_queue'] > 0 or self._counts['league_queue'] > 0
+
+    def push_users(self, user_ids):
+        """
+        Queues users that have never been queued before.
+
+        Returns:
+            int: The number of users added to the queue.
+        """
+        user_ids = [int(user_id) for user_id in user_ids]
+        before = self._connection.total_changes
+        self._connection.executemany(
+            'INSERT OR IGNORE INTO users (user_id, position) VALUES (?, ?)',
+            zip(user_ids, range(self._next_user_position, self._next_user_position + len(user_ids))))
+        self._next_user_position += len(user_ids)
+        added = self._connection.total_changes - before
+        self.duplicate_users += len(user_ids) - added
+        self._counts['user_queue'] += added
+        self._counts['seen_users'] += added
+        return added
+
+    def pop_users(self, count=1):
+        # Take up to `count` users from the front of the queue and mark them as queried
+        rows = self._connection.execute(
+            'SELECT user_id FROM users WHERE position IS NOT NULL ORDER BY position LIMIT ?', (count,)).fetchall()
+        self._connection.executemany('UPDATE users SET position = NULL WHERE user_id = ?', rows)
+        self._counts['user_queue'] -= len(rows)
+        self.users_queried_count += len(rows)
+        return [str(user_id) for user_id, in rows]
+
+    def push_leagues(self, leagues):
+        """
+        Queues leagues that are neither captured nor already queued.
+
+        Parameters:
+            leagues (list): League dictionaries from the Sleeper API.
+
+        Returns:
+            int: The number of leagues added to the queue.
+        """
+        rows = [(int(league['league_id']), self._next_league_position + i, json.dumps(league, separators=(',', ':')))
+                for i, league in enumerate(leagues)]
+        before = self._connection.total_changes
+        self._connection.executemany('INSERT OR IGNORE INTO leagues (league_id, position, payload) VALUES (?, ?, ?)', rows)
+        self._next_league_position += len(rows)
+        added = self._connection.total_changes - before
+        self.duplicate_leagues += len(rows) - added
+        self._counts['league_queue'] += added
+        return added
+
+    def pop_leagues(self, count=1):
+        # Take up to `count` leagues from the queue, mark them as captured and drop their payloads
+        rows = self._connection.execute(
+            'SELECT league_id, payload FROM leagues WHERE position IS NOT NULL ORDER BY position LIMIT ?', (count,)).fetchall()
+        self._connection.executemany('UPDATE leagues SET position = NULL, payload = NULL WHERE league_id = ?',
+                                     [(league_id,) for league_id, _ in rows])
+        self._counts['league_queue'] -= len(rows)
+        self._counts['league_index'] += len(rows)
+        return [(str(league_id), json.loads(payload)) for league_id, payload in rows]
+
+    def load(self):
+        """
+        Returns the league store part files covered by the last commit.
+
+        Returns:
+            set: Names of the committed league store part files.
+        """
+        return {name for name, in self._connection.execute('SELECT name FROM league_parts')}
+
+    def commit(self, league_store):
+        """
+        Makes every change since the previous commit durable.
+
+        Parameters:
+            league_store (LeagueRecordBuffer): The flushed league store whose part files
+                are recorded as committed.
+        """
+        self._connection.executemany('INSERT OR IGNORE INTO league_parts (name) VALUES (?)',
+                                     [(os.path.basename(path),) for path in league_store.part_files()])
+        self._connection.execute("INSERT OR REPLACE INTO state (key, value) VALUES ('users_queried_count', ?)",
+                                 (self.users_queried_count,))
+        self._connection.commit()
+
+    def export_state(self):
+        """
+        Reads the committed crawl state, e.g. to seed a sharded crawl's CrawlCoordinator.
+
+        Returns:
+            tuple: Queued league dictionaries and queued user IDs, both in queue order,
+            followed by the captured league IDs and the seen user IDs.
+        """
+        execute = self._connection.execute
+        leagues = [json.loads(payload) for payload, in execute(
+            'SELECT payload FROM leagues WHERE position IS NOT NULL ORDER BY position')]
+        user_ids = [user_id for user_id, in execute(
+            'SELECT user_id FROM users WHERE position IS NOT NULL ORDER BY position')]
+        captured_league_ids = [league_id for league_id, in execute('SELECT league_id FROM leagues WHERE position IS NULL')]
+        seen_user_ids = [user_id for user_id, in execute('SELECT user_id FROM users')]
+        return leagues, user_ids, captured_league_ids, seen_user_ids
+
+    def import_frontier(self, frontier, league_parts=()):
+        """
+        Copies the state of an in-memory CrawlFrontier, e.g. one restored from a
+        CrawlCheckpoint, into this frontier and commits it.
+
+        Parameters:
+            frontier (CrawlFrontier): The frontier to copy.
+            league_parts (iterable): League store part files covered by its checkpoint.
+        """
+        self.push_users(frontier.user_queue)
+        self._connection.executemany('INSERT OR IGNORE INTO users (user_id, position) VALUES (?, NULL)',
+                                     ((user_id,) for user_id in frontier.seen_users.to_array().tolist()))
+        self._connection.executemany('INSERT OR IGNORE INTO leagues (league_id, position, payload) VALUES (?, NULL, NULL)',
+                                     ((league_id,) for league_id in frontier.league_index.to_array().tolist()))
+        self.push_leagues(list(frontier.league_queue.values()))
+        self._connection.executemany('INSERT OR IGNORE INTO league_parts (name) VALUES (?)',
+                                     [(name,) for name in league_parts])
+        self._connection.execute("INSERT OR REPLACE INTO state (key, value) VALUES ('users_queried_count', ?)",
+                                 (frontier.users_queried_count,))
+        self._connection.commit()
+        self._load_counts()
+        self.duplicate_users = self.duplicate_leagues = 0
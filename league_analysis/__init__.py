@@ -0,0 +1,7 @@
+from .league_analyzer import *
+from .season_simulator import *
+
+__all__ = (
+    league_analyzer.__all__ +
+    season_simulator.__all__
+)
@@ -0,0 +1,237 @@
+import re
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+__all__ = ['LeagueFormatIndex', 'classify_formats', 'scoring_clusters', 'SCORING_FORMATS', 'LEAGUE_TYPES']
+
+SCORING_FORMATS = ['standard', 'half', 'ppr']
+LEAGUE_TYPES = ['redraft', 'keeper', 'dynasty']
+
+# Columns of the cleaned league file (data_storage.league_cleaning) used for classification
+FORMAT_COLUMNS = ['league_id', 'season', 'total_rosters', 'settings_type', 'settings_best_ball',
+                  'slots_QB', 'slots_SUPER_FLEX', 'scoring_rec', 'scoring_bonus_rec_te']
+
+# Columns describing each league's format, in index sort order
+KEY_COLUMNS = ['season', 'teams', 'scoring', 'superflex', 'te_premium', 'league_type', 'best_ball']
+
+
+def _column(leagues, name, default=0):
+    if name not in leagues:
+        return np.full(len(leagues), default, dtype=np.float32)
+    return pd.to_numeric(leagues[name], errors='coerce').to_numpy(dtype=np.float32, na_value=np.nan)
+
+
+def classify_formats(leagues):
+    """
+    Buckets leagues into canonical formats with vectorized NumPy operations.
+
+    - scoring: 0 standard (< 0.25 points per reception), 1 half (< 0.75), 2 PPR
+    - superflex: a SUPER_FLEX slot or two or more QB slots
+    - te_premium: a tight end reception bonus
+    - league_type: 0 redraft, 1 keeper, 2 dynasty (Sleeper's settings.type)
+    - best_ball: Sleeper's settings.best_ball flag
+
+    Parameters:
+        leagues (pandas.DataFrame): Cleaned leagues, see data_storage.read_clean_leagues.
+
+    Returns:
+        pandas.DataFrame: league_id plus the KEY_COLUMNS as small integers; season and
+        teams are -1 when unknown.
+    """
+    reception_points = np.nan_to_num(_column(leagues, 'scoring_rec'))
+    superflex = (np.nan_to_num(_column(leagues, 'slots_SUPER_FLEX')) > 0) | (np.nan_to_num(_column(leagues, 'slots_QB')) >= 2)
+    return pd.DataFrame({
+        'league_id': pd.to_numeric(leagues['league_id']).to_numpy(dtype=np.int64),
+        'season': np.nan_to_num(_column(leagues, 'season', -1), nan=-1).astype(np.int16),
+        'teams': np.nan_to_num(_column(leagues, 'total_rosters', -1), nan=-1).astype(np.int8),
+        'scoring': np.digitize(reception_points, [0.25, 0.75]).astype(np.int8),
+        'superflex': superflex.astype(np.int8),
+        'te_premium': (np.nan_to_num(_column(leagues, 'scoring_bonus_rec_te')) > 0).astype(np.int8),
+        'league_type': np.clip(np.nan_to_num(_column(leagues, 'settings_type')), 0, 2).astype(np.int8),
+        'best_ball': (np.nan_to_num(_column(leagues, 'settings_best_ball')) > 0).astype(np.int8),
+    })
+
+
+def scoring_clusters(matrix, decimals=2):
+    """
+    Groups leagues whose scoring settings are identical after rounding.
+
+    Rows are hashed as raw bytes, so the grouping is a single vectorized np.unique over
+    one value per league rather than a lexicographic sort of the whole matrix.
+
+    Parameters:
+        matrix (numpy.ndarray): Scoring matrix from data_storage.scoring_matrix.
+        decimals (int): Rounding applied before comparing settings.
+            - Defaults to 2.
+
+    Returns:
+        tuple: (cluster_ids, representatives, counts) where cluster_ids gives each
+        league's cluster, representatives the scoring vector of each cluster and counts
+        its number of leagues; clusters are ordered by decreasing size.
+    """
+    rounded = np.ascontiguousarray(np.nan_to_num(np.round(matrix, decimals), nan=0.0), dtype=np.float32)
+    rows = rounded.view(np.dtype((np.void, rounded.dtype.itemsize * rounded.shape[1]))).ravel()
+    _, first, inverse, counts = np.unique(rows, return_index=True, return_inverse=True, return_counts=True)
+    order = np.argsort(-counts, kind='stable')
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    return rank[inverse.ravel()], rounded[first[order]], counts[order]
+
+
+class LeagueFormatIndex:
+    """
+    In-memory index of leagues by format.
+
+    Leagues are classified with classify_formats and sorted by their format key, so every
+    distinct combination of season, team count, scoring, superflex, TE premium, league
+    type and best ball is one contiguous slice of league IDs. A query filters the small
+    table of distinct formats and concatenates the matching slices, so it takes
+    microseconds to milliseconds however many leagues are indexed.
+
+    Parameters:
+        leagues (pandas.DataFrame): Cleaned leagues, see data_storage.read_clean_leagues.
+    """
+
+    def __init__(self, leagues):
+        formats = classify_formats(leagues)
+        formats = formats.sort_values(KEY_COLUMNS + ['league_id'], kind='stable', ignore_index=True)
+        self.league_ids = formats['league_id'].to_numpy()
+        keys = formats[KEY_COLUMNS].to_numpy(dtype=np.int64)
+        starts = np.flatnonzero(np.r_[True, (keys[1:] != keys[:-1]).any(axis=1)]) if len(keys) else np.array([], dtype=np.int64)
+        self.groups = formats.loc[starts, KEY_COLUMNS].reset_index(drop=True)
+        self.groups['start'] = starts
+        self.groups['stop'] = np.r_[starts[1:], len(keys)].astype(np.int64)
+        self.groups['count'] = self.groups['stop'] - self.groups['start']
+
+    @classmethod
+    def from_file(cls, path, filters=None):
+        """
+        Builds the index from a cleaned league file, reading only the columns it needs.
+
+        Parameters:
+            path (str): File written by data_storage.clean_leagues.
+            filters (list, optional): pyarrow filters, e.g. [('season', '=', 2024)].
+        """
+        available = set(pq.read_schema(path).names)
+        columns = [column for column in FORMAT_COLUMNS if column in available]
+        return cls(pq.read_table(path, columns=columns, filters=filters).to_pandas())
+
+    def __len__(self):
+        return len(self.league_ids)
+
+    def _matching_groups(self, season=None, teams=None, scoring=None, superflex=None, te_premium=None,
+                         league_type=None, best_ball=None):
+        mask = np.ones(len(self.groups), dtype=bool)
+        for column, value in (('season', season), ('teams', teams), ('superflex', superflex),
+                              ('te_premium', te_premium), ('best_ball', best_ball)):
+            if value is not None:
+                mask &= self.groups[column].isin(np.atleast_1d(value).astype(np.int64)).to_numpy()
+        if scoring is not None:
+            mask &= self.groups['scoring'].isin([SCORING_FORMATS.index(s) for s in np.atleast_1d(scoring)]).to_numpy()
+        if league_type is not None:
+            mask &= self.groups['league_type'].isin([LEAGUE_TYPES.index(t) for t in np.atleast_1d(league_type)]).to_numpy()
+        return self.groups[mask]
+
+    def query(self, season=None, teams=None, scoring=None, superflex=None, te_premium=None, league_type=None,
+              best_ball=None):
+        """
+        Returns the IDs of leagues matching every given criterion.
+
+        Parameters:
+            season (int or list, optional): Season(s), e.g. 2024.
+            teams (int or list, optional): Number of teams.
+            scoring (str or list, optional): 'standard', 'half' and/or 'ppr'.
+            superflex (bool, optional): Superflex (or 2QB) leagues only, or none.
+            te_premium (bool, optional): TE premium leagues only, or none.
+            league_type (str or list, optional): 'redraft', 'keeper' and/or 'dynasty'.
+            best_ball (bool, optional): Best ball leagues only, or none.
+
+        Returns:
+            numpy.ndarray: Matching league IDs as int64.
+        """
+        groups = self._matching_groups(season, teams, scoring, superflex, te_premium, league_type, best_ball)
+        if groups.empty:
+            return np.array([], dtype=np.int64)
+        return np.concatenate([self.league_ids[start:stop] for start, stop in zip(groups['start'], groups['stop'])])
+
+    def count(self, **criteria):
+        # Number of leagues matching the criteria of query(), without materializing their IDs
+        return int(self._matching_groups(**criteria)['count'].sum())
+
+    def search(self, text):
+        """
+        Answers a plain-text query such as '12-team SF dynasty' or 'half ppr 10 team redraft TEP'.
+
+        Recognized terms: '<n>-team' or '<n> team', 'sf'/'superflex'/'2qb', '1qb',
+        'ppr', 'half'/'half-ppr', 'standard'/'std'/'non-ppr', 'tep'/'te premium',
+        'redraft', 'keeper', 'dynasty', 'best ball'/'bestball', and a four-digit season.
+
+        Returns:
+            numpy.ndarray: Matching league IDs as int64.
+        """
+        return self.query(**self.parse_query(text))
+
+    @staticmethod
+    def parse_query(text):
+        # Translate a plain-text query into query() keyword arguments
+        text = text.lower()
+        criteria = {}
+        teams = re.search(r'\b(\d{1,2})\s*-?\s*(?:team|teams|tm)\b', text)
+        if teams:
+            criteria['teams'] = int(teams.group(1))
+        season = re.search(r'\b(20\d{2})\b', text)
+        if season:
+            criteria['season'] = int(season.group(1))
+        if re.search(r'\b(sf|superflex|super flex|2qb)\b', text):
+            criteria['superflex'] = True
+        elif re.search(r'\b1qb\b', text):
+            criteria['superflex'] = False
+        if re.search(r'\bhalf\b', text):
+            criteria['scoring'] = 'half'
+        elif re.search(r'\b(standard|std|non-ppr)\b', text):
+            criteria['scoring'] = 'standard'
+        elif re.search(r'\bppr\b', text):
+            criteria['scoring'] = 'ppr'
+        if re.search(r'\b(tep|te premium)\b', text):
+            criteria['te_premium'] = True
+        for league_type in LEAGUE_TYPES:
+            if re.search(rf'\b{league_type}\b', text):
+                criteria['league_type'] = league_type
+        if re.search(r'\bbest ?ball\b', text):
+            criteria['best_ball'] = True
+        return criteria
+
+    def format_counts(self, by=('teams', 'scoring', 'superflex', 'te_premium', 'league_type')):
+        """
+        Counts leagues per canonical format.
+
+        Parameters:
+            by (tuple): Format columns to group by.
+
+        Returns:
+            pandas.DataFrame: One row per format with readable labels and a 'leagues'
+            count, sorted by decreasing count.
+        """
+        counts = self.groups.groupby(list(by), as_index=False)['count'].sum().rename(columns={'count': 'leagues'})
+        if 'scoring' in counts:
+            counts['scoring'] = np.asarray(SCORING_FORMATS)[counts['scoring']]
+        if 'league_type' in counts:
+            counts['league_type'] = np.asarray(LEAGUE_TYPES)[counts['league_type']]
+        for flag in ('superflex', 'te_premium', 'best_ball'):
+            if flag in counts:
+                counts[flag] = counts[flag].astype(bool)
+        return counts.sort_values('leagues', ascending=False, ignore_index=True)
+
+    def save(self, path):
+        # Persist the index as a compressed .npz file
+        np.savez_compressed(path, league_ids=self.league_ids,
+                            **{f'group_{column}': self.groups[column].to_numpy() for column in self.groups})
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            index = cls.__new__(cls)
+            index.league_ids = data['league_ids']
+            index.groups = pd.DataFrame({name[len('group_'):]: data[name] for name in data.files if name.startswith('group_')})
+        return index
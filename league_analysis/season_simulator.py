@@ -0,0 +1,303 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+
+__all__ = ['build_season_inputs', 'simulate_seasons', 'matchups_frame', 'bracket_order']
+
+# Weeks of history at which a team's own scoring outweighs its projection
+PRIOR_WEEKS = 4
+
+# Padded cells per batch, (leagues x simulations x weeks x teams), bounding memory to ~256 MB of float32
+MAX_BATCH_CELLS = 1 << 26
+
+
+def matchups_frame(matchups_by_week):
+    """
+    Converts sleeper_API.get_league_matchups results into the harvest's matchup layout.
+
+    Parameters:
+        matchups_by_week (dict): week -> list of matchups for one league.
+
+    Returns:
+        pandas.DataFrame: week, roster_id, matchup_id and points.
+    """
+    rows = [{'week': week, 'roster_id': m.get('roster_id'), 'matchup_id': m.get('matchup_id'), 'points': m.get('points')}
+            for week, matchups in matchups_by_week.items() for m in matchups or []]
+    return pd.DataFrame(rows, columns=['week', 'roster_id', 'matchup_id', 'points'])
+
+
+def bracket_order(size):
+    """
+    Seeds in bracket order for a single-elimination bracket, e.g. [1, 8, 4, 5, 2, 7, 3, 6].
+
+    Adjacent seeds meet in the first round and winners of adjacent pairs meet next, so
+    the top seeds can only meet late. Seeds above the number of playoff teams are byes.
+    """
+    order = np.array([1])
+    while len(order) < size:
+        order = np.stack([order, 2 * len(order) + 1 - order], axis=1).ravel()
+    return order
+
+
+def _round_robin(teams, weeks, offset):
+    # Circle-method pairings used for weeks whose schedule is unknown; with an odd team count one team sits out
+    n = teams + teams % 2
+    schedule = np.empty((weeks, teams), dtype=np.int64)
+    for w in range(weeks):
+        ring = np.r_[0, np.roll(np.arange(1, n), w + offset)]
+        home, away = ring[:n // 2], ring[::-1][:n // 2]
+        opponents = np.arange(n)
+        opponents[home], opponents[away] = away, home
+        schedule[w] = np.where(opponents[:teams] < teams, opponents[:teams], np.arange(teams))
+    return schedule
+
+
+def _team_table(leagues, matchups, rosters, projections):
+    # One row per (league, team) with its standings and scoring model, computed across all leagues at once
+    settings = pd.DataFrame({
+        'league_id': leagues['league_id'].to_numpy(),
+        'last_scored': pd.to_numeric(leagues['last_scored_leg'], errors='coerce').fillna(0).astype(int).to_numpy(),
+        'playoff_start': pd.to_numeric(leagues['playoff_week_start'], errors='coerce').fillna(15).astype(int).to_numpy(),
+    })
+    teams = rosters[['league_id', 'roster_id']].drop_duplicates().sort_values(['league_id', 'roster_id'])
+    teams = teams.merge(settings, on='league_id')
+    teams['team'] = teams.groupby('league_id').cumcount()
+
+    played = matchups.merge(settings, on='league_id')
+    played = played[(played['week'] <= played['last_scored']) & played['points'].notna()]
+    played = played.merge(teams[['league_id', 'roster_id']], on=['league_id', 'roster_id'])
+    history = played.groupby(['league_id', 'roster_id'])['points'].agg(history_mean='mean', weeks_played='count')
+    played = played.join(history, on=['league_id', 'roster_id'])
+    played['squared_residual'] = (played['points'] - played['history_mean']) ** 2
+    league_stats = played.groupby('league_id').agg(league_mean=('points', 'mean'),
+                                                   league_var=('squared_residual', 'mean'),
+                                                   scores=('points', 'size'))
+    teams = teams.join(history, on=['league_id', 'roster_id']).join(league_stats, on='league_id')
+    teams['weeks_played'] = teams['weeks_played'].fillna(0)
+    # Week-to-week variation is only meaningful once teams have more than one score each
+    enough = teams['scores'] > teams.groupby('league_id')['team'].transform('size')
+    teams['league_sd'] = np.sqrt(teams['league_var']).where(enough)
+
+    projected_mean = projected_sd = pd.Series(np.nan, index=teams.index)
+    if projections is not None and 'starters' in rosters:
+        starters = rosters[['league_id', 'roster_id', 'starters']].explode('starters')
+        starters = starters.join(projections, on='starters', how='inner')
+        if 'sd' in projections:
+            starters['var'] = starters['sd'] ** 2
+        projected = starters.groupby(['league_id', 'roster_id']).sum(numeric_only=True)
+        projected = projected.reindex(pd.MultiIndex.from_frame(teams[['league_id', 'roster_id']]))
+        projected_mean = pd.Series(projected['mean'].to_numpy(), index=teams.index)
+        if 'var' in projected:
+            projected_sd = pd.Series(np.sqrt(projected['var'].to_numpy()), index=teams.index)
+
+    # Shrink each team's scoring toward its projection (or the league average) until it has enough weeks
+    prior = projected_mean.fillna(teams['league_mean'])
+    weight = teams['weeks_played'] / (teams['weeks_played'] + PRIOR_WEEKS)
+    mean = (weight * teams['history_mean'].fillna(0) + (1 - weight) * prior).where(teams['history_mean'].notna(), prior)
+    teams['mean'] = mean.fillna(mean.groupby(teams['league_id']).transform('mean')).fillna(100.0)
+    teams['sd'] = projected_sd.fillna(teams['league_sd']).fillna(0.2 * teams['mean'])
+
+    standings = rosters.drop_duplicates(['league_id', 'roster_id']).set_index(['league_id', 'roster_id'])
+    standings = standings.reindex(pd.MultiIndex.from_frame(teams[['league_id', 'roster_id']]))
+    ties = standings['ties'].fillna(0).to_numpy() if 'ties' in standings else 0
+    teams['wins'] = standings['wins'].fillna(0).to_numpy() + 0.5 * ties
+    teams['points'] = standings['fpts'].fillna(0).to_numpy()
+    return teams
+
+
+def _future_games(matchups, teams):
+    # Scheduled opponents, as team indices, for the weeks between the last scored week and the playoffs
+    bounds = teams.drop_duplicates('league_id')[['league_id', 'last_scored', 'playoff_start']]
+    future = matchups[matchups['matchup_id'].notna()].merge(bounds, on='league_id')
+    future = future[(future['week'] > future['last_scored']) & (future['week'] < future['playoff_start'])]
+    future = future.merge(teams[['league_id', 'roster_id', 'team']], on=['league_id', 'roster_id'])
+    pairs = future.merge(future[['league_id', 'week', 'matchup_id', 'team']], on=['league_id', 'week', 'matchup_id'],
+                         suffixes=('', '_opponent'))
+    pairs = pairs[pairs['team'] != pairs['team_opponent']]
+    pairs['offset'] = pairs['week'] - pairs['last_scored'] - 1
+    return pairs[['league_id', 'offset', 'team', 'team_opponent']]
+
+
+def build_season_inputs(leagues, matchups, rosters, projections=None):
+    """
+    Prepares the per-league inputs of simulate_seasons.
+
+    Each team's weekly score is modelled as a normal distribution. Its mean blends the
+    team's scoring so far with its projection (the sum of its current starters'
+    projected points) or, without projections, the league average; its spread comes
+    from the projections or the league's week-to-week variation. Remaining regular
+    season weeks use the scheduled matchups when known (matchups with a matchup_id
+    after the last scored week) and a round-robin otherwise.
+
+    Parameters:
+        leagues (pandas.DataFrame): league_id, playoff_teams, playoff_week_start,
+            league_average_match and last_scored_leg, e.g. the settings_* columns of
+            data_storage.read_clean_leagues with the prefix removed.
+        matchups (pandas.DataFrame): league_id, week, roster_id, matchup_id and points,
+            e.g. data_collection.read_harvest('matchups').
+        rosters (pandas.DataFrame): league_id, roster_id, wins, ties, fpts and optionally
+            starters, e.g. data_collection.read_harvest('rosters').
+        projections (pandas.DataFrame, optional): Indexed by player_id with a 'mean' and
+            optionally an 'sd' of projected points.
+
+    Returns:
+        list: One input dict per league with rosters.
+    """
+    leagues = leagues[leagues['league_id'].isin(rosters['league_id'])]
+    teams = _team_table(leagues, matchups, rosters, projections)
+    games = dict(tuple(_future_games(matchups, teams).groupby('league_id')))
+    teams_by_league = dict(tuple(teams.groupby('league_id')))
+    inputs = []
+    for league in leagues.to_dict('records'):
+        league_teams = teams_by_league.get(league['league_id'])
+        if league_teams is None or len(league_teams) < 2:
+            continue
+        n_teams = len(league_teams)
+        last_scored, playoff_start = league_teams[['last_scored', 'playoff_start']].iloc[0]
+        schedule = _round_robin(n_teams, max(playoff_start - last_scored - 1, 0), last_scored)
+        scheduled = games.get(league['league_id'])
+        if scheduled is not None:
+            # Weeks with a known schedule replace the round-robin; teams without a matchup sit out
+            schedule[np.unique(scheduled['offset'].to_numpy())] = np.arange(n_teams)
+            schedule[scheduled['offset'].to_numpy(), scheduled['team'].to_numpy()] = scheduled['team_opponent'].to_numpy()
+        inputs.append({
+            'league_id': league['league_id'],
+            'roster_ids': league_teams['roster_id'].to_numpy(),
+            'mean': league_teams['mean'].to_numpy(np.float32),
+            'sd': league_teams['sd'].to_numpy(np.float32),
+            'wins': league_teams['wins'].to_numpy(np.float32),
+            'points': league_teams['points'].to_numpy(np.float32),
+            'schedule': schedule,
+            'playoff_teams': min(int(league.get('playoff_teams') or 6), n_teams),
+            'median_match': bool(league.get('league_average_match') or 0),
+        })
+    return inputs
+
+
+def _stack(inputs, field, shape, fill, dtype):
+    array = np.full((len(inputs),) + shape, fill, dtype=dtype)
+    for i, league in enumerate(inputs):
+        value = np.asarray(league[field])
+        array[(i,) + tuple(slice(0, n) for n in value.shape)] = value
+    return array
+
+
+def _simulate_batch(inputs, n_sims, seed):
+    # Simulate the rest of the season for a batch of leagues padded to a common size
+    rng = np.random.default_rng(seed)
+    n_leagues = len(inputs)
+    teams = max(len(league['roster_ids']) for league in inputs)
+    weeks = max(len(league['schedule']) for league in inputs)
+    valid = _stack(inputs, 'mean', (teams,), np.nan, np.float32)
+    valid = ~np.isnan(valid)
+    mean = _stack(inputs, 'mean', (teams,), 0, np.float32)
+    sd = _stack(inputs, 'sd', (teams,), 0, np.float32)
+    # Padded weeks and teams play themselves, which never counts as a win
+    schedule = np.broadcast_to(np.arange(teams), (n_leagues, weeks, teams)).copy()
+    for i, league in enumerate(inputs):
+        schedule[i, :len(league['schedule']), :len(league['roster_ids'])] = league['schedule']
+    playoff_teams = np.array([league['playoff_teams'] for league in inputs])
+    median_match = np.array([league['median_match'] for league in inputs])
+    n_teams = valid.sum(axis=1)
+
+    scores = mean[:, None, None, :] + sd[:, None, None, :] * rng.standard_normal((n_leagues, n_sims, weeks, teams),
+                                                                                 dtype=np.float32)
+    scores = np.where(valid[:, None, None, :], scores, -np.inf)
+    opponent_scores = np.take_along_axis(scores, np.broadcast_to(schedule[:, None], scores.shape), axis=3)
+    wins = (scores > opponent_scores).sum(axis=2, dtype=np.float32)
+    real_weeks = np.array([len(league['schedule']) for league in inputs])
+    if median_match.any():
+        # Beating the median means outscoring at least half of the league's teams
+        threshold = (teams - n_teams) + (n_teams + 1) // 2 - 1
+        median = np.take_along_axis(np.sort(scores, axis=3), np.broadcast_to(threshold[:, None, None, None],
+                                                                             scores.shape[:3] + (1,)), axis=3)
+        median_wins = (scores > median) & (np.arange(weeks) < real_weeks[:, None])[:, None, :, None]
+        wins += np.where(median_match[:, None, None], median_wins.sum(axis=2), 0)
+    week_mask = (np.arange(weeks) < real_weeks[:, None])[:, None, :, None]
+    points = np.where(week_mask, np.where(np.isfinite(scores), scores, 0), 0).sum(axis=2)
+
+    wins += _stack(inputs, 'wins', (teams,), 0, np.float32)[:, None, :]
+    points += _stack(inputs, 'points', (teams,), 0, np.float32)[:, None, :]
+    key = np.where(valid[:, None, :], wins.astype(np.float64) * 1e6 + points, -np.inf)
+    seeds = np.argsort(-key, axis=2, kind='stable')
+    rank = np.empty_like(seeds)
+    np.put_along_axis(rank, seeds, np.arange(teams)[None, None, :], axis=2)
+
+    bracket_size = 1 << int(np.ceil(np.log2(max(playoff_teams.max(), 2))))
+    byes = (1 << np.ceil(np.log2(np.maximum(playoff_teams, 2))).astype(int)) - playoff_teams
+    order = bracket_order(bracket_size) - 1
+    slots = np.where(order[None, None, :] < playoff_teams[:, None, None],
+                     seeds[:, :, np.minimum(order, teams - 1)], -1)
+    while slots.shape[2] > 1:
+        round_scores = mean[:, None, :] + sd[:, None, :] * rng.standard_normal((n_leagues, n_sims, teams),
+                                                                               dtype=np.float32)
+        playoff_scores = np.take_along_axis(round_scores, np.maximum(slots, 0), axis=2)
+        playoff_scores = np.where(slots >= 0, playoff_scores, -np.inf)
+        first, second = playoff_scores[:, :, 0::2], playoff_scores[:, :, 1::2]
+        slots = np.where(first >= second, slots[:, :, 0::2], slots[:, :, 1::2])
+    champion = slots[:, :, 0]
+
+    results = []
+    for i, league in enumerate(inputs):
+        n = len(league['roster_ids'])
+        results.append(pd.DataFrame({
+            'league_id': league['league_id'],
+            'roster_id': league['roster_ids'],
+            'mean_wins': wins[i, :, :n].mean(axis=0),
+            'mean_seed': rank[i, :, :n].mean(axis=0) + 1,
+            'playoff_odds': (rank[i, :, :n] < playoff_teams[i]).mean(axis=0),
+            'bye_odds': (rank[i, :, :n] < byes[i]).mean(axis=0),
+            'title_odds': np.bincount(champion[i][champion[i] >= 0], minlength=teams)[:n] / n_sims,
+        }))
+    return pd.concat(results, ignore_index=True)
+
+
+def simulate_seasons(inputs, n_sims=10000, seed=None, processes=1, max_batch_cells=MAX_BATCH_CELLS):
+    """
+    Simulates the rest of the season for many leagues at once.
+
+    Leagues are grouped into batches padded to a common number of teams and weeks, and
+    each batch is simulated as (leagues x simulations x weeks x teams) arrays: weekly
+    scores, head-to-head and median results, standings with points-for as tiebreaker,
+    playoff seeding and a single-elimination bracket in which the top seeds get the
+    byes. Divisions are not modelled.
+
+    Parameters:
+        inputs (list): Output of build_season_inputs.
+        n_sims (int): Simulated seasons per league.
+            - Defaults to 10000.
+        seed (int, optional): Seed for reproducible results.
+        processes (int): Worker processes used to simulate batches in parallel.
+            - Defaults to 1.
+        max_batch_cells (int): Upper bound on leagues x simulations x weeks x teams per
+            batch, which bounds memory use.
+            - Defaults to 2**26.
+
+    Returns:
+        pandas.DataFrame: league_id, roster_id, mean_wins, mean_seed, playoff_odds,
+        bye_odds and title_odds.
+    """
+    if not inputs:
+        return pd.DataFrame(columns=['league_id', 'roster_id', 'mean_wins', 'mean_seed', 'playoff_odds',
+                                     'bye_odds', 'title_odds'])
+    # Batch leagues of similar size together to limit padding
+    inputs = sorted(inputs, key=lambda league: (len(league['roster_ids']), len(league['schedule'])))
+    batches, batch = [], []
+    for league in inputs:
+        candidate = batch + [league]
+        teams = max(len(item['roster_ids']) for item in candidate)
+        weeks = max(max(len(item['schedule']) for item in candidate), 1)
+        if batch and len(candidate) * n_sims * weeks * teams > max_batch_cells:
+            batches.append(batch)
+            candidate = [league]
+        batch = candidate
+    batches.append(batch)
+
+    seeds = np.random.SeedSequence(seed).spawn(len(batches))
+    if processes > 1 and len(batches) > 1:
+        with ProcessPoolExecutor(max_workers=min(processes, os.cpu_count() or 1)) as executor:
+            results = list(executor.map(_simulate_batch, batches, [n_sims] * len(batches), seeds))
+    else:
+        results = [_simulate_batch(batch, n_sims, s) for batch, s in zip(batches, seeds)]
+    return pd.concat(results, ignore_index=True)
@@ -0,0 +1,7 @@
+from .draft_simulator import *
+from .lineup_optimizer import *
+
+__all__ = (
+    draft_simulator.__all__ +
+    lineup_optimizer.__all__
+)
\ No newline at end of file
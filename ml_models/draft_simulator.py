@@ -0,0 +1,146 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+
+__all__ = ['DraftSimulator', 'snake_picks']
+
+
+def snake_picks(slot, teams=12, rounds=15):
+    """
+    Overall pick numbers of a draft slot in a snake draft.
+
+    Parameters:
+        slot (int): Draft slot, 1-based.
+        teams (int): Number of teams.
+            - Defaults to 12.
+        rounds (int): Number of rounds.
+            - Defaults to 15.
+
+    Returns:
+        numpy.ndarray: The slot's 1-based overall picks, one per round.
+    """
+    rounds = np.arange(rounds)
+    return np.where(rounds % 2 == 0, rounds * teams + slot, (rounds + 1) * teams - slot + 1)
+
+
+def _simulate_chunk(adp, stdev, picks, n_sims, seed):
+    # Count, per player, the simulations in which they are still available at each pick
+    rng = np.random.default_rng(seed)
+    n_players = len(adp)
+    boards = adp + stdev * rng.standard_normal((n_sims, n_players), dtype=np.float32)
+    order = np.argsort(boards, axis=1)
+    # Histogram of the draft position of each player: counts[player, position]
+    cells = order.astype(np.int64) * n_players + np.arange(n_players, dtype=np.int64)
+    counts = np.bincount(cells.ravel(), minlength=n_players * n_players).reshape(n_players, n_players)
+    # A player is still available at a pick when they were not among the picks made before it
+    drafted_before = np.hstack([np.zeros((n_players, 1), np.int64), np.cumsum(counts, axis=1)])
+    available = n_sims - drafted_before[:, np.clip(picks, 0, n_players)]
+    return available, counts @ np.arange(n_players, dtype=np.int64)
+
+
+class DraftSimulator:
+    """
+    Monte Carlo draft simulator driven by ADP distributions.
+
+    Each simulated draft perturbs every player's ADP with a normal draw scaled by its
+    standard deviation, and the board is drafted in that order. A batch of simulations is
+    one (simulations x players) random matrix, one argsort along the rows and one
+    bincount of the resulting draft positions, so 10,000 12-team drafts take a fraction
+    of a second with NumPy. Larger runs can be split across processes.
+
+    Parameters:
+        players (pandas.DataFrame): One row per player with 'player_id' and 'adp', and
+            optionally 'stdev' plus any descriptive columns (name, position) to carry
+            into the results.
+        spread (float): Standard deviation assumed per pick of ADP for players without a
+            'stdev', e.g. from Tank01 ADP.
+            - Defaults to 0.15.
+        min_stdev (float): Lower bound on every player's standard deviation.
+            - Defaults to 1.0.
+    """
+
+    def __init__(self, players, spread=0.15, min_stdev=1.0):
+        players = players.dropna(subset=['adp']).sort_values('adp', ignore_index=True)
+        self.players = players
+        self.adp = players['adp'].to_numpy(dtype=np.float32)
+        stdev = players['stdev'].to_numpy(dtype=np.float32) if 'stdev' in players else \
+            np.full(len(players), np.nan, dtype=np.float32)
+        stdev = np.where(np.isnan(stdev), spread * self.adp, stdev)
+        self.stdev = np.maximum(stdev, min_stdev).astype(np.float32)
+
+    @classmethod
+    def from_tank01_adp(cls, response, **kwargs):
+        """
+        Builds a simulator from rapid_API.get_ADP_data.
+
+        Parameters:
+            response (dict): The getNFLADP response.
+            **kwargs: Passed to DraftSimulator.
+        """
+        body = response.get('body', response) if isinstance(response, dict) else {}
+        adp_list = pd.DataFrame(body.get('adpList', []) if isinstance(body, dict) else body)
+        players = pd.DataFrame({
+            'player_id': adp_list.get('playerID'),
+            'name': adp_list.get('longName'),
+            'position': adp_list.get('posADP', pd.Series(dtype=str)).str.extract(r'^([A-Z]+)', expand=False),
+            'adp': pd.to_numeric(adp_list.get('overallADP'), errors='coerce'),
+        })
+        return cls(players, **kwargs)
+
+    def _pool(self, taken):
+        # Indices of players still on the board
+        if taken is None or not len(taken):
+            return np.arange(len(self.adp))
+        taken = pd.Index(taken).astype(self.players['player_id'].dtype)
+        return np.flatnonzero(~self.players['player_id'].isin(taken).to_numpy())
+
+    def simulate(self, our_picks, n_sims=10000, taken=None, current_pick=1, seed=None, processes=1, chunk_size=10000):
+        """
+        Estimates the chance each player is still available at each of our picks.
+
+        Parameters:
+            our_picks (list): Our overall pick numbers, e.g. snake_picks(5).
+            n_sims (int): Number of simulated drafts.
+                - Defaults to 10000.
+            taken (list, optional): IDs of players already drafted, during a live draft.
+            current_pick (int): The next overall pick to be made.
+                - Defaults to 1.
+            seed (int, optional): Seed for reproducible results.
+            processes (int): Worker processes; above 1 the simulations are split into
+                chunks of chunk_size run in a process pool.
+                - Defaults to 1.
+            chunk_size (int): Simulations per batch.
+                - Defaults to 10000.
+
+        Returns:
+            pandas.DataFrame: The players still on the board with their expected draft
+            position ('expected_pick') and one 'pick_<n>' availability probability
+            column per remaining pick of ours (none once all our picks are made), sorted
+            by ADP. expected_pick is NaN when n_sims is 0.
+        """
+        our_picks = np.asarray([pick for pick in np.atleast_1d(our_picks) if pick >= current_pick], dtype=np.int64)
+        pool = self._pool(taken)
+        adp, stdev = self.adp[pool], self.stdev[pool]
+        offsets = our_picks - current_pick
+
+        output = self.players.iloc[pool].reset_index(drop=True)
+        if n_sims <= 0:
+            output['expected_pick'] = np.nan
+            return output
+
+        sizes = [chunk_size] * (n_sims // chunk_size) + ([n_sims % chunk_size] if n_sims % chunk_size else [])
+        seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+        if processes > 1 and len(sizes) > 1:
+            with ProcessPoolExecutor(max_workers=min(processes, len(sizes), os.cpu_count() or 1)) as executor:
+                results = list(executor.map(_simulate_chunk, [adp] * len(sizes), [stdev] * len(sizes),
+                                            [offsets] * len(sizes), sizes, seeds))
+        else:
+            results = [_simulate_chunk(adp, stdev, offsets, size, s) for size, s in zip(sizes, seeds)]
+
+        available = sum(result[0] for result in results)
+        rank_totals = sum(result[1] for result in results)
+        output['expected_pick'] = rank_totals / n_sims + current_pick
+        for i, pick in enumerate(our_picks):
+            output[f'pick_{pick}'] = available[:, i] / n_sims
+        return output
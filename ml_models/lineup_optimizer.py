@@ -0,0 +1,249 @@
+from itertools import product
+import numpy as np
+import pandas as pd
+
+__all__ = ['LineupOptimizer', 'optimize_lineups', 'roster_player_frame', 'projections_from_tank01',
+           'SLOT_ELIGIBILITY']
+
+# Positions each Sleeper roster slot accepts
+SLOT_ELIGIBILITY = {
+    'QB': ('QB',), 'RB': ('RB',), 'WR': ('WR',), 'TE': ('TE',), 'K': ('K',), 'DEF': ('DEF',),
+    'DL': ('DL',), 'LB': ('LB',), 'DB': ('DB',),
+    'FLEX': ('RB', 'WR', 'TE'),
+    'WRRB_FLEX': ('RB', 'WR'),
+    'REC_FLEX': ('WR', 'TE'),
+    'SUPER_FLEX': ('QB', 'RB', 'WR', 'TE'),
+    'IDP_FLEX': ('DL', 'LB', 'DB'),
+}
+
+# Slots that do not score
+BENCH_SLOTS = {'BN', 'IR', 'TAXI'}
+
+# Risk weights searched by the win-probability mode, in units of points per point of variance
+RISK_GRID = (-0.02, -0.01, -0.005, 0.0, 0.005, 0.01, 0.02, 0.04, 0.08)
+
+# Rosters evaluated together, bounding the (rosters x combinations x positions) gather
+CHUNK_ROSTERS = 20000
+
+
+def projections_from_tank01(response, crosswalk=None):
+    """
+    Reads rapid_API.get_fantasy_projections into a projection frame.
+
+    Parameters:
+        response (dict): The getNFLProjections response.
+        crosswalk (PlayerCrosswalk, optional): Used to translate Tank01 IDs to the Sleeper
+            IDs found on rosters.
+
+    Returns:
+        pandas.DataFrame: player_id, position and mean projected points; player_id holds
+        Sleeper IDs when a crosswalk is given and Tank01 IDs otherwise.
+    """
+    body = response.get('body', response) if isinstance(response, dict) else {}
+    projections = (body.get('playerProjections') or {}) if isinstance(body, dict) else {}
+    frame = pd.DataFrame({
+        'player_id': list(projections),
+        'position': [projection.get('pos') for projection in projections.values()],
+        'mean': pd.to_numeric(pd.Series([projection.get('fantasyPoints') for projection in projections.values()],
+                                        dtype=object), errors='coerce'),
+    })
+    if crosswalk is not None:
+        frame['player_id'] = crosswalk.lookup(frame['player_id'], 'tank01_id')
+        frame = frame.dropna(subset=['player_id'])
+    return frame
+
+
+def roster_player_frame(rosters, projections):
+    """
+    Lists each roster's players with their projections.
+
+    Parameters:
+        rosters (pandas.DataFrame): league_id, roster_id and players (list of Sleeper IDs),
+            e.g. data_collection.read_harvest('rosters').
+        projections (pandas.DataFrame): player_id, position, mean and optionally sd.
+
+    Returns:
+        pandas.DataFrame: One row per rostered player with a projection.
+    """
+    players = rosters[['league_id', 'roster_id', 'players']].explode('players').rename(columns={'players': 'player_id'})
+    return players.dropna(subset=['player_id']).merge(projections, on='player_id')
+
+
+class LineupOptimizer:
+    """
+    Exact, batched lineup solver for one roster slot structure.
+
+    For any slot structure the best lineup starts, at each position, that position's
+    top-scoring players: swapping a starter for a better benched player of the same
+    position is always allowed. A lineup is therefore determined by how many players of
+    each position start. The feasible counts are enumerated once per structure by
+    assigning positions to the flex slots, and every roster is scored against every
+    feasible count with prefix sums of its sorted players, as one NumPy gather. The
+    result is exact for any mix of FLEX, WRRB_FLEX, REC_FLEX, SUPER_FLEX and IDP_FLEX
+    slots, with no LP solver.
+
+    Parameters:
+        roster_positions (list): The league's roster_positions, e.g. ['QB', 'RB', 'RB',
+            'WR', 'WR', 'TE', 'FLEX', 'SUPER_FLEX', 'BN', 'BN'].
+    """
+
+    def __init__(self, roster_positions):
+        self.slots = [slot for slot in roster_positions if slot not in BENCH_SLOTS and slot in SLOT_ELIGIBILITY]
+        fixed = [i for i, slot in enumerate(self.slots) if len(SLOT_ELIGIBILITY[slot]) == 1]
+        flex = [i for i, slot in enumerate(self.slots) if len(SLOT_ELIGIBILITY[slot]) > 1]
+        self.positions = sorted({position for slot in self.slots for position in SLOT_ELIGIBILITY[slot]})
+        position_index = {position: p for p, position in enumerate(self.positions)}
+        n_positions = len(self.positions)
+
+        self.required = np.zeros(n_positions, dtype=np.int64)
+        fixed_slots = [[] for _ in self.positions]
+        for i in fixed:
+            p = position_index[SLOT_ELIGIBILITY[self.slots[i]][0]]
+            self.required[p] += 1
+            fixed_slots[p].append(i)
+
+        # Every distinct count of extra starters per position the flex slots can hold, with one slot assignment each
+        combinations = {}
+        for assignment in product(*[SLOT_ELIGIBILITY[self.slots[i]] for i in flex]):
+            extra = np.zeros(n_positions, dtype=np.int64)
+            for position in assignment:
+                extra[position_index[position]] += 1
+            combinations.setdefault(tuple(extra), assignment)
+        self.extras = np.array(list(combinations), dtype=np.int64).reshape(-1, n_positions)
+        self.depth = int((self.required + self.extras.max(axis=0)).max()) if n_positions else 0
+
+        # slot_table[combination, position, k]: slot filled by the position's k-th best starter
+        self.slot_table = np.full((len(self.extras), n_positions, max(self.depth, 1)), -1, dtype=np.int64)
+        for c, assignment in enumerate(combinations.values()):
+            for p in range(n_positions):
+                slots = fixed_slots[p] + [i for i, position in zip(flex, assignment) if position_index[position] == p]
+                self.slot_table[c, p, :len(slots)] = slots
+
+    def _rank(self, roster, position, value):
+        # Order each roster's players by value within position and keep the ones that could start
+        order = np.lexsort((-value, position, roster))
+        group = roster[order] * len(self.positions) + position[order]
+        first = np.r_[True, group[1:] != group[:-1]]
+        starts = np.flatnonzero(first)
+        rank = np.arange(len(order)) - np.repeat(starts, np.diff(np.r_[starts, len(order)]))
+        keep = rank < self.depth
+        return order[keep], rank[keep]
+
+    def _prefix_sums(self, roster, position, rank, values, n_rosters):
+        table = np.zeros((n_rosters, len(self.positions), self.depth + 1))
+        table[roster, position, rank + 1] = values
+        return np.cumsum(table, axis=2)
+
+    def _best(self, value_sums):
+        # Best feasible count combination per roster, evaluated in chunks of rosters
+        counts = self.required + self.extras
+        positions = np.arange(len(self.positions))
+        best = np.empty(len(value_sums), dtype=np.int64)
+        for start in range(0, len(value_sums), CHUNK_ROSTERS):
+            chunk = value_sums[start:start + CHUNK_ROSTERS]
+            best[start:start + CHUNK_ROSTERS] = chunk[:, positions, counts].sum(axis=2).argmax(axis=1)
+        return best
+
+    def _totals(self, sums, best):
+        counts = self.required + self.extras[best]
+        return np.take_along_axis(sums, counts[:, :, None], axis=2)[:, :, 0].sum(axis=1)
+
+    def optimize(self, players, risk=0.0, opponents=None):
+        """
+        Picks the starting lineup of every roster.
+
+        Parameters:
+            players (pandas.DataFrame): league_id, roster_id, player_id, position, mean and
+                optionally sd of projected points, e.g. from roster_player_frame.
+            risk (float): Points added per standard deviation of a player's projection;
+                positive values favor boom-or-bust players, as an underdog would.
+                - Defaults to 0.0, maximizing expected points.
+            opponents (pandas.DataFrame, optional): league_id, roster_id, opponent_mean and
+                opponent_sd. When given, each lineup maximizes the probability of
+                outscoring the opponent: lineups maximizing mean + w * variance are
+                solved exactly for every w in RISK_GRID and the best is kept. Rosters
+                without an opponent_mean are solved with risk as above.
+
+        Returns:
+            pandas.DataFrame: The starters with league_id, roster_id, slot, player_id,
+            position, mean and sd, in roster slot order.
+        """
+        players = players[players['position'].isin(self.positions)].reset_index(drop=True)
+        players['sd'] = players['sd'].fillna(0) if 'sd' in players else 0.0
+        roster = pd.factorize(pd.MultiIndex.from_frame(players[['league_id', 'roster_id']]))[0]
+        keys = players[['league_id', 'roster_id']].drop_duplicates()
+        position = pd.Index(self.positions).get_indexer(players['position'])
+        mean = players['mean'].fillna(0).to_numpy(dtype=np.float64)
+        variance = players['sd'].to_numpy(dtype=np.float64) ** 2
+        n_rosters = len(keys)
+
+        # Expected points, shifted by risk standard deviations
+        rows, rank = self._rank(roster, position, mean + risk * np.sqrt(variance))
+        value = mean[rows] + risk * np.sqrt(variance[rows])
+        best = self._best(self._prefix_sums(roster[rows], position[rows], rank, value, n_rosters))
+
+        if opponents is not None:
+            opponent = keys.merge(opponents, on=['league_id', 'roster_id'], how='left')
+            # Rosters without an opponent keep the risk objective above
+            has_opponent = opponent['opponent_mean'].notna().to_numpy()
+            opponent_mean = opponent['opponent_mean'].to_numpy(dtype=np.float64, na_value=0)
+            opponent_variance = opponent['opponent_sd'].to_numpy(dtype=np.float64, na_value=0) ** 2
+            # The win probability is Phi(margin / spread), so lineups are compared on the z-score
+            candidates = [(rows, rank)]
+            best_score = np.full(n_rosters, -np.inf)
+            best_candidate = np.zeros(n_rosters, dtype=np.int64)
+            for weight in RISK_GRID:
+                candidate_rows, candidate_rank = self._rank(roster, position, mean + weight * variance)
+                candidates.append((candidate_rows, candidate_rank))
+                cells = roster[candidate_rows], position[candidate_rows], candidate_rank
+                choice = self._best(self._prefix_sums(*cells, mean[candidate_rows] + weight * variance[candidate_rows],
+                                                      n_rosters))
+                margin = self._totals(self._prefix_sums(*cells, mean[candidate_rows], n_rosters), choice) - opponent_mean
+                spread = np.sqrt(self._totals(self._prefix_sums(*cells, variance[candidate_rows], n_rosters), choice) +
+                                 opponent_variance)
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    score = np.select([spread > 0, margin > 0, margin < 0], [margin / spread, np.inf, -np.inf], 0.0)
+                improved = has_opponent & ((score > best_score) | (best_candidate == 0))
+                best = np.where(improved, choice, best)
+                best_score = np.where(improved, score, best_score)
+                best_candidate = np.where(improved, len(candidates) - 1, best_candidate)
+            # Each roster keeps the ranking of its chosen candidate
+            chosen = [best_candidate[roster[rows]] == c for c, (rows, _) in enumerate(candidates)]
+            rows = np.concatenate([rows[keep] for (rows, _), keep in zip(candidates, chosen)])
+            rank = np.concatenate([rank[keep] for (_, rank), keep in zip(candidates, chosen)])
+
+        counts = self.required + self.extras[best]
+        starting = rank < counts[roster[rows], position[rows]]
+        rows, rank = rows[starting], rank[starting]
+        slot = self.slot_table[best[roster[rows]], position[rows], rank]
+        lineup = players.iloc[rows].assign(slot=np.asarray(self.slots, dtype=object)[slot])
+        lineup = lineup.iloc[np.lexsort((slot, roster[rows]))]
+        return lineup[['league_id', 'roster_id', 'slot', 'player_id', 'position', 'mean', 'sd']].reset_index(drop=True)
+
+
+def optimize_lineups(players, roster_positions, risk=0.0, opponents=None):
+    """
+    Picks the starting lineup of every roster across many leagues in one call.
+
+    Leagues sharing a slot structure are solved together by one LineupOptimizer.
+
+    Parameters:
+        players (pandas.DataFrame): league_id, roster_id, player_id, position, mean and
+            optionally sd, e.g. from roster_player_frame.
+        roster_positions (dict or pandas.Series): league_id -> the league's roster_positions.
+        risk (float): See LineupOptimizer.optimize.
+            - Defaults to 0.0.
+        opponents (pandas.DataFrame, optional): See LineupOptimizer.optimize.
+
+    Returns:
+        pandas.DataFrame: The starters of every roster, see LineupOptimizer.optimize.
+    """
+    structures = pd.Series(roster_positions).map(tuple)
+    lineups = []
+    for structure, league_ids in structures.groupby(structures).groups.items():
+        league_players = players[players['league_id'].isin(league_ids)]
+        if len(league_players):
+            lineups.append(LineupOptimizer(list(structure)).optimize(league_players, risk, opponents))
+    if not lineups:
+        return pd.DataFrame(columns=['league_id', 'roster_id', 'slot', 'player_id', 'position', 'mean', 'sd'])
+    return pd.concat(lineups, ignore_index=True)
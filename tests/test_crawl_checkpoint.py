@@ -0,0 +1,59 @@
+import os
+from data_storage.crawl_checkpoint import CrawlCheckpoint
+from data_storage.crawl_frontier import CrawlFrontier
+from data_storage.league_store import LeagueRecordBuffer
+
+
+def crawl_cycle(frontier, league_store, user_id, league_ids, new_users):
+    frontier.pop_users(1)
+    frontier.push_leagues([{'league_id': league_id} for league_id in league_ids])
+    for _, league in frontier.pop_leagues(len(league_ids)):
+        league_store.append(league)
+    frontier.push_users(new_users)
+    league_store.flush()
+
+
+def assert_same_state(frontier, restored):
+    assert list(restored.user_queue) == list(frontier.user_queue)
+    assert restored.seen_users.to_array().tolist() == frontier.seen_users.to_array().tolist()
+    assert restored.league_index.to_array().tolist() == frontier.league_index.to_array().tolist()
+    assert restored.league_queue == frontier.league_queue
+    assert restored.users_queried_count == frontier.users_queried_count
+
+
+def test_log_replay_and_compaction_restore_the_frontier(tmp_path):
+    league_store = LeagueRecordBuffer(str(tmp_path / 'sleeper_leagues'))
+    frontier = CrawlFrontier(['1'], ['1'])
+    checkpoint = CrawlCheckpoint(str(tmp_path), compact_every=3)
+    checkpoint.compact(frontier, [])
+
+    for cycle in range(5):
+        crawl_cycle(frontier, league_store, str(cycle + 1), [str(100 + cycle)], [str(cycle + 2), '1'])
+        checkpoint.save(league_store, frontier)
+        checkpoint.maybe_compact(frontier)
+        restored, league_parts = CrawlCheckpoint(str(tmp_path)).load()
+        assert_same_state(frontier, restored)
+        assert league_parts == {os.path.basename(path) for path in league_store.part_files()}
+    assert len(list(tmp_path.glob('crawl_snapshot_*.npy'))) == 2
+
+
+def test_torn_log_record_rolls_back_to_the_previous_save(tmp_path):
+    league_store = LeagueRecordBuffer(str(tmp_path / 'sleeper_leagues'))
+    frontier = CrawlFrontier(['1'], ['1'])
+    checkpoint = CrawlCheckpoint(str(tmp_path))
+    checkpoint.compact(frontier, [])
+    crawl_cycle(frontier, league_store, '1', ['100'], ['2'])
+    checkpoint.save(league_store, frontier)
+    expected, expected_parts = CrawlCheckpoint(str(tmp_path)).load()
+
+    crawl_cycle(frontier, league_store, '2', ['101'], ['3'])
+    checkpoint.save(league_store, frontier)
+    with open(checkpoint.log_file, 'r+b') as f:
+        f.truncate(os.path.getsize(checkpoint.log_file) - 5)
+
+    restored, league_parts = CrawlCheckpoint(str(tmp_path)).load()
+    assert_same_state(expected, restored)
+    assert league_parts == expected_parts
+    # The uncommitted part is then discarded so its leagues are not stored twice
+    assert league_store.discard_uncommitted(league_parts) == 1
+    assert league_store.read()['league_id'].tolist() == [100]
@@ -0,0 +1,30 @@
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data_collection'))
+compile_sleeper_league_IDs = pytest.importorskip('compile_sleeper_league_IDs')
+from data_storage.crawl_coordinator import CrawlCoordinator
+from data_storage.league_store import LeagueRecordBuffer
+
+
+def test_crawl_shard_skips_ids_without_a_response(tmp_path, monkeypatch):
+    sleeper = compile_sleeper_league_IDs.sleeper
+    # League 2 and user 11 get no response, as call_API returns on a 404 or once its retries run out
+    users = {'1': [{'user_id': '10'}, {'user_id': '11'}], '3': [{'user_id': '12'}]}
+    leagues = {'10': [{'league_id': '3'}], '12': []}
+    monkeypatch.setattr(sleeper, 'get_league_users', lambda league_id, ttl=None: users.get(league_id))
+    monkeypatch.setattr(sleeper, 'get_user_leagues', lambda user_id, ttl=None: leagues.get(user_id))
+    monkeypatch.setattr(sleeper, 'configure_session', lambda pool_size: None)
+
+    coordinator_path = str(tmp_path / 'coordinator.sqlite')
+    coordinator = CrawlCoordinator(coordinator_path, 1)
+    coordinator.seed([{'league_id': '1'}, {'league_id': '2'}])
+    compile_sleeper_league_IDs.crawl_shard(0, 1, coordinator_path, str(tmp_path / 'leagues'), workers=2, idle_wait=0)
+
+    progress = coordinator.progress()[0]
+    assert coordinator.is_finished()
+    assert progress['users_queried'] == 3
+    stored = LeagueRecordBuffer(str(tmp_path / 'leagues')).read(columns=['league_id'])
+    assert sorted(stored['league_id']) == [1, 2, 3]
+    coordinator.close()
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+from ml_models.draft_simulator import DraftSimulator, snake_picks
+
+
+def players(n=60):
+    return pd.DataFrame({'player_id': [f'p{i}' for i in range(n)], 'adp': np.arange(1, n + 1, dtype=float)})
+
+
+def test_snake_picks():
+    assert snake_picks(1, teams=12, rounds=3).tolist() == [1, 24, 25]
+    assert snake_picks(12, teams=12, rounds=3).tolist() == [12, 13, 36]
+
+
+def test_drafts_follow_adp_without_noise():
+    simulator = DraftSimulator(players(), spread=0.0, min_stdev=1e-6)
+    result = simulator.simulate([5, 20], n_sims=200, seed=0)
+    assert np.allclose(result['expected_pick'], np.arange(1, 61))
+    # Player i (0-based) is available at pick n exactly when i >= n - 1
+    assert result['pick_5'].tolist() == [0.0] * 4 + [1.0] * 56
+    assert result['pick_20'].tolist() == [0.0] * 19 + [1.0] * 41
+
+
+def test_availability_matches_a_direct_simulation():
+    simulator = DraftSimulator(players(), spread=0.3, min_stdev=1.0)
+    result = simulator.simulate([8], n_sims=20000, seed=1, chunk_size=4000)
+    rng = np.random.default_rng(2)
+    boards = simulator.adp + simulator.stdev * rng.standard_normal((20000, 60))
+    ranks = np.argsort(np.argsort(boards, axis=1), axis=1)
+    assert np.abs(result['pick_8'].to_numpy() - (ranks >= 7).mean(axis=0)).max() < 0.02
+    assert np.abs(result['expected_pick'].to_numpy() - (ranks.mean(axis=0) + 1)).max() < 0.5
+
+
+def test_live_draft_skips_taken_players_and_past_picks():
+    simulator = DraftSimulator(players(), spread=0.0, min_stdev=1e-6)
+    result = simulator.simulate([5, 20], n_sims=50, taken=['p0', 'p1', 'p2'], current_pick=10, seed=0)
+    assert 'p0' not in result['player_id'].tolist()
+    assert [column for column in result.columns if column.startswith('pick_')] == ['pick_20']
+    assert result['expected_pick'].iloc[0] == 10
+
+
+def test_no_remaining_picks_or_simulations():
+    simulator = DraftSimulator(players())
+    result = simulator.simulate([5], n_sims=100, current_pick=30, seed=0)
+    assert len(result) == 60 and not [column for column in result.columns if column.startswith('pick_')]
+    assert result['expected_pick'].notna().all()
+    assert not [c for c in simulator.simulate([], n_sims=100).columns if c.startswith('pick_')]
+    assert simulator.simulate([5], n_sims=0)['expected_pick'].isna().all()
+    # Picks beyond the remaining players leave everyone drafted
+    assert (simulator.simulate([100], n_sims=10, seed=0)['pick_100'] == 0).all()
@@ -0,0 +1,37 @@
+import numpy as np
+from data_storage.id_set import Int64HashSet
+
+
+def test_matches_a_python_set():
+    rng = np.random.default_rng(0)
+    ids = rng.integers(0, 2 ** 62, 5000)
+    id_set = Int64HashSet(ids[:1000], capacity=16)
+    expected = set(ids[:1000].tolist())
+    for key in ids[1000:3000]:
+        assert id_set.add(key) == (int(key) not in expected)
+        expected.add(int(key))
+    new_keys = id_set.update(ids[2000:])
+    assert set(new_keys.tolist()) == set(ids[2000:].tolist()) - expected
+    expected.update(ids[2000:].tolist())
+
+    assert len(id_set) == len(expected)
+    assert id_set.to_array().tolist() == sorted(expected)
+    probes = np.concatenate([ids, rng.integers(0, 2 ** 62, 5000)])
+    assert id_set.contains_many(probes).tolist() == [int(key) in expected for key in probes]
+    assert all((int(key) in id_set) == (int(key) in expected) for key in probes[::50])
+
+
+def test_accepts_string_ids():
+    id_set = Int64HashSet(['1095093570517798912', '42'])
+    assert '42' in id_set and 42 in id_set
+    assert not id_set.add('42')
+    assert id_set.update(['42', '7']).tolist() == [7]
+    assert list(id_set) == [7, 42, 1095093570517798912]
+
+
+def test_empty_set():
+    id_set = Int64HashSet()
+    assert len(id_set) == 0
+    assert 0 not in id_set
+    assert id_set.contains_many([]).tolist() == []
+    assert id_set.to_array().dtype == np.int64
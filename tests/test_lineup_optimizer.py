@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+import pytest
+from ml_models.lineup_optimizer import LineupOptimizer, optimize_lineups, SLOT_ELIGIBILITY
+
+STRUCTURES = [
+    ['QB', 'RB', 'RB', 'WR', 'WR', 'TE', 'FLEX', 'SUPER_FLEX', 'BN', 'BN'],
+    ['QB', 'RB', 'WR', 'WRRB_FLEX', 'REC_FLEX', 'K', 'DEF', 'BN', 'IR'],
+    ['SUPER_FLEX', 'SUPER_FLEX', 'FLEX', 'TE', 'TAXI'],
+]
+
+
+def random_players(n_leagues, teams, roster_size, seed=0):
+    rng = np.random.default_rng(seed)
+    rows = []
+    for league in range(n_leagues):
+        for roster in range(teams):
+            positions = rng.choice(['QB', 'RB', 'WR', 'TE', 'K', 'DEF'], roster_size, p=[.15, .3, .3, .1, .075, .075])
+            for i, position in enumerate(positions):
+                rows.append((f'L{league}', roster, f'{league}-{roster}-{i}', position, rng.gamma(2, 5), rng.uniform(1, 8)))
+    return pd.DataFrame(rows, columns=['league_id', 'roster_id', 'player_id', 'position', 'mean', 'sd'])
+
+
+def brute_force(players, roster_positions, value):
+    # Best total over every assignment of players to the scoring slots, slots may stay empty
+    slots = [slot for slot in roster_positions if slot in SLOT_ELIGIBILITY]
+    candidates = list(zip(players['position'], value))
+
+    def best(i, used):
+        if i == len(slots):
+            return 0.0
+        total = best(i + 1, used)
+        for j, (position, points) in enumerate(candidates):
+            if j not in used and position in SLOT_ELIGIBILITY[slots[i]]:
+                total = max(total, points + best(i + 1, used | {j}))
+        return total
+    return best(0, frozenset())
+
+
+@pytest.fixture
+def league_players():
+    return random_players(6, 3, 9), {f'L{league}': STRUCTURES[league % 3] for league in range(6)}
+
+
+@pytest.mark.parametrize('risk', [0.0, 1.0])
+def test_matches_brute_force(league_players, risk):
+    players, roster_positions = league_players
+    lineups = optimize_lineups(players, roster_positions, risk=risk)
+    for (league_id, roster_id), roster in players.groupby(['league_id', 'roster_id']):
+        lineup = lineups[(lineups['league_id'] == league_id) & (lineups['roster_id'] == roster_id)]
+        assert lineup['player_id'].is_unique
+        assert all(position in SLOT_ELIGIBILITY[slot] for slot, position in zip(lineup['slot'], lineup['position']))
+        expected = brute_force(roster, roster_positions[league_id], roster['mean'] + risk * roster['sd'])
+        assert (lineup['mean'] + risk * lineup['sd']).sum() == pytest.approx(expected)
+
+
+def win_scores(lineups, opponents):
+    totals = lineups.groupby(['league_id', 'roster_id']).agg(
+        mean=('mean', 'sum'), variance=('sd', lambda sd: (sd ** 2).sum())).reset_index().merge(opponents)
+    return (totals['mean'] - totals['opponent_mean']) / np.sqrt(totals['variance'] + totals['opponent_sd'] ** 2)
+
+
+def test_underdogs_improve_their_win_probability(league_players):
+    players, roster_positions = league_players
+    opponents = players.groupby(['league_id', 'roster_id'])['mean'].sum().rename('opponent_mean').reset_index()
+    opponents['opponent_mean'] *= 0.9
+    opponents['opponent_sd'] = 15.0
+    expected_points = optimize_lineups(players, roster_positions)
+    win_probability = optimize_lineups(players, roster_positions, opponents=opponents)
+    improvement = win_scores(win_probability, opponents) - win_scores(expected_points, opponents)
+    assert (improvement >= -1e-12).all() and improvement.max() > 0
+
+
+def test_rosters_without_opponents_use_the_risk_objective(league_players):
+    players, roster_positions = league_players
+    opponents = pd.DataFrame({'league_id': ['L0'], 'roster_id': [0], 'opponent_mean': [500.0], 'opponent_sd': [1.0]})
+    lineups = optimize_lineups(players, roster_positions, risk=0.5, opponents=opponents)
+    expected = optimize_lineups(players, roster_positions, risk=0.5)
+    others = lambda frame: frame[(frame['league_id'] != 'L0') | (frame['roster_id'] != 0)].reset_index(drop=True)
+    pd.testing.assert_frame_equal(others(lineups), others(expected))
+
+
+def test_empty_slots_when_the_roster_is_short():
+    players = pd.DataFrame({'league_id': ['L0'] * 2, 'roster_id': [1, 1], 'player_id': ['a', 'b'],
+                            'position': ['RB', 'RB'], 'mean': [10.0, 5.0]})
+    lineup = LineupOptimizer(['QB', 'RB', 'FLEX', 'BN']).optimize(players)
+    assert lineup[['slot', 'player_id']].values.tolist() == [['RB', 'a'], ['FLEX', 'b']]
@@ -0,0 +1,34 @@
+from data_storage.player_crosswalk import PlayerCrosswalk, normalize_player_names
+
+
+def players():
+    return {'1': {'player_id': '1', 'full_name': 'D.J. Moore', 'position': 'WR', 'team': 'CHI', 'active': True, 'espn_id': 4035538.0},
+            '2': {'player_id': '2', 'full_name': 'Patrick Mahomes II', 'position': 'QB', 'team': 'KC', 'active': False}}
+
+
+def test_normalize_player_names():
+    assert normalize_player_names(['D.J. Moore', 'Patrick Mahomes II', None]).tolist()[:2] == ['dj moore', 'patrick mahomes']
+
+
+def test_refresh_only_rewrites_new_and_changed_players(tmp_path):
+    path = str(tmp_path / 'crosswalk.parquet')
+    crosswalk = PlayerCrosswalk(path)
+    assert crosswalk.refresh(players()) == {'added': 2, 'updated': 0, 'unchanged': 0}
+    crosswalk.save()
+
+    # A player without 'active' must not change the hashes of the others
+    incoming = players()
+    incoming['3'] = {'player_id': '3', 'full_name': 'Rookie Player', 'position': 'RB'}
+    crosswalk = PlayerCrosswalk(path)
+    assert crosswalk.refresh(incoming) == {'added': 1, 'updated': 0, 'unchanged': 2}
+
+    incoming['2']['team'] = 'LV'
+    assert crosswalk.refresh(incoming) == {'added': 0, 'updated': 1, 'unchanged': 2}
+    assert len(crosswalk) == 3
+
+
+def test_lookup_and_match_names(tmp_path):
+    crosswalk = PlayerCrosswalk(str(tmp_path / 'crosswalk.parquet'))
+    crosswalk.refresh(players())
+    assert crosswalk.lookup(['4035538', '999']).tolist()[0] == '1'
+    assert crosswalk.match_names(['DJ Moore', 'Patrick Mahomes']).tolist() == ['1', '2']
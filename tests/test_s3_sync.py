@@ -0,0 +1,160 @@
+import os
+import sys
+import sqlite3
+from concurrent.futures import Future
+import boto3
+import pytest
+from moto import mock_aws
+from data_storage.s3_sync import S3Sync, local_etag
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data_collection'))
+
+BUCKET = 'test-bucket'
+CHUNK = 5 * 1024 * 1024
+
+
+@pytest.fixture
+def s3():
+    with mock_aws():
+        client = boto3.client('s3', region_name='us-east-1')
+        client.create_bucket(Bucket=BUCKET)
+        yield client
+
+
+def write(directory, relative_path, content):
+    path = os.path.join(directory, relative_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(content)
+    return path
+
+
+def keys(s3, prefix=''):
+    paginator = s3.get_paginator('list_objects_v2')
+    return {obj['Key'] for page in paginator.paginate(Bucket=BUCKET, Prefix=prefix) for obj in page.get('Contents', [])}
+
+
+def test_upload_sends_only_changed_files(s3, tmp_path):
+    write(tmp_path, 'a.parquet', b'a')
+    write(tmp_path, 'nested/b.parquet', b'b')
+    write(tmp_path, 'c.tmp', b'partial')
+    sync = S3Sync(s3, BUCKET, 'leagues', str(tmp_path))
+    assert sync.upload() == 2
+    assert keys(s3) == {'leagues/a.parquet', 'leagues/nested/b.parquet'}
+
+    assert sync.upload() == 0
+    write(tmp_path, 'a.parquet', b'changed')
+    assert sync.upload() == 1
+    assert s3.get_object(Bucket=BUCKET, Key='leagues/a.parquet')['Body'].read() == b'changed'
+
+    # A new instance reads the manifest and finds nothing to send
+    assert S3Sync(s3, BUCKET, 'leagues', str(tmp_path)).upload() == 0
+
+
+def test_multipart_etag_skips_unchanged_download(s3, tmp_path):
+    source = tmp_path / 'source'
+    content = os.urandom(2 * CHUNK + 123)
+    path = write(source, 'big.parquet', content)
+    S3Sync(s3, BUCKET, 'leagues', str(source), multipart_chunksize=CHUNK).upload()
+    etag = s3.head_object(Bucket=BUCKET, Key='leagues/big.parquet')['ETag'].strip('"')
+    assert etag.endswith('-3')
+    assert local_etag(path, CHUNK) == etag
+
+    # A copy made elsewhere, with no manifest, is matched by ETag and neither uploaded nor downloaded
+    copy = tmp_path / 'copy'
+    write(copy, 'big.parquet', content)
+    assert S3Sync(s3, BUCKET, 'leagues', str(copy), multipart_chunksize=CHUNK).upload() == 0
+    assert S3Sync(s3, BUCKET, 'leagues', str(copy), multipart_chunksize=CHUNK).download() == 0
+
+
+def test_listing_and_download_follow_pagination(s3, tmp_path):
+    source = tmp_path / 'source'
+    for i in range(1205):
+        write(source, f'parts/part-{i:06d}.parquet', str(i).encode())
+    sync = S3Sync(s3, BUCKET, 'leagues', str(source), max_workers=16)
+    assert sync.upload() == 1205
+    assert len(sync.list_objects()) == 1205
+
+    target = tmp_path / 'target'
+    assert S3Sync(s3, BUCKET, 'leagues', str(target), max_workers=16).download() == 1205
+    with open(target / 'parts' / 'part-001204.parquet', 'rb') as f:
+        assert f.read() == b'1204'
+    assert S3Sync(s3, BUCKET, 'leagues', str(target)).download() == 0
+
+
+def test_sqlite_databases_are_uploaded_as_consistent_copies(s3, tmp_path):
+    source = tmp_path / 'source'
+    os.makedirs(source)
+    connection = sqlite3.connect(source / 'crawl_frontier.sqlite')
+    connection.execute('PRAGMA journal_mode=WAL')
+    connection.execute('CREATE TABLE users (user_id INTEGER PRIMARY KEY)')
+    connection.executemany('INSERT INTO users VALUES (?)', [(i,) for i in range(100)])
+    connection.commit()
+    # An open transaction must not reach the bucket
+    connection.execute('INSERT INTO users VALUES (1000)')
+    assert os.path.exists(source / 'crawl_frontier.sqlite-wal')
+
+    sync = S3Sync(s3, BUCKET, 'leagues', str(source))
+    sync.upload_in_background().result()
+    assert keys(s3) == {'leagues/crawl_frontier.sqlite'}
+
+    target = tmp_path / 'target'
+    S3Sync(s3, BUCKET, 'leagues', str(target)).download()
+    restored = sqlite3.connect(target / 'crawl_frontier.sqlite')
+    assert restored.execute('SELECT COUNT(*) FROM users').fetchone()[0] == 100
+    restored.close()
+
+    # Commits that only reached the write-ahead log are detected as changes
+    connection.commit()
+    assert sync.upload() == 1
+    connection.close()
+
+
+def test_checkpoints_wait_for_the_data_they_reference(s3, tmp_path):
+    write(tmp_path, 'sleeper_leagues/part-000000.parquet', b'leagues')
+    write(tmp_path, 'crawl_snapshot.json', b'{"parts": ["part-000000.parquet"]}')
+    sync = S3Sync(s3, BUCKET, 'leagues', str(tmp_path))
+    uploads = []
+    upload_file = sync._upload_file
+
+    def failing_upload(staging, relative_path):
+        uploads.append(relative_path)
+        if relative_path.endswith('.parquet'):
+            raise OSError('connection reset')
+        upload_file(staging, relative_path)
+
+    sync._upload_file = failing_upload
+    assert sync.upload() == 0
+    assert uploads == [os.path.join('sleeper_leagues', 'part-000000.parquet')]
+    assert keys(s3) == set()
+
+    sync._upload_file = upload_file
+    assert sync.upload() == 2
+    assert keys(s3) == {'leagues/sleeper_leagues/part-000000.parquet', 'leagues/crawl_snapshot.json'}
+
+
+class FailingSync:
+    # Fails to start the first pass, then starts passes that fail in the background
+    def __init__(self):
+        self.calls = 0
+
+    def upload_in_background(self):
+        self.calls += 1
+        if self.calls == 1:
+            raise OSError('Unable to locate credentials')
+        future = Future()
+        future.set_exception(OSError('connection reset'))
+        return future
+
+
+def test_crawl_upload_errors_do_not_stop_the_crawl(capsys):
+    compile_sleeper_league_IDs = pytest.importorskip('compile_sleeper_league_IDs')
+    sync, uploads = FailingSync(), []
+    compile_sleeper_league_IDs.upload_to_s3_in_background(sync, uploads)
+    assert uploads == []
+    compile_sleeper_league_IDs.upload_to_s3_in_background(sync, uploads)
+    compile_sleeper_league_IDs.upload_to_s3_in_background(sync, uploads)
+    # The failed pass is reported once, on the cycle after it finished
+    assert len(uploads) == 1
+    output = capsys.readouterr().out
+    assert 'Unable to locate credentials' in output and output.count('connection reset') == 1
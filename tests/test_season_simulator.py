@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+from league_analysis.season_simulator import build_season_inputs, simulate_seasons, bracket_order
+
+
+def league_input(league_id, means, wins, weeks, playoff_teams=6, median_match=False, sd=10.0):
+    n = len(means)
+    # Team i plays team i + n / 2 every week
+    schedule = np.tile(np.roll(np.arange(n), n // 2), (weeks, 1))
+    return {'league_id': league_id, 'roster_ids': np.arange(1, n + 1), 'mean': np.float32(means),
+            'sd': np.full(n, sd, np.float32), 'wins': np.float32(wins), 'points': np.zeros(n, np.float32),
+            'schedule': schedule, 'playoff_teams': playoff_teams, 'median_match': median_match}
+
+
+def test_bracket_order():
+    assert bracket_order(8).tolist() == [1, 8, 4, 5, 2, 7, 3, 6]
+    assert bracket_order(1).tolist() == [1]
+
+
+def test_odds_are_consistent_across_batches():
+    inputs = [league_input('a', np.linspace(90, 130, 12), np.zeros(12), weeks=4),
+              league_input('b', np.linspace(100, 110, 10), np.arange(10), weeks=3, playoff_teams=4, median_match=True),
+              league_input('c', np.full(8, 100.0), np.zeros(8), weeks=0, playoff_teams=6)]
+    # A small batch limit splits the leagues into separate batches
+    results = simulate_seasons(inputs, n_sims=2000, seed=0, max_batch_cells=12 * 2000 * 4)
+    for league_id, teams, weeks, playoff_teams, byes, median in [('a', 12, 4, 6, 2, False), ('b', 10, 3, 4, 0, True),
+                                                                 ('c', 8, 0, 6, 2, False)]:
+        league = results[results['league_id'] == league_id]
+        assert len(league) == teams
+        assert league['playoff_odds'].sum() == pytest.approx(playoff_teams)
+        assert league['bye_odds'].sum() == pytest.approx(byes)
+        assert league['title_odds'].sum() == pytest.approx(1)
+        assert league['mean_seed'].sum() == pytest.approx(teams * (teams + 1) / 2)
+        # Every head-to-head week hands out teams / 2 wins, plus half the league beats the median
+        current_wins = next(item for item in inputs if item['league_id'] == league_id)['wins'].sum()
+        assert league['mean_wins'].sum() == pytest.approx(current_wins + weeks * teams / 2 * (2 if median else 1))
+
+
+def test_stronger_teams_have_better_odds():
+    inputs = [league_input('a', np.linspace(80, 140, 12), np.zeros(12), weeks=10)]
+    results = simulate_seasons(inputs, n_sims=4000, seed=1)
+    assert results['playoff_odds'].is_monotonic_increasing
+    assert results['title_odds'].iloc[-1] > results['title_odds'].iloc[0]
+    assert results['mean_seed'].is_monotonic_decreasing
+
+
+def test_reproducible_with_a_seed():
+    inputs = [league_input('a', np.linspace(90, 130, 12), np.zeros(12), weeks=4)]
+    pd.testing.assert_frame_equal(simulate_seasons(inputs, 500, seed=3), simulate_seasons(inputs, 500, seed=3))
+
+
+def test_build_season_inputs_uses_scheduled_matchups():
+    leagues = pd.DataFrame({'league_id': ['1'], 'playoff_teams': [2], 'playoff_week_start': [5],
+                            'league_average_match': [0], 'last_scored_leg': [2]})
+    weeks = [(week, roster, matchup) for week, pairs in [(1, [1, 1, 2, 2]), (2, [1, 2, 1, 2]), (3, [1, 2, 2, 1]),
+                                                         (4, [1, 1, 2, 2])] for roster, matchup in zip(range(1, 5), pairs)]
+    matchups = pd.DataFrame(weeks, columns=['week', 'roster_id', 'matchup_id']).assign(league_id='1')
+    matchups['points'] = np.where(matchups['week'] <= 2, 100.0 + 10 * matchups['roster_id'], np.nan)
+    rosters = pd.DataFrame({'league_id': ['1'] * 4, 'roster_id': [1, 2, 3, 4], 'wins': [0, 1, 1, 2],
+                            'ties': [0, 0, 0, 0], 'fpts': [220.0, 240.0, 260.0, 280.0]})
+    league, = build_season_inputs(leagues, matchups, rosters)
+    assert league['schedule'].tolist() == [[3, 2, 1, 0], [1, 0, 3, 2]]
+    assert league['wins'].tolist() == [0, 1, 1, 2]
+    assert np.all(np.diff(league['mean']) > 0)
+    assert league['playoff_teams'] == 2 and not league['median_match']
@@ -0,0 +1,20 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+sleeper_adp = pytest.importorskip('data_analysis.sleeper_adp')
+
+
+def test_adp_skips_picks_without_a_player_or_draft():
+    drafts = pd.DataFrame({'draft_id': ['d1', 'd2'], 'season': [2025, 2025], 'type': ['snake', 'snake'],
+                           'teams': [12, 12], 'rounds': [15, 15], 'start_time': [0, 0], 'scoring': np.int8([2, 2]),
+                           'superflex': np.int8([0, 0]), 'league_type': np.int8([0, 0])})
+    picks = pd.DataFrame({'draft_id': ['d1', 'd1', 'd1', 'd2', 'd2', 'unknown'],
+                          'player_id': ['4034', '6794', None, '6794', '4034', '4034'],
+                          'pick_no': [1, 2, 3, 1, 2, 1], 'is_keeper': [False] * 6})
+    table = sleeper_adp.DraftPickTable(drafts, picks)
+    assert len(table) == 4
+    adp = table.adp().set_index('player_id')
+    assert adp.loc['4034', 'adp'] == pytest.approx(1.5)
+    assert adp.loc['6794', 'adp'] == pytest.approx(1.5)
+    assert adp['drafts'].tolist() == [2, 2]
@@ -0,0 +1,9 @@
+from .rate_limiter import *
+from .response_cache import *
+from .metrics import *
+
+__all__ = (
+    rate_limiter.__all__ +
+    response_cache.__all__ +
+    metrics.__all__
+)
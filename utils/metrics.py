@@ -0,0 +1,217 @@
+import os
+import bisect
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+__all__ = ['MetricsRegistry', 'Counter', 'Gauge', 'Histogram', 'registry', 'DEFAULT_BUCKETS']
+
+# Upper bounds in seconds, suited to HTTP request and checkpoint latencies
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help):
+        self.name = name
+        self.help = help
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _header(self):
+        return [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} {self.kind}']
+
+
+class Counter(_Metric):
+    """
+    Monotonically increasing count, optionally split by labels.
+    """
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        # Sum over the label sets that include the given labels, e.g. value(status=429) across endpoints
+        wanted = set(labels.items())
+        with self._lock:
+            return sum(value for key, value in self._values.items() if wanted.issubset(key))
+
+    def render(self):
+        with self._lock:
+            return self._header() + [f'{self.name}{_format_labels(key)} {_format_value(value)}'
+                                     for key, value in sorted(self._values.items())]
+
+
+class Gauge(_Metric):
+    """
+    Value that can go up and down, e.g. a queue depth.
+    """
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[_label_key(labels)] = value
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(_label_key(labels))
+
+    def render(self):
+        with self._lock:
+            return self._header() + [f'{self.name}{_format_labels(key)} {_format_value(value)}'
+                                     for key, value in sorted(self._values.items())]
+
+
+class Histogram(_Metric):
+    """
+    Distribution of observed values in cumulative buckets, plus their count and sum.
+
+    Parameters:
+        buckets (tuple): Increasing bucket upper bounds; +Inf is added automatically.
+    """
+    kind = 'histogram'
+
+    def __init__(self, name, help, buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {'counts': [0] * (len(self.buckets) + 1), 'sum': 0.0}
+            state['counts'][bisect.bisect_left(self.buckets, value)] += 1
+            state['sum'] += value
+
+    def count(self, **labels):
+        # Number of observations over the label sets that include the given labels
+        wanted = set(labels.items())
+        with self._lock:
+            return sum(sum(state['counts']) for key, state in self._values.items() if wanted.issubset(key))
+
+    def total(self, **labels):
+        # Sum of the observed values over the label sets that include the given labels
+        wanted = set(labels.items())
+        with self._lock:
+            return sum(state['sum'] for key, state in self._values.items() if wanted.issubset(key))
+
+    def render(self):
+        lines = self._header()
+        with self._lock:
+            for key, state in sorted(self._values.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float('inf'),), state['counts']):
+                    cumulative += count
+                    lines.append(f'{self.name}_bucket{_format_labels(key, [("le", _format_value(bound))])} {cumulative}')
+                lines.append(f'{self.name}_sum{_format_labels(key)} {_format_value(state["sum"])}')
+                lines.append(f'{self.name}_count{_format_labels(key)} {cumulative}')
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Collection of named metrics exported in the Prometheus text exposition format.
+
+    Metrics are created on first use and shared afterwards, so instrumented modules
+    can look them up by name without coordinating. The registry can be written to a
+    file (e.g. for node_exporter's textfile collector, or to read by hand) or served
+    over HTTP from a background thread.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}
+        self._server = None
+
+    def _get(self, metric_class, name, help, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = metric_class(name, help, **kwargs)
+            elif not isinstance(metric, metric_class):
+                raise ValueError(f'Metric {name} is already registered as a {metric.kind}')
+            return metric
+
+    def counter(self, name, help=''):
+        return self._get(Counter, name, help)
+
+    def gauge(self, name, help=''):
+        return self._get(Gauge, name, help)
+
+    def histogram(self, name, help='', buckets=DEFAULT_BUCKETS):
+        return self._get(Histogram, name, help, buckets=buckets)
+
+    def render(self):
+        # All metrics in the Prometheus text exposition format
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return '\n'.join(line for metric in metrics for line in metric.render()) + '\n'
+
+    def write(self, path):
+        """
+        Writes the metrics to a file, replacing it atomically so readers never see a
+        partial export.
+
+        Parameters:
+            path (str): Destination file, conventionally ending in .prom.
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = path + '.tmp'
+        with open(temp_path, 'w') as f:
+            f.write(self.render())
+        os.replace(temp_path, path)
+
+    def serve(self, port=9108, host='127.0.0.1'):
+        """
+        Serves the metrics at http://host:port/metrics from a daemon thread.
+
+        Returns:
+            ThreadingHTTPServer: The running server; call shutdown() to stop it.
+        """
+        if self._server is not None:
+            return self._server
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = registry.render().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=self._server.serve_forever, name='metrics-server', daemon=True).start()
+        return self._server
+
+
+# Process-wide registry used by the API clients and the crawler
+registry = MetricsRegistry()
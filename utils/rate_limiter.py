@@ -0,0 +1,60 @@
+import threading
+import time
+
+__all__ = ['TokenBucket']
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket shared by every worker calling a rate-limited API.
+
+    The bucket holds at most `burst` tokens and refills continuously. The refill rate is
+    `calls_per_minute - burst` per minute, so even a full burst followed by a minute of
+    steady calls never exceeds `calls_per_minute` within any 60 second window.
+
+    Parameters:
+        calls_per_minute (int): The per-minute call budget to enforce.
+        burst (int): Maximum number of calls that may be made back to back.
+            - Defaults to 10.
+    """
+
+    def __init__(self, calls_per_minute, burst=10):
+        self._lock = threading.Lock()
+        self.configure(calls_per_minute, burst)
+
+    def configure(self, calls_per_minute, burst=10):
+        with self._lock:
+            self.calls_per_minute = calls_per_minute
+            self.burst = max(1, min(burst, calls_per_minute // 2))
+            self.rate = (calls_per_minute - self.burst) / 60  # tokens per second
+            self.tokens = float(self.burst)
+            self.last_refill = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+
+    def acquire(self, tokens=1):
+        """
+        Blocks until `tokens` tokens are available, then consumes them.
+
+        Returns:
+            float: Seconds spent waiting for the bucket.
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return waited
+                wait_time = (tokens - self.tokens) / self.rate
+            time.sleep(wait_time)
+            waited += wait_time
+
+    def drain(self):
+        # Empty the bucket, e.g. after the server reports the budget has been exceeded
+        with self._lock:
+            self._refill()
+            self.tokens = min(self.tokens, 0.0)
@@ -0,0 +1,115 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+__all__ = ['ResponseCache', 'IMMUTABLE']
+
+# TTL for responses that never change once fetched, e.g. completed drafts
+IMMUTABLE = float('inf')
+
+
+class ResponseCache:
+    """
+    Two-level cache for API responses, keyed by URL.
+
+    Entries live on disk as one JSON file per URL so they survive between runs, with an
+    in-memory LRU in front for repeated lookups within a run. Each entry keeps the ETag
+    and Last-Modified headers of the response it came from so stale entries can be
+    revalidated with a conditional request instead of downloaded again.
+
+    Parameters:
+        directory (str): Directory holding the cached responses.
+            - Defaults to 'data/api_cache'.
+        max_memory_entries (int): Number of entries kept in the in-memory LRU.
+            - Defaults to 256.
+    """
+
+    def __init__(self, directory=os.path.join('data', 'api_cache'), max_memory_entries=256):
+        self.directory = directory
+        self.max_memory_entries = max_memory_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path(self, url):
+        return os.path.join(self.directory, hashlib.sha256(url.encode()).hexdigest() + '.json')
+
+    def _remember(self, url, entry):
+        with self._lock:
+            self._memory[url] = entry
+            self._memory.move_to_end(url)
+            while len(self._memory) > self.max_memory_entries:
+                self._memory.popitem(last=False)
+
+    def get(self, url):
+        """
+        Returns the cached entry for a URL, fresh or stale, or None if there is none.
+
+        An entry is a dict with keys 'url', 'data', 'etag', 'last_modified', 'fetched_at'
+        and 'expires_at' (None for immutable entries).
+        """
+        with self._lock:
+            entry = self._memory.get(url)
+            if entry is not None:
+                self._memory.move_to_end(url)
+                return entry
+        path = self._path(url)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        self._remember(url, entry)
+        return entry
+
+    @staticmethod
+    def is_fresh(entry):
+        return entry is not None and (entry['expires_at'] is None or entry['expires_at'] > time.time())
+
+    def put(self, url, data, ttl, etag=None, last_modified=None):
+        """
+        Stores a response body with its validators.
+
+        Parameters:
+            url (str): The requested URL.
+            data: The decoded JSON body.
+            ttl (float): Seconds the entry stays fresh, or IMMUTABLE.
+            etag (str, optional): ETag header of the response.
+            last_modified (str, optional): Last-Modified header of the response.
+        """
+        now = time.time()
+        entry = {
+            'url': url,
+            'data': data,
+            'etag': etag,
+            'last_modified': last_modified,
+            'fetched_at': now,
+            'expires_at': None if ttl == IMMUTABLE else now + ttl,
+        }
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(url)
+        temp_path = f'{path}.{threading.get_ident()}.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump(entry, f)
+        os.replace(temp_path, path)
+        self._remember(url, entry)
+        return entry
+
+    def invalidate(self, url):
+        with self._lock:
+            self._memory.pop(url, None)
+        path = self._path(url)
+        if os.path.exists(path):
+            os.remove(path)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+        if os.path.isdir(self.directory):
+            for file in os.listdir(self.directory):
+                if file.endswith('.json'):
+                    os.remove(os.path.join(self.directory, file))